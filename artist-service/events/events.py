@@ -10,15 +10,33 @@ def default_serializer(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
-async def publish_artist_created_event(artist_data: dict):
+# Exchange directo: cada servicio interesado declara y enlaza su propia cola
+# con los eventos que consume (content-service, search-service, ...). Aquí
+# solo se publica: un evento sin consumidores no se acumula en el broker.
+ARTIST_EXCHANGE = "artist_events"
+
+
+async def publish_artist_event(event_type: str, artist_data: dict):
     connection = await aio_pika.connect_robust(settings.rabbitmq_url)
     async with connection:
         channel = await connection.channel()
-        # Declaramos la cola (si no existe)
-        queue = await channel.declare_queue("artist_created", durable=True)
-
+        exchange = await channel.declare_exchange(
+            ARTIST_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True
+        )
         # Publicamos el mensaje, usando default_serializer para fechas
         message = aio_pika.Message(
             body=json.dumps(artist_data, default=default_serializer).encode()
         )
-        await channel.default_exchange.publish(message, routing_key=queue.name)
+        await exchange.publish(message, routing_key=event_type)
+
+
+async def publish_artist_created_event(artist_data: dict):
+    await publish_artist_event("artist_created", artist_data)
+
+
+async def publish_artist_updated_event(artist_data: dict):
+    await publish_artist_event("artist_updated", artist_data)
+
+
+async def publish_artist_deleted_event(artist_data: dict):
+    await publish_artist_event("artist_deleted", artist_data)
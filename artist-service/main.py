@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from handlers.artist_handler import router as artist_router
 from middleware.auth_middleware import AuthMiddleware
+from utils.storage import storage
 import uvicorn
 
 app = FastAPI(title="Artist Service", version="0.1")
@@ -17,6 +18,12 @@ def health_check():
     return {"status": "ok"}
 
 
+# Throughput de escritura del almacenamiento de archivos
+@app.get("/health/storage")
+def storage_health():
+    return {"storage": storage.stats()}
+
+
 # Permitir ejecución directa con python3 main.py
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
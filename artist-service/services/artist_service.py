@@ -1,6 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.repositories.artist_repository import ArtistRepository
-from events.events import publish_artist_created_event
+from events.events import (
+    publish_artist_created_event,
+    publish_artist_updated_event,
+    publish_artist_deleted_event,
+)
 from models.artist import (
     ArtistCreateSchema,
     ArtistUpdateSchema,
@@ -80,12 +84,25 @@ class ArtistService:
             data.profile_pic = uploaded_url
 
         updated = await ArtistRepository.update(db, artist, data)
-        return ArtistResponseSchema.model_validate(updated, from_attributes=True)
+        artist_schema = ArtistResponseSchema.model_validate(
+            updated, from_attributes=True
+        )
+
+        # 🚀 Publicamos el evento de artista actualizado (nombre, foto, ...)
+        asyncio.create_task(publish_artist_updated_event(artist_schema.model_dump()))
+
+        return artist_schema
 
     @staticmethod
     async def delete_artist_by_user(db: AsyncSession, user_id: int) -> bool:
         artist = await ArtistRepository.get_by_user_id(db, user_id)
         if not artist:
             return False
+        artist_id = artist.id
         await ArtistRepository.delete(db, artist)
+
+        # 🚀 Avisamos para que otros servicios invaliden cachés de identidad
+        asyncio.create_task(
+            publish_artist_deleted_event({"id": artist_id, "user_id": user_id})
+        )
         return True
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from fastapi import UploadFile
 from config import settings
+from utils.storage import storage
 from typing import Union, Any
 
 
@@ -24,7 +25,6 @@ class FileUploader:
 
         # Carpeta utils del artista
         artist_utils_folder = storage_path / artist_id_str / "utils"
-        artist_utils_folder.mkdir(parents=True, exist_ok=True)
 
         # Asegurar que filename nunca sea None
         original_filename = file.filename or "file.jpg"
@@ -38,9 +38,9 @@ class FileUploader:
         filename = f"profile_picture{ext}"
         file_location = artist_utils_folder / filename
 
-        # Guardar (sobre-escribe si ya existía)
-        with open(file_location, "wb") as buffer:
-            buffer.write(await file.read())
+        # Guardar (sobre-escribe si ya existía) de forma atómica y fuera del
+        # event loop; la carpeta se crea en la misma operación
+        await storage.write_bytes(file_location, await file.read())
 
         # Retornar la URL relativa usando el path base de config
         return f"/{artist_id_str}/utils/{filename}"
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from config import settings
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Escribe en un nombre temporal, fsync y rename atómico sobre `path`"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.parent / f".tmp-{uuid.uuid4().hex}{path.suffix}"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+class AsyncStorage:
+    """
+    Escritura de archivos (foto de perfil) fuera del event loop: atómica
+    (temp + fsync + rename) y con métricas de throughput.
+    """
+
+    def __init__(self, root: Path, max_workers: int = 2):
+        self.root = root
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage-io"
+        )
+        self.bytes_written = 0
+        self.writes = 0
+        self.write_seconds = 0.0
+
+    async def write_bytes(self, path: Path, data: bytes) -> Path:
+        started = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(
+            self._pool, _atomic_write, path, data
+        )
+        self.bytes_written += len(data)
+        self.writes += 1
+        self.write_seconds += time.perf_counter() - started
+        return path
+
+    def stats(self) -> dict:
+        return {
+            "bytes_written": self.bytes_written,
+            "writes": self.writes,
+            "write_seconds": round(self.write_seconds, 3),
+            "throughput_mb_s": round(
+                self.bytes_written / self.write_seconds / (1024 * 1024), 2
+            )
+            if self.write_seconds
+            else 0.0,
+        }
+
+
+storage = AsyncStorage(settings.storage_path)
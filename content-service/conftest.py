@@ -0,0 +1,2 @@
+# Raíz del servicio en sys.path para que los tests importen como la app
+# ("from core.services.audio_blob_store import ...")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, List
 
 from .song import SongOut  # import circular controlado con forward refs
@@ -28,3 +28,18 @@ class AlbumOut(AlbumBase):
 
     class Config:
         from_attributes = True
+
+
+class ArtistAlbumOut(BaseModel):
+    """Álbum de un artista con totales agregados (GET /albums/artist/{id})"""
+
+    id: int
+    title: str
+    release_date: Optional[date] = None
+    cover_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    artist_id: int
+    artist_name: str
+    total_songs: int = 0
+    total_duration: int = 0  # segundos
@@ -1,14 +1,23 @@
 # song_handler.py
 from fastapi import APIRouter, Depends, Request, File, UploadFile, Form, HTTPException
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from infrastructure.db.connection import get_db
 from core.repositories.song_repository import SongRepository
 from core.repositories.album_repository import AlbumRepository
 from core.services.song_service import SongService
+from core.services.audio_blob_store import (
+    AudioBlobStore,
+    SEEK_INDEX_SUFFIX,
+    WAVEFORM_SUFFIX,
+)
+from infrastructure.storage import storage
 from core.entities.song import SongOut
 from utils.json_response import success_response, error_response
 from typing import Optional
 from utils.audio_validation import validate_audio_file
+from utils.audio_ingest import AudioTooLargeError
+from config import settings
 from utils.ownership import (
     validate_song_ownership,
     validate_album_ownership,
@@ -32,7 +41,10 @@ async def create_song(
     user_id = request.state.user["user_id"]
 
     # 🔹 NUEVA VALIDACIÓN: Verificar que el álbum pertenezca al usuario
-    await validate_album_ownership(AlbumRepository(db), album_id, user_id, db)
+    # (una sola consulta; también confirma que el álbum existe)
+    owner_artist_id = await validate_album_ownership(
+        AlbumRepository(db), album_id, user_id, db
+    )
 
     # 🔹 Validar archivo de audio
     validate_audio_file(audio_file)
@@ -50,39 +62,29 @@ async def create_song(
                 detail="artist_ids debe ser una lista de números separados por comas",
             )
 
-    # 🔹 Obtener información del álbum (ya validado que pertenece al usuario)
-    album_repo = AlbumRepository(db)
-    album = await album_repo.get_by_id(album_id)
-    if not album:
-        raise HTTPException(status_code=404, detail="Álbum no encontrado")
-
-    album_name = album.title  # (podría usarse para almacenamiento físico en carpeta)
-
-    # 🔹 Leer datos del archivo de audio
-    audio_data = await audio_file.read()
-
-    # 🔹 Validar tamaño del archivo (opcional - máximo 50MB)
-    max_size = 50 * 1024 * 1024  # 50MB
-    if len(audio_data) > max_size:
+    # 🔹 El audio se recibe en streaming: el límite de tamaño se valida
+    # mientras llegan los bytes, sin cargar el archivo completo en memoria
+    service = SongService(SongRepository(db))
+    try:
+        song = await service.create_song(
+            title=title,
+            album_id=album_id,
+            user_id=user_id,
+            audio_file=audio_file,
+            audio_filename=audio_file.filename or "unknown.mp3",
+            db=db,
+            # Sin artist_ids explícitos, el dueño del álbum ya resuelto
+            artist_ids=parsed_artist_ids or [owner_artist_id],
+            track_number=track_number,
+            genre_id=genre_id,
+            override_duration=override_duration,
+        )
+    except AudioTooLargeError:
         raise HTTPException(
             status_code=400,
-            detail="El archivo de audio es demasiado grande (máximo 50MB)",
+            detail=f"El archivo de audio es demasiado grande (máximo {settings.max_audio_size_mb}MB)",
         )
 
-    service = SongService(SongRepository(db))
-    song = await service.create_song(
-        title=title,
-        album_id=album_id,
-        user_id=user_id,
-        audio_file=audio_data,
-        audio_filename=audio_file.filename or "unknown.mp3",
-        db=db,
-        artist_ids=parsed_artist_ids,
-        track_number=track_number,
-        genre_id=genre_id,
-        override_duration=override_duration,
-    )
-
     schema = SongOut.model_validate(song)
     return success_response(schema.model_dump(), "Canción creada exitosamente")
 
@@ -97,6 +99,55 @@ async def get_song(song_id: int, db: AsyncSession = Depends(get_db)):
     return success_response(schema.model_dump(), "Canción recuperada correctamente")
 
 
+# El blob es inmutable (su ruta es su hash): sus derivados también
+SIDECAR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+async def _sidecar_response(
+    song_id: int, db: AsyncSession, suffix: str, missing_message: str
+):
+    service = SongService(SongRepository(db))
+    song = await service.get_song(song_id)
+    if not song:
+        return error_response(404, "Canción no encontrada")
+
+    # Solo los audios direccionados por contenido tienen derivados
+    path = AudioBlobStore.sidecar(song.audio_url, suffix)
+    if not song.audio_sha256 or not await storage.exists(path):
+        return error_response(404, missing_message)
+
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        headers={
+            "Cache-Control": SIDECAR_CACHE_CONTROL,
+            "ETag": f'"{song.audio_sha256}"',
+        },
+    )
+
+
+@router.get("/{song_id}/seek-index")
+async def get_song_seek_index(song_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Índice de búsqueda por tiempo precalculado al subir el audio
+    (formato binario documentado en utils/seek_index.py).
+    """
+    return await _sidecar_response(
+        song_id, db, SEEK_INDEX_SUFFIX, "Índice de búsqueda no disponible"
+    )
+
+
+@router.get("/{song_id}/waveform")
+async def get_song_waveform(song_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Picos min/max de la forma de onda precalculados al subir el audio
+    (formato binario documentado en utils/waveform.py).
+    """
+    return await _sidecar_response(
+        song_id, db, WAVEFORM_SUFFIX, "Forma de onda no disponible"
+    )
+
+
 @router.put("/{song_id}", response_model=dict)
 async def update_song(
     request: Request,
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import Row, select, delete, func
 from infrastructure.db.models import Album, Artist, Song
 from collections.abc import Sequence
 from typing import Dict, Any, List
@@ -37,22 +37,30 @@ class AlbumRepository:
         return album
 
     async def delete(self, album: Album) -> None:
+        """Borra el álbum sin commit: el servicio libera sus blobs y confirma"""
         # 🔹 Borrar todas las canciones del álbum antes
         await self.session.execute(delete(Song).where(Song.album_id == album.id))
 
         # 🔹 Ahora sí borrar el álbum
         await self.session.delete(album)
 
-        await self.session.commit()
+        await self.session.flush()
 
-    async def get_artist_id_by_album(self, album_id: int) -> int | None:
+    async def get_owner_by_album(self, album_id: int) -> Row | None:
+        """Retorna (artist_id, user_id) del dueño del álbum, o None si no existe"""
         stmt = (
-            select(Artist.user_id)
+            select(Artist.id.label("artist_id"), Artist.user_id)
             .join(Album, Album.artist_id == Artist.id)
             .where(Album.id == album_id)
+            .execution_options(prepared=False)
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
+
+    async def list_song_ids(self, album_id: int) -> list[int]:
+        stmt = select(Song.id).where(Song.album_id == album_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
     async def list_songs_by_album(self, album_id: int) -> Sequence[Song]:
         stmt = select(Song).where(Song.album_id == album_id)
@@ -60,7 +68,11 @@ class AlbumRepository:
         return result.scalars().all()
 
     async def get_albums_with_artist_info(self, artist_id: int) -> list[dict]:
-        """Obtiene todos los álbumes de un artista con información completa"""
+        """
+        Obtiene todos los álbumes de un artista con información completa,
+        incluyendo número de canciones y duración total, en una sola consulta
+        agrupada (sin cargar las canciones).
+        """
         stmt = (
             select(
                 Album.id,
@@ -71,29 +83,16 @@ class AlbumRepository:
                 Album.updated_at,
                 Artist.artist_name,
                 Artist.id.label("artist_id"),
+                func.count(Song.id).label("total_songs"),
+                func.coalesce(func.sum(Song.duration), 0).label("total_duration"),
             )
             .join(Artist, Album.artist_id == Artist.id)
+            .outerjoin(Song, Song.album_id == Album.id)
             .where(Album.artist_id == artist_id)
+            .group_by(Album.id, Artist.id)
             .order_by(Album.release_date.desc().nulls_last(), Album.created_at.desc())
             .execution_options(prepared=False)
         )
 
         result = await self.session.execute(stmt)
-
-        # Convertir los resultados a lista de diccionarios
-        albums = []
-        for row in result:
-            albums.append(
-                {
-                    "id": row.id,
-                    "title": row.title,
-                    "release_date": row.release_date,
-                    "cover_url": row.cover_url,
-                    "created_at": row.created_at,
-                    "updated_at": row.updated_at,
-                    "artist_id": row.artist_id,
-                    "artist_name": row.artist_name,
-                }
-            )
-
-        return albums
+        return [dict(row._mapping) for row in result]
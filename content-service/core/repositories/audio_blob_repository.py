@@ -0,0 +1,106 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from infrastructure.db.models import AudioBlob, Song
+
+
+class AudioBlobRepository:
+    """
+    Acceso a los blobs de audio. Ninguna operación hace commit: los cambios de
+    ref_count se confirman en la misma transacción que la canción.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def lock(self, sha256: str) -> None:
+        """
+        Lock transaccional (advisory) sobre un hash: serializa la aparición
+        del archivo de un blob nuevo con el borrado de uno huérfano. Se
+        libera solo con el commit o rollback de la transacción.
+        """
+        key = int(sha256[:15], 16)  # 60 bits: entra en un BIGINT
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(literal(key))).execution_options(
+                prepared=False
+            )
+        )
+
+    async def exists(self, sha256: str) -> bool:
+        stmt = (
+            select(AudioBlob.sha256)
+            .where(AudioBlob.sha256 == sha256)
+            .execution_options(prepared=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def acquire_existing(self, sha256: str) -> AudioBlob | None:
+        """Suma una referencia a un blob existente. Retorna None si no existe"""
+        stmt = (
+            update(AudioBlob)
+            .where(AudioBlob.sha256 == sha256)
+            .values(ref_count=AudioBlob.ref_count + 1)
+            .returning(AudioBlob)
+            .execution_options(prepared=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def acquire_new(
+        self, sha256: str, path: str, size: int, duration: int | None
+    ) -> AudioBlob:
+        """
+        Registra un blob nuevo con una referencia. Si otra subida concurrente
+        lo insertó primero, solo suma la referencia.
+        """
+        stmt = (
+            insert(AudioBlob)
+            .values(
+                sha256=sha256, path=path, size=size, duration=duration, ref_count=1
+            )
+            .on_conflict_do_update(
+                index_elements=[AudioBlob.sha256],
+                set_={"ref_count": AudioBlob.ref_count + 1},
+            )
+            .returning(AudioBlob)
+            .execution_options(prepared=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
+    async def release(self, refs: dict[str, int]) -> dict[str, str]:
+        """
+        Resta referencias ({sha256: cantidad}) y elimina las filas que quedan
+        en cero. Retorna {sha256: ruta} de los blobs a borrar tras el commit.
+
+        Las canciones que los referencian (songs.audio_sha256) ya deben
+        estar borradas en la transacción: la FK no es diferida.
+        """
+        for sha256, count in refs.items():
+            await self.session.execute(
+                update(AudioBlob)
+                .where(AudioBlob.sha256 == sha256)
+                .values(ref_count=AudioBlob.ref_count - count)
+                .execution_options(prepared=False)
+            )
+        if not refs:
+            return {}
+        result = await self.session.execute(
+            delete(AudioBlob)
+            .where(AudioBlob.sha256.in_(list(refs)), AudioBlob.ref_count <= 0)
+            .returning(AudioBlob.sha256, AudioBlob.path)
+            .execution_options(prepared=False)
+        )
+        return {sha256: path for sha256, path in result.all()}
+
+    async def refs_by_album(self, album_id: int) -> dict[str, int]:
+        """Cuenta cuántas canciones del álbum referencian cada blob"""
+        stmt = (
+            select(Song.audio_sha256, func.count())
+            .where(Song.album_id == album_id, Song.audio_sha256.is_not(None))
+            .group_by(Song.audio_sha256)
+            .execution_options(prepared=False)
+        )
+        result = await self.session.execute(stmt)
+        return {sha256: count for sha256, count in result.all()}
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from infrastructure.db.models import Song, Album, Artist
 from collections.abc import Sequence
 
@@ -36,16 +36,18 @@ class SongRepository:
         return song
 
     async def delete(self, song: Song) -> None:
+        """Borra la canción sin commit: el servicio libera su blob y confirma"""
         await self.session.delete(song)
-        await self.session.commit()
+        await self.session.flush()
 
-    async def get_artist_id_by_song(self, song_id: int) -> int | None:
+    async def get_owner_by_song(self, song_id: int) -> Row | None:
+        """Retorna (artist_id, user_id) del dueño de la canción, o None si no existe"""
         stmt = (
-            select(Artist.user_id)
+            select(Artist.id.label("artist_id"), Artist.user_id)
             .select_from(Song)  # 🔹 Aquí indicamos que la consulta parte de Song
             .join(Album, Album.id == Song.album_id)
             .join(Artist, Artist.id == Album.artist_id)
             .where(Song.id == song_id)
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
@@ -2,18 +2,34 @@ from datetime import date
 from pathlib import Path
 from infrastructure.db.models import Album, Song
 from core.repositories.album_repository import AlbumRepository
-from events.producer import publish_album_created_event, publish_album_updated_event
+from core.entities.album import ArtistAlbumOut
+from core.repositories.audio_blob_repository import AudioBlobRepository
+from core.services.audio_blob_store import AudioBlobStore
+from events.outbox import add_outbox_event, outbox_relay
 from core.services.artist_lookup import ArtistLookupService
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
 from config import settings
+from infrastructure.storage import storage
 
 
 class AlbumService:
     def __init__(self, repo: AlbumRepository):
         self.repo = repo
 
-    def _save_cover_image(
+    @staticmethod
+    def _event_payload(album: Album) -> dict:
+        return {
+            "id": album.id,
+            "title": album.title,
+            "artist_id": album.artist_id,
+            "release_date": album.release_date.isoformat()
+            if album.release_date
+            else None,
+            "cover_url": album.cover_url,
+        }
+
+    async def _save_cover_image(
         self,
         artist_id: int,
         album_id: int,
@@ -22,7 +38,7 @@ class AlbumService:
     ) -> str:
         """
         Guarda la imagen de portada en storage/{artist_id}/{album_id}/cover.(jpg|png)
-        Reemplaza la portada si ya existe.
+        Reemplaza la portada si ya existe (escritura atómica, fuera del event loop).
         Retorna la URL relativa de la imagen guardada.
         """
         # Usar extensión original del archivo, default .png
@@ -35,19 +51,14 @@ class AlbumService:
         # Nombre fijo de portada
         filename = f"cover{ext}"
 
-        # Ruta base del storage
-        storage_path = settings.storage_path
-
         # Carpeta del álbum
-        album_folder = storage_path / str(artist_id) / str(album_id)
-        album_folder.mkdir(parents=True, exist_ok=True)
+        album_folder = settings.storage_path / str(artist_id) / str(album_id)
 
         # Ruta completa del archivo
         file_path = album_folder / filename
 
-        # Guardar la imagen (sobrescribe si ya existe)
-        with open(file_path, "wb") as f:
-            f.write(image_data)
+        # Guardar la imagen (temp + fsync + rename; sobrescribe si ya existe)
+        await storage.write_bytes(file_path, image_data)
 
         # Retornar URL relativa
         cover_url = f"/{artist_id}/{album_id}/{filename}"
@@ -73,34 +84,28 @@ class AlbumService:
         # Fecha por defecto
         release_date = release_date or date.today()
 
-        # 1. Crear el álbum sin portada
+        # 1. Insertar el álbum (flush, sin commit) para obtener album.id
         album = Album(
             title=title,
             artist_id=artist_id,
             release_date=release_date,
         )
-        album = await self.repo.create(album)
+        self.repo.session.add(album)
+        await self.repo.session.flush()
 
         # 2. Guardar la portada (si se envía), ahora que ya existe album.id
         if cover_image:
-            cover_url = self._save_cover_image(
+            cover_url = await self._save_cover_image(
                 artist_id, album.id, cover_image, cover_filename
             )
             album.cover_url = cover_url
-            album = await self.repo.update(album)
 
-        # 3. Publicar evento
-        await publish_album_created_event(
-            {
-                "id": album.id,
-                "title": album.title,
-                "artist_id": album.artist_id,
-                "release_date": album.release_date.isoformat()
-                if album.release_date
-                else None,
-                "cover_url": album.cover_url,
-            }
+        # 3. Registrar el evento en el outbox y confirmar todo en una transacción
+        add_outbox_event(
+            self.repo.session, "album_created", self._event_payload(album)
         )
+        album = await self.repo.create(album)
+        outbox_relay.wake()
 
         return album
 
@@ -127,49 +132,49 @@ class AlbumService:
             album.release_date = release_date
 
         if cover_image:
-            cover_url = self._save_cover_image(
+            cover_url = await self._save_cover_image(
                 album.artist_id, album.id, cover_image, cover_filename
             )
             album.cover_url = cover_url
 
-        album = await self.repo.update(album)
-
-        await publish_album_updated_event(
-            {
-                "id": album.id,
-                "title": album.title,
-                "artist_id": album.artist_id,
-                "release_date": album.release_date.isoformat()
-                if album.release_date
-                else None,
-                "cover_url": album.cover_url,
-            }
+        # 🔹 El evento se confirma en la misma transacción que el cambio
+        add_outbox_event(
+            self.repo.session, "album_updated", self._event_payload(album)
         )
+        album = await self.repo.update(album)
+        outbox_relay.wake()
 
         return album
 
     async def delete_album(self, album: Album) -> None:
+        # 🔹 Liberar las referencias a blobs de audio de todas sus canciones
+        blob_store = AudioBlobStore(AudioBlobRepository(self.repo.session))
+        refs = await blob_store.repo.refs_by_album(album.id)
+        # 🔹 El evento viaja en la misma transacción que el borrado
+        add_outbox_event(
+            self.repo.session,
+            "album_deleted",
+            {
+                "id": album.id,
+                "song_ids": await self.repo.list_song_ids(album.id),
+            },
+        )
+        # 🔹 Primero las canciones: su FK al blob impide borrar antes sus filas
         await self.repo.delete(album)
+        orphans = await blob_store.release(refs)
+        await self.repo.session.commit()
+        outbox_relay.wake()
+        # GC de los blobs que se quedaron sin referencias
+        await blob_store.collect(orphans)
 
     async def list_songs_by_album(self, album_id: int) -> list[Song]:
         return list(await self.repo.list_songs_by_album(album_id))
 
     async def get_artist_albums_with_info(self, artist_id: int) -> list[dict]:
         """Obtiene todos los álbumes de un artista con información completa"""
+        # 🔹 Una sola consulta: totales de canciones agregados en SQL
         albums = await self.repo.get_albums_with_artist_info(artist_id)
-
-        # Agregar información adicional
-        for album in albums:
-            # Contar canciones del álbum
-            songs = await self.repo.list_songs_by_album(album["id"])
-            album["total_songs"] = len(songs)
-
-            # Formatear fechas si es necesario
-            if album["release_date"]:
-                album["release_date"] = album["release_date"].isoformat()
-            if album["created_at"]:
-                album["created_at"] = album["created_at"].isoformat()
-            if album["updated_at"]:
-                album["updated_at"] = album["updated_at"].isoformat()
-
-        return albums
+        return [
+            ArtistAlbumOut.model_validate(album).model_dump(mode="json")
+            for album in albums
+        ]
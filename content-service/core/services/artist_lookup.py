@@ -1,6 +1,62 @@
+import time
+from collections import OrderedDict
 from sqlalchemy import select
 from infrastructure.db.models import Artist
 from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+
+
+class ArtistIdentityCache:
+    """
+    Caché en memoria user_id -> artist_id con TTL y expulsión LRU.
+    Se invalida con los eventos artist_created / artist_deleted, que cada
+    proceso recibe en su propia cola (ver events/consumer.py).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> int | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: int, artist_id: int) -> None:
+        self._entries[user_id] = (artist_id, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+artist_identity_cache = ArtistIdentityCache(
+    settings.artist_cache_size, settings.artist_cache_ttl_seconds
+)
 
 
 class ArtistLookupService:
@@ -10,9 +66,18 @@ class ArtistLookupService:
         Obtiene el artist_id basado en el user_id
         Retorna None si no se encuentra el artista
         """
+        # 🔹 Primero la caché de identidad (sin ida y vuelta a la BD)
+        cached = artist_identity_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         try:
             stmt = select(Artist.id).where(Artist.user_id == user_id)
             result = await db.scalar(stmt)
+            # Solo se cachean artistas existentes: un usuario sin perfil
+            # puede crearlo en cualquier momento
+            if result is not None:
+                artist_identity_cache.set(user_id, result)
             return result
         except Exception as e:
             print(f"Error en get_artist_id_by_user: {e}")
@@ -0,0 +1,167 @@
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from fastapi import UploadFile
+from core.repositories.audio_blob_repository import AudioBlobRepository
+from infrastructure.executor import audio_executor
+from infrastructure.storage import storage
+from utils.audio_ingest import ingest_upload
+from utils.audio_metadata import extract_audio_metadata
+from utils.seek_index import build_seek_index
+from utils.waveform import build_waveform
+from config import settings
+
+BLOBS_DIR = "blobs"
+SEEK_INDEX_SUFFIX = ".seek"
+WAVEFORM_SUFFIX = ".peaks"
+# Archivos derivados que viven junto a cada blob y se borran con él
+SIDECAR_SUFFIXES = (SEEK_INDEX_SUFFIX, WAVEFORM_SUFFIX)
+
+
+@dataclass
+class StoredAudio:
+    sha256: str
+    audio_url: str
+    duration: int
+    deduplicated: bool
+    metadata: dict = field(default_factory=dict)
+
+
+class AudioBlobStore:
+    """
+    Almacenamiento de audio direccionado por contenido:
+    storage/blobs/{sha[:2]}/{sha[2:4]}/{sha}{ext}
+
+    Subidas con bytes idénticos comparten el mismo archivo. Tras calcular el
+    hash, un duplicado no se escribe ni se vuelve a analizar con mutagen.
+
+    El archivo de un blob nuevo aparece en disco y su fila se confirma bajo
+    el lock del hash (AudioBlobRepository.lock); el borrado de un blob sin
+    referencias toma el mismo lock y vuelve a comprobar que la fila no
+    exista antes de tocar el disco.
+    """
+
+    def __init__(self, repo: AudioBlobRepository):
+        self.repo = repo
+
+    @staticmethod
+    def blob_url(sha256: str, ext: str) -> str:
+        return f"/{BLOBS_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+    @staticmethod
+    def resolve(url: str) -> Path:
+        return settings.storage_path / url.lstrip("/")
+
+    @staticmethod
+    def sidecar(url: str, suffix: str) -> Path:
+        """Ruta de un archivo derivado (índice de búsqueda, etc.) junto al blob"""
+        return settings.storage_path / (url.lstrip("/") + suffix)
+
+    @staticmethod
+    def incoming_dir() -> Path:
+        # Dentro del mismo filesystem que los blobs para que el rename sea atómico
+        return settings.storage_path / BLOBS_DIR / ".incoming"
+
+    async def store_upload(self, upload: UploadFile, ext: str) -> StoredAudio:
+        """
+        Recibe el upload en streaming, y según su SHA-256:
+        - si el blob ya existe: descarta el temporal y suma una referencia;
+        - si es nuevo: extrae metadatos, índice de búsqueda y forma de onda,
+          lo mueve a su ruta definitiva y lo registra.
+        """
+        ingested = await ingest_upload(upload, self.incoming_dir(), ext)
+
+        try:
+            existing = await self.repo.acquire_existing(ingested.sha256)
+            if existing is not None:
+                await ingested.discard()
+                print(f"[✓] Audio duplicado, se reutiliza el blob {existing.sha256}")
+                return StoredAudio(
+                    sha256=existing.sha256,
+                    audio_url=existing.path,
+                    duration=existing.duration or 0,
+                    deduplicated=True,
+                )
+
+            # Análisis del archivo recibido en el pool de audio (fuera del
+            # loop): metadatos, índice de búsqueda por tiempo y picos de onda.
+            # Se calculan una sola vez por blob, no por canción ni por oyente.
+            temp_path = str(ingested.temp_path)
+            metadata, seek_index, waveform = await asyncio.gather(
+                audio_executor.run(extract_audio_metadata, temp_path),
+                audio_executor.run(
+                    build_seek_index, temp_path, settings.seek_index_interval_ms
+                ),
+                audio_executor.run(build_waveform, temp_path, settings.waveform_points),
+            )
+        except BaseException:
+            await ingested.discard()
+            raise
+
+        stored = StoredAudio(
+            sha256=ingested.sha256,
+            audio_url=self.blob_url(ingested.sha256, ext),
+            duration=metadata["duration"],
+            deduplicated=False,
+            metadata=metadata,
+        )
+        final_path = self.resolve(stored.audio_url)
+        try:
+            # Hasta el commit de la canción nadie puede borrar este blob
+            await self.repo.lock(stored.sha256)
+            await storage.ensure_dirs([final_path.parent])
+            # Los sidecars se escriben antes que el audio: cuando el blob es
+            # visible, sus derivados ya existen
+            sidecars = {SEEK_INDEX_SUFFIX: seek_index, WAVEFORM_SUFFIX: waveform}
+            for suffix, data in sidecars.items():
+                if data:
+                    await storage.write_bytes(
+                        self.sidecar(stored.audio_url, suffix), data
+                    )
+            await ingested.commit(final_path)
+            await self.repo.acquire_new(
+                stored.sha256, stored.audio_url, ingested.size, stored.duration
+            )
+        except BaseException:
+            if ingested.temp_path != final_path:
+                await ingested.discard()
+            await self.abort(stored)
+            raise
+
+        print(f"[✓] Archivo de audio guardado: {final_path}")
+        return stored
+
+    async def abort(self, stored: StoredAudio) -> None:
+        """
+        La canción no se creó: deshace la transacción (referencia incluida)
+        y, si el blob era nuevo, borra su archivo y sus derivados.
+        """
+        await self.repo.session.rollback()
+        if not stored.deduplicated:
+            await self.collect({stored.sha256: stored.audio_url})
+
+    async def release(self, refs: dict[str, int]) -> dict[str, str]:
+        """Resta referencias; retorna los blobs huérfanos (borrar tras commit)"""
+        return await self.repo.release(refs)
+
+    async def collect(self, blobs: dict[str, str]) -> None:
+        """
+        Garbage collection: elimina del disco los blobs ({sha256: ruta}) que
+        siguen sin fila. Una subida concurrente del mismo audio pudo volver
+        a registrarlo desde que se liberó: en ese caso el archivo es suyo.
+        """
+        for sha256, url in blobs.items():
+            try:
+                await self.repo.lock(sha256)
+                if await self.repo.exists(sha256):
+                    print(f"[*] Blob {sha256} registrado de nuevo, no se elimina")
+                    continue
+                await storage.remove(self.resolve(url))
+                for suffix in SIDECAR_SUFFIXES:
+                    await storage.remove(self.sidecar(url, suffix))
+                print(f"[✓] Blob de audio eliminado: {url}")
+            except Exception as e:
+                print(f"[!] Error eliminando el blob {sha256}: {e}")
+            finally:
+                # Libera el lock del hash
+                await self.repo.session.rollback()
@@ -1,80 +1,18 @@
 # core/services/song_service.py
-import tempfile
 from pathlib import Path
-from mutagen._file import File as MutagenFile
+from fastapi import UploadFile
 from infrastructure.db.models import Song, Artist
 from core.repositories.song_repository import SongRepository
-from events.producer import publish_song_created_event, publish_song_updated_event
+from events.outbox import add_outbox_event, outbox_relay
 from core.services.artist_lookup import ArtistLookupService
 import re
 from sqlalchemy.ext.asyncio import AsyncSession
-from config import settings
+from infrastructure.storage import storage
+from core.repositories.audio_blob_repository import AudioBlobRepository
+from core.services.audio_blob_store import AudioBlobStore, StoredAudio
 
 
 class SongService:
-    def _extract_audio_metadata(self, audio_data: bytes, filename: str) -> dict:
-        """
-        Extrae metadatos del archivo de audio usando mutagen.
-        Retorna diccionario con duración y otros metadatos.
-        """
-        try:
-            # Crear archivo temporal para mutagen
-            with tempfile.NamedTemporaryFile(
-                suffix=Path(filename).suffix, delete=False
-            ) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            # Cargar archivo con mutagen
-            audio_file = MutagenFile(temp_file_path)
-
-            # Limpiar archivo temporal
-            Path(temp_file_path).unlink(missing_ok=True)
-
-            if audio_file is None:
-                raise ValueError("Formato de audio no soportado")
-
-            # Extraer metadatos básicos
-            metadata = {
-                "duration": int(audio_file.info.length) if audio_file.info else 0,
-                "bitrate": getattr(audio_file.info, "bitrate", None),
-                "sample_rate": getattr(audio_file.info, "sample_rate", None),
-                "channels": getattr(audio_file.info, "channels", None),
-            }
-
-            # Extraer tags comunes
-            if audio_file.tags:
-                metadata.update(
-                    {
-                        "artist": str(audio_file.tags.get("TPE1", [""])[0])
-                        if "TPE1" in audio_file.tags
-                        else None,
-                        "album": str(audio_file.tags.get("TALB", [""])[0])
-                        if "TALB" in audio_file.tags
-                        else None,
-                        "title": str(audio_file.tags.get("TIT2", [""])[0])
-                        if "TIT2" in audio_file.tags
-                        else None,
-                        "track_number": str(audio_file.tags.get("TRCK", [""])[0]).split(
-                            "/"
-                        )[0]
-                        if "TRCK" in audio_file.tags
-                        else None,
-                        "genre": str(audio_file.tags.get("TCON", [""])[0])
-                        if "TCON" in audio_file.tags
-                        else None,
-                    }
-                )
-
-            print(
-                f"[✓] Metadatos extraídos: duración={metadata['duration']}s, bitrate={metadata['bitrate']}"
-            )
-            return metadata
-
-        except Exception as e:
-            print(f"[!] Error extrayendo metadatos: {e}")
-            return {"duration": 0}
-
     def __init__(self, repo: SongRepository):
         self.repo = repo
 
@@ -82,48 +20,12 @@ class SongService:
         """Sanitiza un nombre para que sea válido como archivo"""
         return re.sub(r"[^a-zA-Z0-9_\- ]+", "", name).strip().replace(" ", "_")
 
-    def _save_audio_file(
-        self,
-        artist_id: str,
-        album_id: str,
-        audio_data: bytes,
-        title: str,
-        original_filename: str,
-    ) -> str:
-        """
-        Guarda el archivo de audio en storage/{artist_id}/{album_id}/
-        usando el título de la canción como nombre de archivo.
-        Retorna la URL relativa.
-        """
-        try:
-            # Mantener extensión original
-            ext = Path(original_filename).suffix or ".mp3"
-            safe_title = self._sanitize_filename(title) or "untitled"
-            filename = f"{safe_title}{ext}"
-
-            storage_path = settings.storage_path
-            album_folder = storage_path / str(artist_id) / str(album_id)
-            album_folder.mkdir(parents=True, exist_ok=True)
-
-            file_path = album_folder / filename
-
-            with open(file_path, "wb") as f:
-                f.write(audio_data)
-
-            audio_url = f"/{artist_id}/{album_id}/{filename}"
-            print(f"[✓] Archivo de audio guardado: {file_path}")
-            return audio_url
-
-        except Exception as e:
-            print(f"[!] Error guardando archivo de audio: {e}")
-            raise ValueError(f"Error al guardar el archivo de audio: {e}")
-
     async def create_song(
         self,
         title: str,
         album_id: int,
         user_id: int,
-        audio_file: bytes,
+        audio_file: UploadFile,
         audio_filename: str,
         db: AsyncSession,  # ⬅️ ACEPTA LA SESIÓN
         artist_ids: list[int] | None = None,
@@ -138,21 +40,46 @@ class SongService:
                 raise ValueError(f"No existe artista para el user_id {user_id}")
             artist_ids = [artist_id]
 
-        # Extraer metadatos
-        metadata = self._extract_audio_metadata(audio_file, audio_filename)
-        duration = (
-            override_duration if override_duration is not None else metadata["duration"]
+        # 🔹 Recibir el audio en streaming en el almacén direccionado por
+        # contenido; un duplicado se detecta tras el hash y no se reescribe
+        blob_store = AudioBlobStore(AudioBlobRepository(self.repo.session))
+        stored = await blob_store.store_upload(
+            audio_file, Path(audio_filename).suffix.lower() or ".mp3"
         )
+        try:
+            return await self._create_song_row(
+                stored,
+                title,
+                album_id,
+                artist_ids,
+                track_number,
+                genre_id,
+                override_duration,
+            )
+        except BaseException:
+            # 🔹 Sin canción no queda ni la referencia ni un blob nuevo en disco
+            await blob_store.abort(stored)
+            raise
 
-        # Guardar archivo de audio con el título como nombre
-        audio_url = self._save_audio_file(
-            str(artist_ids[0]), str(album_id), audio_file, title, audio_filename
+    async def _create_song_row(
+        self,
+        stored: StoredAudio,
+        title: str,
+        album_id: int,
+        artist_ids: list[int],
+        track_number: int | None,
+        genre_id: int | None,
+        override_duration: int | None,
+    ) -> Song:
+        metadata = stored.metadata
+        duration = (
+            override_duration if override_duration is not None else stored.duration
         )
 
         # Fallbacks con metadatos
-        if not title and metadata["title"]:
+        if not title and metadata.get("title"):
             title = metadata["title"]
-        if track_number is None and metadata["track_number"]:
+        if track_number is None and metadata.get("track_number"):
             try:
                 track_number = int(metadata["track_number"])
             except (ValueError, TypeError):
@@ -162,7 +89,8 @@ class SongService:
             title=title,
             album_id=album_id,
             duration=duration,
-            audio_url=audio_url,
+            audio_url=stored.audio_url,
+            audio_sha256=stored.sha256,
             track_number=track_number,
             genre_id=genre_id,
         )
@@ -173,9 +101,12 @@ class SongService:
                 raise ValueError(f"El artista con id {artist_id} no existe")
             song.artists.append(artist)
 
-        song = await self.repo.create(song)
-
-        await publish_song_created_event(
+        # 🔹 Flush para obtener song.id y registrar el evento en la misma transacción
+        self.repo.session.add(song)
+        await self.repo.session.flush()
+        add_outbox_event(
+            self.repo.session,
+            "song_created",
             {
                 "id": song.id,
                 "title": song.title,
@@ -185,8 +116,10 @@ class SongService:
                 "audio_url": song.audio_url,
                 "track_number": song.track_number,
                 "genre_id": song.genre_id,
-            }
+            },
         )
+        song = await self.repo.create(song)
+        outbox_relay.wake()
         return song
 
     async def update_song(
@@ -197,7 +130,10 @@ class SongService:
         genre_id: int | None = None,
     ) -> Song:
         # 🔹 Solo se actualizan los campos permitidos
-        if title and title != song.title:
+        if title and title != song.title and song.audio_sha256:
+            # El archivo es un blob compartido por hash: solo cambia el título
+            song.title = title
+        elif title and title != song.title:
             # Renombrar archivo físico
             if not song.audio_url:
                 raise ValueError("La canción no tiene un archivo de audio asociado")
@@ -208,8 +144,8 @@ class SongService:
             new_path = old_path.parent / new_filename
 
             try:
-                if old_path.exists():
-                    old_path.rename(new_path)
+                if await storage.exists(old_path):
+                    await storage.replace(old_path, new_path)
                 song.audio_url = (
                     f"/storage/{song.album.artist_id}/{song.album_id}/{new_filename}"
                 )
@@ -224,9 +160,9 @@ class SongService:
         if genre_id is not None:
             song.genre_id = genre_id
 
-        song = await self.repo.update(song)
-
-        await publish_song_updated_event(
+        add_outbox_event(
+            self.repo.session,
+            "song_updated",
             {
                 "id": song.id,
                 "title": song.title,
@@ -235,12 +171,24 @@ class SongService:
                 "audio_url": song.audio_url,
                 "track_number": song.track_number,
                 "genre_id": song.genre_id,
-            }
+            },
         )
+        song = await self.repo.update(song)
+        outbox_relay.wake()
         return song
 
     async def delete_song(self, song: Song) -> None:
+        blob_store = AudioBlobStore(AudioBlobRepository(self.repo.session))
+        sha256 = song.audio_sha256
+        # 🔹 El evento viaja en la misma transacción que el borrado
+        add_outbox_event(self.repo.session, "song_deleted", {"id": song.id})
+        # 🔹 Primero la canción: su FK al blob impide borrar antes la fila del blob
         await self.repo.delete(song)
+        orphans = await blob_store.release({sha256: 1}) if sha256 else {}
+        await self.repo.session.commit()
+        outbox_relay.wake()
+        # 🔹 GC: borrar del disco los blobs que se quedaron sin referencias
+        await blob_store.collect(orphans)
 
     async def get_song(self, song_id: int) -> Song | None:
         return await self.repo.get_by_id(song_id)
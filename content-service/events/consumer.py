@@ -6,11 +6,15 @@ from aio_pika.abc import AbstractIncomingMessage
 from infrastructure.db.connection import AsyncSessionLocal
 from core.repositories.album_repository import AlbumRepository
 from core.services.album_service import AlbumService
-from core.services.artist_lookup import ArtistLookupService
+from core.services.artist_lookup import ArtistLookupService, artist_identity_cache
 from config import settings
+from infrastructure.storage import storage
 
+# Exchange de artist-service (ver artist-service/events/events.py)
+ARTIST_EXCHANGE = "artist_events"
 
-def create_artist_folder_structure(artist_id: str, album_id: int) -> None:
+
+async def create_artist_folder_structure(artist_id: str, album_id: int) -> None:
     """
     Crea la estructura de carpetas para el artista y el álbum:
     {CONTENT_BASE_PATH}/
@@ -22,17 +26,13 @@ def create_artist_folder_structure(artist_id: str, album_id: int) -> None:
         # 🔹 USAR PATH CENTRALIZADO DESDE CONFIG
         storage_path = settings.storage_path
 
-        # Carpeta del artista
+        # Carpeta del artista, carpeta utils y carpeta del álbum usando ID
         artist_folder = storage_path / str(artist_id)
-        artist_folder.mkdir(parents=True, exist_ok=True)
-
-        # Carpeta utils
         utils_folder = artist_folder / "utils"
-        utils_folder.mkdir(exist_ok=True)
-
-        # Carpeta del álbum usando ID
         album_folder = artist_folder / str(album_id)
-        album_folder.mkdir(exist_ok=True)
+
+        # 🔹 Una sola operación fuera del event loop para todas las carpetas
+        await storage.ensure_dirs([artist_folder, utils_folder, album_folder])
 
         print(f"[✓] Estructura de carpetas creada en {settings.content_base_path}:")
         print(f"    - {artist_folder}")
@@ -53,6 +53,10 @@ async def handle_artist_created(message: AbstractIncomingMessage) -> None:
                 print("[!] Evento artist_created inválido: falta user_id")
                 return
 
+            # 🔹 La cola de identidad de este proceso puede llegar después:
+            # no resolver el artista con una entrada vieja de la caché
+            artist_identity_cache.invalidate(user_id)
+
             # Abrimos sesión centralizada para todo el flujo
             async with AsyncSessionLocal() as session:
                 # 🔹 Resolvemos artist_id usando la misma sesión
@@ -75,7 +79,7 @@ async def handle_artist_created(message: AbstractIncomingMessage) -> None:
                 )
 
                 # 🔹 Crear estructura de carpetas usando el album.id
-                create_artist_folder_structure(str(artist_id), album.id)
+                await create_artist_folder_structure(str(artist_id), album.id)
 
                 # 🔹 Hacer commit explícito para asegurar que los cambios se persistan
                 await session.commit()
@@ -90,13 +94,44 @@ async def handle_artist_created(message: AbstractIncomingMessage) -> None:
             print(f"[!] Error procesando evento artist_created: {e}")
 
 
+async def handle_identity_event(message: AbstractIncomingMessage) -> None:
+    """
+    artist_created / artist_deleted: invalida (o actualiza) la entrada de la
+    caché de identidad user -> artist de este proceso
+    """
+    async with message.process():
+        try:
+            data = json.loads(message.body.decode())
+            user_id = data.get("user_id")
+            if not user_id:
+                print(f"[!] Evento {message.routing_key} inválido: falta user_id")
+                return
+            artist_identity_cache.invalidate(user_id)
+            if message.routing_key == "artist_created" and data.get("id"):
+                artist_identity_cache.set(user_id, data["id"])
+        except json.JSONDecodeError:
+            print("[!] Error: mensaje inválido (no es JSON)")
+
+
 async def consume_events():
-    """Suscripción a la cola de eventos de artistas"""
+    """Suscripción a los eventos de artistas (exchange de artist-service)"""
     connection = await aio_pika.connect_robust(settings.rabbitmq_url)
     channel = await connection.channel()
+    exchange = await channel.declare_exchange(
+        ARTIST_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True
+    )
+    # Cola compartida del servicio: el álbum "Sencillos" se crea una vez
     queue = await channel.declare_queue("artist_created", durable=True)
+    await queue.bind(exchange, routing_key="artist_created")
     await queue.consume(handle_artist_created)
-    print("[*] Esperando eventos artist_created...")
+
+    # Cola propia de este proceso (exclusiva, se borra al desconectar): la
+    # caché de identidad es por proceso y todos deben invalidar
+    identity_queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    for event_type in ("artist_created", "artist_deleted"):
+        await identity_queue.bind(exchange, routing_key=event_type)
+    await identity_queue.consume(handle_identity_event)
+    print("[*] Esperando eventos artist_created / artist_deleted...")
     return connection
 
 
@@ -0,0 +1,140 @@
+import asyncio
+import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from infrastructure.db.connection import AsyncSessionLocal
+from infrastructure.db.models import OutboxEvent
+from events.producer import EventPublisher, publisher
+from config import settings
+
+
+def add_outbox_event(session: AsyncSession, event_type: str, payload: dict) -> None:
+    """
+    Registra un evento en el outbox usando la sesión del caso de uso.
+    No hace commit: el evento se persiste (o se descarta) junto con el cambio
+    de negocio en la misma transacción.
+    """
+    session.add(OutboxEvent(event_type=event_type, payload=payload))
+
+
+class OutboxRelay:
+    """
+    Publica en RabbitMQ los eventos del outbox en lotes.
+
+    Usa SELECT ... FOR UPDATE SKIP LOCKED, por lo que varias réplicas pueden
+    ejecutar el relay a la vez sin publicar dos veces el mismo lote.
+
+    Si la publicación falla, el lote sigue en el outbox y se reintenta con
+    espera exponencial (hasta `max_backoff` segundos) mientras siga fallando.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        publisher: EventPublisher,
+        batch_size: int = 100,
+        poll_interval: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._wakeup = asyncio.Event()
+        self._consecutive_failures = 0
+
+        # Métricas
+        self.published = 0
+        self.failures = 0
+        self.lag_seconds = 0.0  # antigüedad del evento más viejo del último lote
+        self.last_run_at: datetime.datetime | None = None
+
+    def wake(self) -> None:
+        """Despierta al relay tras un commit para no esperar al siguiente poll"""
+        self._wakeup.set()
+
+    async def relay_once(self) -> int:
+        """Publica un lote de eventos pendientes. Retorna cuántos publicó"""
+        async with self.session_factory() as session:
+            async with session.begin():
+                stmt = (
+                    select(OutboxEvent)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                    .execution_options(prepared=False)
+                )
+                events = (await session.execute(stmt)).scalars().all()
+
+                now = datetime.datetime.utcnow()
+                self.last_run_at = now
+                if not events:
+                    self.lag_seconds = 0.0
+                    return 0
+
+                self.lag_seconds = (now - events[0].created_at).total_seconds()
+
+                # Si falla la publicación, el rollback libera los locks y el
+                # lote se reintenta en el siguiente ciclo
+                await self.publisher.publish_many(
+                    [(event.event_type, event.payload) for event in events]
+                )
+                await session.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.id.in_([event.id for event in events])
+                    )
+                )
+
+        self.published += len(events)
+        return len(events)
+
+    async def run_forever(self) -> None:
+        print("[*] Relay del outbox iniciado.")
+        while True:
+            try:
+                relayed = await self.relay_once()
+                self._consecutive_failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self._consecutive_failures += 1
+                backoff = min(
+                    self.poll_interval * 2**self._consecutive_failures,
+                    self.max_backoff,
+                )
+                print(
+                    f"[!] Error en relay del outbox (reintento en {backoff:.1f}s): {e}"
+                )
+                # El lote sigue en el outbox; un commit nuevo no acorta la espera
+                await asyncio.sleep(backoff)
+                continue
+
+            # Lote completo: probablemente quedan más, seguir sin esperar
+            if relayed >= self.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "failures": self.failures,
+            "consecutive_failures": self._consecutive_failures,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+outbox_relay = OutboxRelay(
+    AsyncSessionLocal,
+    publisher,
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval_ms / 1000,
+    max_backoff=settings.outbox_max_backoff_seconds,
+)
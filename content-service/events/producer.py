@@ -1,35 +1,96 @@
+import asyncio
 import json
 import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
 from config import settings
 
 
-async def publish_event(queue_name: str, payload: dict):
-    """Función genérica para publicar eventos"""
-    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
-    async with connection:
-        channel = await connection.channel()
-        queue = await channel.declare_queue(queue_name, durable=True)
+class EventPublisher:
+    """
+    Publicador de eventos persistente para RabbitMQ.
 
-        message = aio_pika.Message(body=json.dumps(payload).encode())
-        await channel.default_exchange.publish(message, routing_key=queue.name)
+    - Una sola conexión robusta para todo el proceso (se abre en el lifespan).
+    - Pool de canales con publisher confirms.
+    - Las colas se declaran una única vez y se cachean.
 
+    Solo lo usa el relay del outbox (events/outbox.py): los casos de uso
+    registran sus eventos con add_outbox_event en su propia transacción.
+    """
 
-# -------------------------------
-# Eventos específicos
-# -------------------------------
+    def __init__(self, url: str, pool_size: int = 4):
+        self.url = url
+        self.pool_size = pool_size
 
+        self._connection: AbstractRobustConnection | None = None
+        self._channels: Pool[AbstractChannel] | None = None
+        self._declared: set[str] = set()
+        self._declare_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
 
-async def publish_album_created_event(album_data: dict):
-    await publish_event("album_created", album_data)
+    async def _new_channel(self) -> AbstractChannel:
+        assert self._connection is not None
+        return await self._connection.channel(publisher_confirms=True)
 
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._connection is not None:
+                return
+            self._connection = await aio_pika.connect_robust(self.url)
+            self._channels = Pool(self._new_channel, max_size=self.pool_size)
+            print("[*] Publicador de eventos conectado a RabbitMQ.")
 
-async def publish_album_updated_event(album_data: dict):
-    await publish_event("album_updated", album_data)
+    async def stop(self) -> None:
+        if self._channels:
+            await self._channels.close()
+            self._channels = None
+        if self._connection:
+            await self._connection.close()
+            self._connection = None
+        self._declared.clear()
 
+    async def _ensure_queue(self, channel: AbstractChannel, queue_name: str) -> None:
+        if queue_name in self._declared:
+            return
+        async with self._declare_lock:
+            if queue_name not in self._declared:
+                await channel.declare_queue(queue_name, durable=True)
+                self._declared.add(queue_name)
 
-async def publish_song_created_event(song_data: dict):
-    await publish_event("song_created", song_data)
+    async def _send(self, messages: list[tuple[str, bytes]]) -> None:
+        """
+        Publica un lote en un canal del pool y espera todas las
+        confirmaciones. Si alguna falla se propaga: quien llama (el relay del
+        outbox) conserva el lote y lo reintenta; nada se descarta aquí.
+        """
+        if self._connection is None:
+            await self.start()
+        assert self._channels is not None
 
+        try:
+            async with self._channels.acquire() as channel:
+                for queue_name in {q for q, _ in messages}:
+                    await self._ensure_queue(channel, queue_name)
+                await asyncio.gather(
+                    *(
+                        channel.default_exchange.publish(
+                            aio_pika.Message(body=body), routing_key=queue_name
+                        )
+                        for queue_name, body in messages
+                    )
+                )
+        except Exception as e:
+            print(f"[!] No se confirmó la publicación de {len(messages)} eventos: {e}")
+            raise
 
-async def publish_song_updated_event(song_data: dict):
-    await publish_event("song_updated", song_data)
+    async def publish_many(self, events: list[tuple[str, dict]]) -> None:
+        """Publica un lote de (cola, payload) y espera todas las confirmaciones"""
+        await self._send(
+            [(queue_name, json.dumps(payload).encode()) for queue_name, payload in events]
+        )
+
+
+publisher = EventPublisher(
+    settings.rabbitmq_url,
+    pool_size=settings.event_channel_pool_size,
+)
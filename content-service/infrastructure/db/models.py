@@ -1,5 +1,6 @@
 import datetime
 from sqlalchemy import (
+    BigInteger,
     Integer,
     String,
     Text,
@@ -144,6 +145,13 @@ class Song(Base):
     title: Mapped[str] = mapped_column(String, nullable=False, index=True)
     duration: Mapped[int | None]  # segundos
     audio_url: Mapped[str | None] = mapped_column(Text)
+    # 🔹 Blob de audio direccionado por contenido (SHA-256)
+    audio_sha256: Mapped[str | None] = mapped_column(
+        String(64),
+        ForeignKey("music_streaming.audio_blobs.sha256"),
+        nullable=True,
+        index=True,
+    )
     track_number: Mapped[int | None]
 
     created_at: Mapped[datetime.datetime | None] = mapped_column(
@@ -161,3 +169,47 @@ class Song(Base):
 
     def __repr__(self) -> str:
         return f"<Song id={self.id} title={self.title} album_id={self.album_id}>"
+
+
+class AudioBlob(Base):
+    """
+    Archivo de audio almacenado una sola vez, direccionado por su SHA-256.
+    Varias canciones pueden apuntar al mismo blob; ref_count lleva la cuenta
+    y el archivo se elimina cuando llega a cero.
+    """
+
+    __tablename__ = "audio_blobs"
+    __table_args__ = {"schema": "music_streaming"}
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    path: Mapped[str] = mapped_column(Text, nullable=False)  # URL relativa
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    duration: Mapped[int | None]  # segundos
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<AudioBlob sha256={self.sha256} ref_count={self.ref_count}>"
+
+
+class OutboxEvent(Base):
+    """
+    Evento pendiente de publicar en RabbitMQ.
+    Se escribe en la misma transacción que el álbum/canción y lo publica
+    el relay en segundo plano (patrón transactional outbox).
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = {"schema": "music_streaming"}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String, nullable=False)  # nombre de cola
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEvent id={self.id} event_type={self.event_type}>"
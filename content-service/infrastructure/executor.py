@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from config import settings
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """
+    Ejecuta trabajo bloqueante (I/O de archivos, parsing de audio) fuera del
+    event loop, en un pool de hilos o de procesos.
+
+    - Backpressure: como máximo `max_pending` tareas en vuelo; el resto espera
+      su turno sin encolar más trabajo en el pool.
+    - Métricas: profundidad de cola, tareas en ejecución y latencia acumulada.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int, max_pending: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor no soportado: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._pool: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+        # Métricas
+        self.waiting = 0  # tareas esperando un hueco (backpressure)
+        self.in_flight = 0  # tareas enviadas al pool
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._slots = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Ejecuta fn(*args, **kwargs) en el pool y espera el resultado"""
+        if self._pool is None or self._slots is None:
+            # Arranque perezoso (p. ej. consumidores fuera de FastAPI)
+            self.start()
+        assert self._pool is not None and self._slots is not None
+
+        if kwargs:
+            fn = functools.partial(fn, **kwargs)
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, fn, *args)
+            self.completed += 1
+            return result
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queue_depth": self.waiting + max(self.in_flight - self.max_workers, 0),
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+# 🔹 Escrituras/lecturas de archivos: siempre hilos (los file handles no
+# pueden cruzar procesos)
+io_executor = BlockingExecutor(
+    "storage-io",
+    "thread",
+    settings.io_executor_workers,
+    settings.io_executor_workers * settings.executor_queue_factor,
+)
+
+# 🔹 Parsing de audio (mutagen y similares): hilos o procesos según config
+audio_executor = BlockingExecutor(
+    "audio",
+    settings.audio_executor_kind,
+    settings.audio_executor_workers,
+    settings.audio_executor_workers * settings.executor_queue_factor,
+)
+
+
+def start_executors() -> None:
+    io_executor.start()
+    audio_executor.start()
+
+
+def shutdown_executors() -> None:
+    audio_executor.shutdown()
+    io_executor.shutdown()
+
+
+def executors_stats() -> list[dict]:
+    return [io_executor.stats(), audio_executor.stats()]
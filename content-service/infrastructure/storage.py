@@ -0,0 +1,147 @@
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import IO, Iterable
+from infrastructure.executor import BlockingExecutor, io_executor
+from config import settings
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persiste la entrada de directorio tras un rename (POSIX)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _make_dirs(paths: list[Path]) -> None:
+    for path in paths:
+        path.mkdir(parents=True, exist_ok=True)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Escribe en un nombre temporal, fsync y rename atómico sobre `path`"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.parent / f".tmp-{uuid.uuid4().hex}{path.suffix}"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
+def _atomic_replace(src: Path, dst: Path) -> None:
+    os.replace(src, dst)
+    _fsync_dir(dst.parent)
+
+
+def _finish(f: IO[bytes]) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+
+
+class TempFileWriter:
+    """
+    Escritura incremental a un archivo temporal (p. ej. uploads en streaming).
+    El archivo no se publica hasta que se llama a AsyncStorage.replace().
+    """
+
+    def __init__(self, storage: "AsyncStorage", path: Path, f: IO[bytes]):
+        self.storage = storage
+        self.path = path
+        self._f = f
+
+    async def write(self, chunk: bytes) -> None:
+        started = time.perf_counter()
+        await self.storage.executor.run(self._f.write, chunk)
+        self.storage._record(len(chunk), time.perf_counter() - started)
+
+    async def finish(self) -> Path:
+        """Flush + fsync + close; el archivo temporal queda completo en disco"""
+        await self.storage.executor.run(_finish, self._f)
+        return self.path
+
+    async def abort(self) -> None:
+        await self.storage.executor.run(self._f.close)
+        await self.storage.remove(self.path)
+
+
+class AsyncStorage:
+    """
+    Acceso asíncrono al almacenamiento de archivos.
+
+    - Todas las operaciones de disco se ejecutan fuera del event loop.
+    - Las escrituras son atómicas: temp + fsync + rename, nunca queda un
+      archivo a medio escribir en la ruta final.
+    - La creación de directorios se agrupa en una sola operación.
+    - Lleva métricas de throughput de escritura.
+    """
+
+    def __init__(self, root: Path, executor: BlockingExecutor):
+        self.root = root
+        self.executor = executor
+        self.bytes_written = 0
+        self.writes = 0
+        self.write_seconds = 0.0
+
+    def _record(self, size: int, seconds: float) -> None:
+        self.bytes_written += size
+        self.writes += 1
+        self.write_seconds += seconds
+
+    async def ensure_dirs(self, paths: Iterable[Path]) -> None:
+        """Crea varios directorios en un solo salto al pool"""
+        await self.executor.run(_make_dirs, list(paths))
+
+    async def write_bytes(self, path: Path, data: bytes) -> Path:
+        started = time.perf_counter()
+        await self.executor.run(_atomic_write, path, data)
+        self._record(len(data), time.perf_counter() - started)
+        return path
+
+    async def open_temp(self, directory: Path, suffix: str = "") -> TempFileWriter:
+        """Abre un archivo temporal en `directory` (mismo filesystem que el destino)"""
+        await self.ensure_dirs([directory])
+        # La extensión se conserva al final para que mutagen detecte el formato
+        path = directory / f".upload-{uuid.uuid4().hex}{suffix}"
+        f = await self.executor.run(open, path, "wb")
+        return TempFileWriter(self, path, f)
+
+    async def replace(self, src: Path, dst: Path) -> Path:
+        """Rename atómico de src sobre dst"""
+        await self.executor.run(_atomic_replace, src, dst)
+        return dst
+
+    async def remove(self, path: Path) -> None:
+        await self.executor.run(path.unlink, missing_ok=True)
+
+    async def exists(self, path: Path) -> bool:
+        return await self.executor.run(path.exists)
+
+    def stats(self) -> dict:
+        return {
+            "bytes_written": self.bytes_written,
+            "writes": self.writes,
+            "write_seconds": round(self.write_seconds, 3),
+            "throughput_mb_s": round(
+                self.bytes_written / self.write_seconds / (1024 * 1024), 2
+            )
+            if self.write_seconds
+            else 0.0,
+        }
+
+
+storage = AsyncStorage(settings.storage_path, io_executor)
@@ -6,6 +6,15 @@ import asyncio
 from contextlib import asynccontextmanager
 
 from events.consumer import consume_events  # consumer del artist_created
+from events.producer import publisher
+from events.outbox import outbox_relay
+from core.services.artist_lookup import artist_identity_cache
+from infrastructure.storage import storage
+from infrastructure.executor import (
+    start_executors,
+    shutdown_executors,
+    executors_stats,
+)
 import uvicorn
 
 # -------------------------
@@ -13,16 +22,33 @@ import uvicorn
 # -------------------------
 @asynccontextmanager
 async def lifespan(_):
+    # Startup: pools para trabajo bloqueante (audio, archivos)
+    start_executors()
+    # Startup: conexión persistente para publicar eventos
+    # (si RabbitMQ aún no está disponible, se conecta en el primer evento)
+    try:
+        await publisher.start()
+    except Exception as e:
+        print(f"[!] No se pudo conectar el publicador de eventos: {e}")
+    # Startup: relay del outbox (publica los eventos confirmados en la BD)
+    relay_task = asyncio.create_task(outbox_relay.run_forever())
     # Startup: iniciar consumer en background
     task = asyncio.create_task(consume_events())
     print("[*] Consumer de artist_created iniciado en background.")
     yield
+    relay_task.cancel()
+    try:
+        await relay_task
+    except asyncio.CancelledError:
+        print("[*] Relay del outbox detenido correctamente.")
     # Shutdown: cancelar tarea si sigue corriendo
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
         print("[*] Consumer detenido correctamente.")
+    await publisher.stop()
+    shutdown_executors()
 
 
 # -------------------------
@@ -43,5 +69,29 @@ app.include_router(song_router)
 def health_check():
     return {"status": "ok"}
 
+
+# Métricas de los pools de trabajo bloqueante (profundidad de cola, etc.)
+@app.get("/health/executors")
+def executors_health():
+    return {"executors": executors_stats()}
+
+
+# Estado del relay del outbox (lag de publicación de eventos)
+@app.get("/health/outbox")
+def outbox_health():
+    return {"outbox": outbox_relay.stats()}
+
+
+# Aciertos/fallos de la caché de identidad user -> artist
+@app.get("/health/caches")
+def caches_health():
+    return {"artist_identity": artist_identity_cache.stats()}
+
+
+# Throughput de escritura del almacenamiento de archivos
+@app.get("/health/storage")
+def storage_health():
+    return {"storage": storage.stats()}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=True)
\ No newline at end of file
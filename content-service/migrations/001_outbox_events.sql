@@ -0,0 +1,10 @@
+-- Transactional outbox para eventos de álbumes y canciones.
+-- Las filas se insertan en la misma transacción que el cambio de negocio y
+-- el relay de content-service las publica y elimina en lotes.
+
+CREATE TABLE IF NOT EXISTS music_streaming.outbox_events (
+    id          BIGSERIAL PRIMARY KEY,
+    event_type  VARCHAR   NOT NULL,
+    payload     JSON      NOT NULL,
+    created_at  TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
@@ -0,0 +1,19 @@
+-- Almacenamiento de audio direccionado por contenido (deduplicación).
+-- Cada archivo se guarda una vez en storage/blobs/ab/cd/<sha256><ext> y las
+-- canciones lo referencian por su hash.
+
+CREATE TABLE IF NOT EXISTS music_streaming.audio_blobs (
+    sha256      VARCHAR(64) PRIMARY KEY,
+    path        TEXT        NOT NULL,
+    size        BIGINT      NOT NULL,
+    duration    INTEGER,
+    ref_count   INTEGER     NOT NULL DEFAULT 0,
+    created_at  TIMESTAMP   DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+ALTER TABLE music_streaming.songs
+    ADD COLUMN IF NOT EXISTS audio_sha256 VARCHAR(64)
+        REFERENCES music_streaming.audio_blobs (sha256);
+
+CREATE INDEX IF NOT EXISTS ix_music_streaming_songs_audio_sha256
+    ON music_streaming.songs (audio_sha256);
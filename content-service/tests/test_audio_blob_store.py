@@ -0,0 +1,228 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from core.services import audio_blob_store
+from core.services.audio_blob_store import AudioBlobStore
+from infrastructure.executor import shutdown_executors
+
+
+class FakeDatabase:
+    """Filas de audio_blobs confirmadas ({sha256: columnas})"""
+
+    def __init__(self):
+        self.committed: dict[str, dict] = {}
+
+
+class FakeSession:
+    """Transacción sobre FakeDatabase: commit publica, rollback descarta"""
+
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self.rows = copy.deepcopy(db.committed)
+
+    async def commit(self):
+        self.db.committed = copy.deepcopy(self.rows)
+
+    async def rollback(self):
+        self.rows = copy.deepcopy(self.db.committed)
+
+
+class FakeBlobRepository:
+    """Mismo contrato que AudioBlobRepository, en memoria"""
+
+    def __init__(self, session: FakeSession):
+        self.session = session
+
+    async def lock(self, sha256):
+        pass
+
+    async def exists(self, sha256):
+        return sha256 in self.session.rows
+
+    async def acquire_existing(self, sha256):
+        row = self.session.rows.get(sha256)
+        if row is None:
+            return None
+        row["ref_count"] += 1
+        return SimpleNamespace(sha256=sha256, **row)
+
+    async def acquire_new(self, sha256, path, size, duration):
+        row = self.session.rows.setdefault(
+            sha256, {"path": path, "size": size, "duration": duration, "ref_count": 0}
+        )
+        row["ref_count"] += 1
+        return SimpleNamespace(sha256=sha256, **row)
+
+    async def release(self, refs):
+        orphans = {}
+        for sha256, count in refs.items():
+            row = self.session.rows[sha256]
+            row["ref_count"] -= count
+            if row["ref_count"] <= 0:
+                orphans[sha256] = self.session.rows.pop(sha256)["path"]
+        return orphans
+
+
+class FakeUpload:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.size = None
+
+    async def read(self, n: int) -> bytes:
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+class InlineExecutor:
+    @staticmethod
+    async def run(fn, *args):
+        return fn(*args)
+
+
+AUDIO = b"ID3" + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "content_base_path", str(tmp_path))
+    # Sin audio real: los análisis devuelven valores fijos
+    monkeypatch.setattr(audio_blob_store, "audio_executor", InlineExecutor)
+    monkeypatch.setattr(
+        audio_blob_store, "extract_audio_metadata", lambda path: {"duration": 42}
+    )
+    monkeypatch.setattr(
+        audio_blob_store, "build_seek_index", lambda path, interval: b"seek"
+    )
+    monkeypatch.setattr(
+        audio_blob_store, "build_waveform", lambda path, points: b"peaks"
+    )
+    yield FakeDatabase()
+    shutdown_executors()
+
+
+def new_store(db: FakeDatabase) -> AudioBlobStore:
+    return AudioBlobStore(FakeBlobRepository(FakeSession(db)))
+
+
+async def upload(db: FakeDatabase, data: bytes = AUDIO):
+    """Sube un audio y confirma la transacción (como create_song)"""
+    store = new_store(db)
+    stored = await store.store_upload(FakeUpload(data), ".mp3")
+    await store.repo.session.commit()
+    return stored
+
+
+async def delete(db: FakeDatabase, sha256: str) -> None:
+    """Borra una canción: release, commit y GC (como delete_song)"""
+    store = new_store(db)
+    orphans = await store.release({sha256: 1})
+    await store.repo.session.commit()
+    await store.collect(orphans)
+
+
+def blob_files(root) -> list:
+    return sorted(
+        p.name
+        for p in (root / "blobs").rglob("*")
+        if p.is_file() and ".incoming" not in p.parts
+    )
+
+
+def incoming_files(root) -> list:
+    incoming = root / "blobs" / ".incoming"
+    return list(incoming.iterdir()) if incoming.exists() else []
+
+
+def test_same_bytes_share_one_blob(db, tmp_path):
+    first = asyncio.run(upload(db))
+    second = asyncio.run(upload(db))
+
+    assert not first.deduplicated
+    assert second.deduplicated
+    assert second.sha256 == first.sha256
+    assert second.audio_url == first.audio_url
+    assert db.committed[first.sha256]["ref_count"] == 2
+    assert len(db.committed) == 1
+    sha = first.sha256
+    assert blob_files(tmp_path) == [
+        f"{sha}.mp3",
+        f"{sha}.mp3.peaks",
+        f"{sha}.mp3.seek",
+    ]
+    assert incoming_files(tmp_path) == []
+
+
+def test_deleting_one_of_two_songs_keeps_the_file(db, tmp_path):
+    stored = asyncio.run(upload(db))
+    asyncio.run(upload(db))
+
+    asyncio.run(delete(db, stored.sha256))
+
+    assert db.committed[stored.sha256]["ref_count"] == 1
+    assert AudioBlobStore.resolve(stored.audio_url).exists()
+
+
+def test_deleting_the_last_song_removes_file_and_sidecars(db, tmp_path):
+    stored = asyncio.run(upload(db))
+    sidecars = [
+        AudioBlobStore.sidecar(stored.audio_url, suffix)
+        for suffix in audio_blob_store.SIDECAR_SUFFIXES
+    ]
+    assert all(path.exists() for path in sidecars)
+
+    asyncio.run(delete(db, stored.sha256))
+
+    assert db.committed == {}
+    assert not AudioBlobStore.resolve(stored.audio_url).exists()
+    assert not any(path.exists() for path in sidecars)
+    assert blob_files(tmp_path) == []
+
+
+def test_failure_after_the_blob_is_written_leaks_nothing(db, tmp_path, monkeypatch):
+    async def failing_acquire_new(self, *args):
+        # El audio y sus sidecars ya están en su ruta definitiva
+        assert blob_files(tmp_path)
+        raise RuntimeError("conexión perdida")
+
+    monkeypatch.setattr(FakeBlobRepository, "acquire_new", failing_acquire_new)
+    store = new_store(db)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.store_upload(FakeUpload(AUDIO), ".mp3"))
+
+    assert store.repo.session.rows == {}
+    assert db.committed == {}
+    assert blob_files(tmp_path) == []
+    assert incoming_files(tmp_path) == []
+
+
+def test_abort_after_a_new_blob_removes_it(db, tmp_path):
+    # La fila de la canción falló después de store_upload (create_song)
+    async def create_song_fails():
+        store = new_store(db)
+        stored = await store.store_upload(FakeUpload(AUDIO), ".mp3")
+        await store.abort(stored)
+
+    asyncio.run(create_song_fails())
+
+    assert db.committed == {}
+    assert blob_files(tmp_path) == []
+
+
+def test_abort_after_a_duplicate_keeps_the_shared_blob(db, tmp_path):
+    first = asyncio.run(upload(db))
+
+    async def create_song_fails():
+        store = new_store(db)
+        stored = await store.store_upload(FakeUpload(AUDIO), ".mp3")
+        assert stored.deduplicated
+        await store.abort(stored)
+
+    asyncio.run(create_song_fails())
+
+    assert db.committed[first.sha256]["ref_count"] == 1
+    assert AudioBlobStore.resolve(first.audio_url).exists()
@@ -0,0 +1,146 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core.services import album_service, audio_blob_store, song_service
+
+
+class FakeSession:
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+
+class FakeBlobStore:
+    """Registra el orden de release/collect respecto al borrado y al commit"""
+
+    def __init__(self, calls: list, refs: dict[str, int]):
+        self.calls = calls
+        self.repo = SimpleNamespace(refs_by_album=self._refs_by_album)
+        self._refs = refs
+
+    async def _refs_by_album(self, album_id):
+        self.calls.append("refs")
+        return self._refs
+
+    async def release(self, refs):
+        self.calls.append(("release", dict(refs)))
+        return {sha256: f"/storage/blobs/{sha256}.mp3" for sha256 in refs}
+
+    async def collect(self, blobs):
+        self.calls.append(("collect", sorted(blobs)))
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls: list = []
+    relay = SimpleNamespace(wake=lambda: calls.append("wake"))
+    for module in (song_service, album_service):
+        monkeypatch.setattr(
+            module,
+            "add_outbox_event",
+            lambda session, event_type, payload: calls.append(event_type),
+        )
+        monkeypatch.setattr(module, "outbox_relay", relay)
+        monkeypatch.setattr(module, "AudioBlobRepository", lambda session: None)
+    return calls
+
+
+def test_delete_song_releases_blob_after_deleting_the_row(calls, monkeypatch):
+    monkeypatch.setattr(
+        song_service, "AudioBlobStore", lambda repo: FakeBlobStore(calls, {})
+    )
+
+    async def delete(song):
+        calls.append("delete")
+
+    repo = SimpleNamespace(session=FakeSession(calls), delete=delete)
+    song = SimpleNamespace(id=7, audio_sha256="abc")
+
+    asyncio.run(song_service.SongService(repo).delete_song(song))
+
+    assert calls == [
+        "song_deleted",
+        "delete",
+        ("release", {"abc": 1}),
+        "commit",
+        "wake",
+        ("collect", ["abc"]),
+    ]
+
+
+def test_delete_song_without_blob_releases_nothing(calls, monkeypatch):
+    monkeypatch.setattr(
+        song_service, "AudioBlobStore", lambda repo: FakeBlobStore(calls, {})
+    )
+
+    async def delete(song):
+        calls.append("delete")
+
+    repo = SimpleNamespace(session=FakeSession(calls), delete=delete)
+    song = SimpleNamespace(id=7, audio_sha256=None)
+
+    asyncio.run(song_service.SongService(repo).delete_song(song))
+
+    assert calls == ["song_deleted", "delete", "commit", "wake", ("collect", [])]
+
+
+def test_delete_album_releases_blobs_after_deleting_the_rows(calls, monkeypatch):
+    refs = {"abc": 2, "def": 1}
+    monkeypatch.setattr(
+        album_service, "AudioBlobStore", lambda repo: FakeBlobStore(calls, refs)
+    )
+
+    async def delete(album):
+        calls.append("delete")
+
+    async def list_song_ids(album_id):
+        return [1, 2, 3]
+
+    repo = SimpleNamespace(
+        session=FakeSession(calls), delete=delete, list_song_ids=list_song_ids
+    )
+
+    asyncio.run(album_service.AlbumService(repo).delete_album(SimpleNamespace(id=3)))
+
+    assert calls == [
+        "refs",
+        "album_deleted",
+        "delete",
+        ("release", refs),
+        "commit",
+        "wake",
+        ("collect", ["abc", "def"]),
+    ]
+
+
+def test_collect_keeps_a_blob_registered_again(monkeypatch):
+    calls: list = []
+    removed: list = []
+
+    async def remove(path):
+        removed.append(path)
+
+    monkeypatch.setattr(audio_blob_store.storage, "remove", remove)
+
+    async def lock(sha256):
+        calls.append(("lock", sha256))
+
+    async def exists(sha256):
+        return sha256 == "abc"
+
+    repo = SimpleNamespace(session=FakeSession(calls), lock=lock, exists=exists)
+    store = audio_blob_store.AudioBlobStore(repo)
+
+    blobs = {"abc": "/storage/blobs/abc.mp3", "def": "/storage/blobs/def.mp3"}
+    asyncio.run(store.collect(blobs))
+
+    # Cada blob se revisa bajo su lock, que se libera con el rollback
+    assert calls == [("lock", "abc"), "rollback", ("lock", "def"), "rollback"]
+    assert removed and all("def" in str(path) for path in removed)
@@ -0,0 +1,66 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from fastapi import UploadFile
+from config import settings
+from infrastructure.storage import storage
+
+
+class AudioTooLargeError(ValueError):
+    """El archivo subido supera el tamaño máximo permitido"""
+
+
+@dataclass
+class IngestedAudio:
+    """Archivo de audio recibido en disco, pendiente de moverse a su destino final"""
+
+    temp_path: Path
+    size: int
+    sha256: str
+
+    async def commit(self, final_path: Path) -> Path:
+        """Mueve el archivo temporal a su ruta final de forma atómica"""
+        await storage.replace(self.temp_path, final_path)
+        self.temp_path = final_path
+        return final_path
+
+    async def discard(self) -> None:
+        """Elimina el archivo temporal (p. ej. si falla la creación de la canción)"""
+        await storage.remove(self.temp_path)
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    target_dir: Path,
+    suffix: str,
+    max_size: int | None = None,
+    chunk_size: int | None = None,
+) -> IngestedAudio:
+    """
+    Lee el upload por bloques y lo escribe directamente en un archivo temporal
+    dentro de target_dir, validando el tamaño y calculando el SHA-256 en una
+    sola pasada. Nunca mantiene el archivo completo en memoria.
+    """
+    max_size = max_size or settings.max_audio_size
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    # 🔹 Rechazo temprano si el cliente informó el tamaño
+    if upload.size is not None and upload.size > max_size:
+        raise AudioTooLargeError(f"El archivo supera {max_size} bytes")
+
+    digest = hashlib.sha256()
+    size = 0
+    writer = await storage.open_temp(target_dir, suffix)
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise AudioTooLargeError(f"El archivo supera {max_size} bytes")
+            digest.update(chunk)
+            await writer.write(chunk)
+        await writer.finish()
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return IngestedAudio(temp_path=writer.path, size=size, sha256=digest.hexdigest())
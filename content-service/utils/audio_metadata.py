@@ -0,0 +1,58 @@
+from mutagen._file import File as MutagenFile
+
+
+def extract_audio_metadata(file_path: str) -> dict:
+    """
+    Extrae metadatos del archivo de audio usando mutagen.
+    Trabaja directamente sobre el archivo ya recibido en disco.
+    Es una función de módulo (picklable) para poder ejecutarse en un
+    pool de procesos.
+    Retorna diccionario con duración y otros metadatos.
+    """
+    try:
+        # Cargar archivo con mutagen
+        audio_file = MutagenFile(file_path)
+
+        if audio_file is None:
+            raise ValueError("Formato de audio no soportado")
+
+        # Extraer metadatos básicos
+        metadata = {
+            "duration": int(audio_file.info.length) if audio_file.info else 0,
+            "bitrate": getattr(audio_file.info, "bitrate", None),
+            "sample_rate": getattr(audio_file.info, "sample_rate", None),
+            "channels": getattr(audio_file.info, "channels", None),
+        }
+
+        # Extraer tags comunes
+        if audio_file.tags:
+            metadata.update(
+                {
+                    "artist": str(audio_file.tags.get("TPE1", [""])[0])
+                    if "TPE1" in audio_file.tags
+                    else None,
+                    "album": str(audio_file.tags.get("TALB", [""])[0])
+                    if "TALB" in audio_file.tags
+                    else None,
+                    "title": str(audio_file.tags.get("TIT2", [""])[0])
+                    if "TIT2" in audio_file.tags
+                    else None,
+                    "track_number": str(audio_file.tags.get("TRCK", [""])[0]).split(
+                        "/"
+                    )[0]
+                    if "TRCK" in audio_file.tags
+                    else None,
+                    "genre": str(audio_file.tags.get("TCON", [""])[0])
+                    if "TCON" in audio_file.tags
+                    else None,
+                }
+            )
+
+        print(
+            f"[✓] Metadatos extraídos: duración={metadata['duration']}s, bitrate={metadata['bitrate']}"
+        )
+        return metadata
+
+    except Exception as e:
+        print(f"[!] Error extrayendo metadatos: {e}")
+        return {"duration": 0}
@@ -1,48 +1,45 @@
 from fastapi import HTTPException, status
-from core.services.artist_lookup import ArtistLookupService
 
 
-async def validate_song_ownership(song_repo, song_id: int, user_id: int, db):
-    """Valida que el usuario autenticado sea propietario de la canción"""
-    # Obtener el artist_id del usuario autenticado
-    requester_artist_id = await ArtistLookupService.get_artist_id_by_user(user_id, db)
-    print(f"DEBUG - User ID: {user_id}, Artist ID encontrado: {requester_artist_id}")
+async def validate_song_ownership(song_repo, song_id: int, user_id: int, db) -> int:
+    """
+    Valida que el usuario autenticado sea propietario de la canción.
+    Una sola consulta: obtiene el dueño (artist_id, user_id) de la canción.
+    Retorna el artist_id del propietario.
+    """
+    owner = await song_repo.get_owner_by_song(song_id)
 
-    if requester_artist_id is None:
+    if owner is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="El usuario no está registrado como artista",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Canción no encontrada"
         )
 
-    # Obtener el artist_id de la canción
-    owner_artist_id = await song_repo.get_artist_id_by_song(song_id)
-    print(f"DEBUG - Song ID: {song_id}, Owner Artist ID: {owner_artist_id}")
-
-    if owner_artist_id != requester_artist_id:
+    if owner.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para modificar esta canción",
         )
 
+    return owner.artist_id
+
 
-async def validate_album_ownership(album_repo, album_id: int, user_id: int, db):
-    """Valida que el usuario autenticado sea propietario del álbum"""
-    # Obtener el artist_id del usuario autenticado
-    requester_artist_id = await ArtistLookupService.get_artist_id_by_user(user_id, db)
-    print(f"DEBUG - User ID: {user_id}, Artist ID encontrado: {requester_artist_id}")
+async def validate_album_ownership(album_repo, album_id: int, user_id: int, db) -> int:
+    """
+    Valida que el usuario autenticado sea propietario del álbum.
+    Una sola consulta: obtiene el dueño (artist_id, user_id) del álbum.
+    Retorna el artist_id del propietario.
+    """
+    owner = await album_repo.get_owner_by_album(album_id)
 
-    if requester_artist_id is None:
+    if owner is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="El usuario no está registrado como artista",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Álbum no encontrado"
         )
 
-    # Obtener el artist_id del álbum
-    owner_artist_id = await album_repo.get_artist_id_by_album(album_id)
-    print(f"DEBUG - Album ID: {album_id}, Owner Artist ID: {owner_artist_id}")
-
-    if owner_artist_id != requester_artist_id:
+    if owner.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permiso para modificar este álbum",
         )
+
+    return owner.artist_id
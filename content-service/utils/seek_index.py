@@ -0,0 +1,362 @@
+"""
+Índice de búsqueda por tiempo (segundos -> offset en bytes) para MP3 y FLAC.
+
+Se calcula una vez al subir el audio y se guarda como sidecar binario junto
+al archivo ({audio}.seek). Un reproductor que quiere saltar al segundo `t`
+lee una sola entrada en lugar de adivinar offsets con peticiones Range.
+
+Formato (little-endian):
+
+    header  "<4sBBHIIQI"
+        magic        b"SKIX"
+        version      1
+        codec        1 = MP3, 2 = FLAC
+        reserved     0
+        interval_ms  separación temporal entre entradas
+        count        número de entradas
+        audio_bytes  tamaño del archivo de audio
+        duration_ms  duración total
+    entries count x uint64  offset en bytes del frame que contiene t = i * interval
+
+Búsqueda O(1): offset = entries[min(t_ms // interval_ms, count - 1)]
+"""
+
+import mmap
+import os
+import re
+import struct
+
+HEADER = struct.Struct("<4sBBHIIQI")
+MAGIC = b"SKIX"
+VERSION = 1
+CODEC_MP3 = 1
+CODEC_FLAC = 2
+
+# --------------------------------------------------------------------------
+# MP3
+# --------------------------------------------------------------------------
+
+# Bitrates (kbps) de Layer III: MPEG-1 y MPEG-2/2.5
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+
+
+def _parse_mp3_header(buf, pos: int):
+    """Retorna (frame_len, samples_per_frame, sample_rate, version, mono) o None"""
+    if pos + 4 > len(buf):
+        return None
+    b1, b2, b3 = buf[pos + 1], buf[pos + 2], buf[pos + 3]
+    if buf[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = {0b11: 1, 0b10: 2, 0b00: 25}.get((b1 >> 3) & 0b11)
+    layer = (b1 >> 1) & 0b11
+    bitrate_idx = b2 >> 4
+    sr_idx = (b2 >> 2) & 0b11
+    if version is None or layer != 0b01 or bitrate_idx in (0, 15) or sr_idx == 3:
+        return None  # solo Layer III con bitrate explícito
+    bitrate = _MP3_BITRATES[1 if version == 1 else 2][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][sr_idx]
+    padding = (b2 >> 1) & 1
+    samples = 1152 if version == 1 else 576
+    frame_len = (samples // 8) * bitrate // sample_rate + padding
+    mono = (b3 >> 6) == 0b11
+    return frame_len, samples, sample_rate, version, mono
+
+
+def _skip_id3v2(buf) -> int:
+    if len(buf) >= 10 and buf[:3] == b"ID3":
+        size = 0
+        for b in buf[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if buf[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _find_first_mp3_frame(buf, start: int):
+    """Primer frame válido: exige que el siguiente también lo sea"""
+    pos = start
+    end = min(len(buf), start + 64 * 1024)
+    while pos < end:
+        pos = buf.find(b"\xff", pos, end)
+        if pos < 0:
+            return None
+        header = _parse_mp3_header(buf, pos)
+        if header and _parse_mp3_header(buf, pos + header[0]):
+            return pos, header
+        pos += 1
+    return None
+
+
+def _offsets_from_points(points, interval: float, count: int, exact: bool):
+    """
+    Convierte puntos (segundo, offset) ordenados en una tabla por intervalo.
+    Con puntos exactos (inicio de cada frame) se toma el frame que contiene t;
+    con tablas gruesas (TOC, SEEKTABLE) se interpola linealmente.
+    """
+    offsets = []
+    j = 0
+    for i in range(count):
+        t = i * interval
+        while j + 1 < len(points) and points[j + 1][0] <= t:
+            j += 1
+        t0, o0 = points[j]
+        if exact:
+            offsets.append(o0)
+        elif j + 1 < len(points):
+            t1, o1 = points[j + 1]
+            frac = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+            offsets.append(int(o0 + (o1 - o0) * frac))
+        else:
+            offsets.append(o0)
+    return offsets
+
+
+def _mp3_toc_points(buf, first: int, header, file_size: int):
+    """Puntos de búsqueda desde la cabecera Xing/Info o VBRI del primer frame"""
+    frame_len, samples, sample_rate, version, mono = header
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+
+    # Xing / Info
+    xing = first + 4 + side_info
+    if buf[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", buf, xing + 4)[0]
+        pos = xing + 8
+        frames = total_bytes = None
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", buf, pos)[0]
+            pos += 4
+        if flags & 0x2:
+            total_bytes = struct.unpack_from(">I", buf, pos)[0]
+            pos += 4
+        if frames and flags & 0x4:
+            toc = buf[pos : pos + 100]
+            duration = frames * samples / sample_rate
+            total_bytes = total_bytes or (file_size - first)
+            points = [
+                (duration * i / 100, first + toc[i] * total_bytes // 256)
+                for i in range(100)
+            ]
+            points.append((duration, file_size))
+            return points, duration, False
+
+    # VBRI (Fraunhofer): siempre a 32 bytes tras la cabecera del frame
+    vbri = first + 4 + 32
+    if buf[vbri : vbri + 4] == b"VBRI":
+        # version, delay, quality, bytes | frames, entradas, escala, tamaño, frames/entrada
+        (frames, entries, scale, entry_size, frames_per_entry) = struct.unpack_from(
+            ">IHHHH", buf, vbri + 14
+        )
+        if frames and entries and entry_size in (1, 2, 3, 4):
+            duration = frames * samples / sample_rate
+            step = frames_per_entry * samples / sample_rate
+            points = [(0.0, first)]
+            offset = first
+            pos = vbri + 26
+            for i in range(entries):
+                offset += int.from_bytes(buf[pos : pos + entry_size], "big") * scale
+                pos += entry_size
+                points.append((min((i + 1) * step, duration), offset))
+            return points, duration, False
+
+    return None
+
+
+def _mp3_scan_points(buf, first: int):
+    """Fallback: recorre los frames (saltando por longitud) y registra su inicio"""
+    points = []
+    elapsed = 0.0
+    pos = first
+    size = len(buf)
+    while pos < size:
+        header = _parse_mp3_header(buf, pos)
+        if header is None:
+            # Resincronizar (basura, tags intermedios o fin del stream)
+            nxt = _find_first_mp3_frame(buf, pos + 1)
+            if nxt is None:
+                break
+            pos, header = nxt
+        frame_len, samples, sample_rate = header[0], header[1], header[2]
+        points.append((elapsed, pos))
+        elapsed += samples / sample_rate
+        pos += frame_len
+    return points, elapsed, True
+
+
+def _build_mp3(buf):
+    first_frame = _find_first_mp3_frame(buf, _skip_id3v2(buf))
+    if first_frame is None:
+        return None
+    first, header = first_frame
+    result = _mp3_toc_points(buf, first, header, len(buf))
+    if result is None:
+        result = _mp3_scan_points(buf, first)
+    return result
+
+
+# --------------------------------------------------------------------------
+# FLAC
+# --------------------------------------------------------------------------
+
+# Código de sincronización de frame: 14 bits a 1 + bit reservado + bit de
+# estrategia de bloque (fijo/variable)
+_FLAC_SYNC = re.compile(rb"\xff[\xf8\xf9]")
+
+
+def _crc8(data) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def _flac_frame_first_sample(buf, pos: int, fixed_block: int):
+    """Número de la primera muestra de un frame FLAC, o None si no es un header válido"""
+    if pos + 6 > len(buf) or buf[pos] != 0xFF or (buf[pos + 1] & 0xFE) != 0xF8:
+        return None
+    variable = buf[pos + 1] & 1
+    bs_code = buf[pos + 2] >> 4
+    sr_code = buf[pos + 2] & 0x0F
+    if bs_code == 0 or sr_code == 0x0F or buf[pos + 3] & 1:
+        return None
+
+    # Número de frame/muestra codificado estilo UTF-8 (hasta 7 bytes)
+    lead = buf[pos + 4]
+    n = 0  # bytes de continuación
+    mask = 0x40
+    if lead >= 0x80:
+        while lead & mask:
+            n += 1
+            mask >>= 1
+        if n == 0 or n > 6:
+            return None
+    value = lead & (mask - 1) if lead >= 0x80 else lead
+    cur = pos + 5
+    for _ in range(n):
+        if cur >= len(buf) or buf[cur] & 0xC0 != 0x80:
+            return None
+        value = (value << 6) | (buf[cur] & 0x3F)
+        cur += 1
+
+    # Campos opcionales de block size / sample rate al final del header
+    cur += {6: 1, 7: 2}.get(bs_code, 0)
+    cur += {12: 1, 13: 2, 14: 2}.get(sr_code, 0)
+    if cur >= len(buf) or _crc8(buf[pos:cur]) != buf[cur]:
+        return None
+
+    return value if variable else value * fixed_block
+
+
+def _build_flac(buf):
+    if buf[:4] != b"fLaC":
+        return None
+    pos = 4
+    sample_rate = total_samples = max_block = min_block = None
+    seekpoints = []
+    while pos + 4 <= len(buf):
+        block_header = buf[pos]
+        last = block_header & 0x80
+        block_type = block_header & 0x7F
+        length = int.from_bytes(buf[pos + 1 : pos + 4], "big")
+        data = pos + 4
+        if block_type == 0:  # STREAMINFO
+            min_block, max_block = struct.unpack_from(">HH", buf, data)
+            packed = int.from_bytes(buf[data + 10 : data + 18], "big")
+            sample_rate = packed >> 44
+            total_samples = packed & ((1 << 36) - 1)
+        elif block_type == 3:  # SEEKTABLE
+            for i in range(length // 18):
+                sample, offset, _ = struct.unpack_from(">QQH", buf, data + i * 18)
+                if sample != 0xFFFFFFFFFFFFFFFF:  # placeholder
+                    seekpoints.append((sample, offset))
+        pos = data + length
+        if last:
+            break
+
+    if not sample_rate or not total_samples:
+        return None
+    first_frame = pos
+    duration = total_samples / sample_rate
+
+    exact = len(seekpoints) < 2
+    if not exact:
+        points = [(s / sample_rate, first_frame + o) for s, o in sorted(seekpoints)]
+    else:
+        # Fallback: escanear los frames buscando el código de sincronización
+        fixed_block = max_block if min_block == max_block else 0
+        points = []
+        for match in _FLAC_SYNC.finditer(buf, first_frame):
+            cur = match.start()
+            sample = _flac_frame_first_sample(buf, cur, fixed_block)
+            if sample is None:
+                continue
+            seconds = sample / sample_rate
+            if not points or seconds > points[-1][0]:
+                points.append((seconds, cur))
+        if not points:
+            return None
+    if not exact:
+        points.append((duration, len(buf)))
+    return points, duration, exact
+
+
+# --------------------------------------------------------------------------
+# API pública
+# --------------------------------------------------------------------------
+
+
+def build_seek_index(file_path: str, interval_ms: int = 1000) -> bytes | None:
+    """
+    Construye el índice de búsqueda de un MP3/FLAC.
+    Retorna el sidecar serializado, o None si el formato no está soportado.
+    Función de módulo (picklable) para ejecutarse en el pool de audio.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                interval = interval_ms / 1000
+                if buf[:4] == b"fLaC":
+                    codec, result = CODEC_FLAC, _build_flac(buf)
+                else:
+                    codec, result = CODEC_MP3, _build_mp3(buf)
+                if result is None:
+                    return None
+                points, duration, exact = result
+                if not points or duration <= 0:
+                    return None
+                count = int(duration // interval) + 1
+                offsets = _offsets_from_points(points, interval, count, exact)
+                header = HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    codec,
+                    0,
+                    interval_ms,
+                    count,
+                    len(buf),
+                    int(duration * 1000),
+                )
+                return header + struct.pack(f"<{count}Q", *offsets)
+    except Exception as e:
+        print(f"[!] Error construyendo índice de búsqueda: {e}")
+        return None
+
+
+def lookup_offset(index: bytes, seconds: float) -> int:
+    """Offset en bytes para el segundo `seconds` (O(1))"""
+    magic, version, _, _, interval_ms, count, _, _ = HEADER.unpack_from(index)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Índice de búsqueda inválido")
+    i = min(max(int(seconds * 1000) // interval_ms, 0), count - 1)
+    return struct.unpack_from("<Q", index, HEADER.size + 8 * i)[0]
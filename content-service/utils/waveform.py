@@ -0,0 +1,212 @@
+"""
+Picos de forma de onda (waveform) precalculados al subir una canción.
+
+Se calculan una sola vez por blob de audio y se guardan junto a él como
+`<blob>.peaks`, para que el frontend dibuje la onda sin descargar el track.
+
+Formato del sidecar (little-endian):
+
+    Cabecera  struct "<4sBBHIII" (20 bytes)
+        magic            b"WVPK"
+        version          1
+        bits             8 (cada pico es un int8, escala -127..127)
+        channels         1 (todos los canales se combinan en cada pico)
+        sample_rate      Hz del audio original
+        samples_per_peak frames de audio que cubre cada pico
+        count            número de picos
+    Datos     count × (min int8, max int8), intercalados
+
+Decodificadores: WAV con la librería estándar (`wave`); FLAC/OGG con
+`soundfile` si está instalado. Otros formatos se agregan con
+`register_decoder`. Si no hay decodificador para la extensión, no se
+genera la onda (retorna None).
+"""
+
+import struct
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+WAVEFORM_MAGIC = b"WVPK"
+WAVEFORM_VERSION = 1
+WAVEFORM_HEADER = struct.Struct("<4sBBHIII")
+
+# Frames leídos por bloque: acota la memoria sin importar la duración
+BLOCK_FRAMES = 64 * 1024
+
+
+@dataclass
+class DecodedAudio:
+    sample_rate: int
+    channels: int
+    frames: int
+    full_scale: float  # valor absoluto máximo representable por las muestras
+    blocks: Iterator[np.ndarray]  # muestras intercaladas por canal
+
+
+Decoder = Callable[[str], DecodedAudio]
+
+# 🔹 Registro de decodificadores por extensión
+_DECODERS: dict[str, Decoder] = {}
+
+
+def register_decoder(*extensions: str) -> Callable[[Decoder], Decoder]:
+    """Registra un decodificador para una o más extensiones (p. ej. ".wav")"""
+
+    def decorator(decoder: Decoder) -> Decoder:
+        for ext in extensions:
+            _DECODERS[ext.lower()] = decoder
+        return decoder
+
+    return decorator
+
+
+def supported_extensions() -> list[str]:
+    return sorted(_DECODERS)
+
+
+# ======================================
+# Decodificadores
+# ======================================
+def _pcm_to_array(raw: bytes, sample_width: int) -> np.ndarray:
+    if sample_width == 1:
+        # WAV de 8 bits es sin signo, centrado en 128
+        return np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype="<i2")
+    if sample_width == 3:
+        # 24 bits: se expanden a int32 con extensión de signo
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        return ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8) >> 8
+    if sample_width == 4:
+        return np.frombuffer(raw, dtype="<i4")
+    raise ValueError(f"Ancho de muestra no soportado: {sample_width}")
+
+
+@register_decoder(".wav")
+def decode_wav(file_path: str) -> DecodedAudio:
+    wav = wave.open(file_path, "rb")
+    sample_width = wav.getsampwidth()
+
+    def blocks() -> Iterator[np.ndarray]:
+        try:
+            while True:
+                raw = wav.readframes(BLOCK_FRAMES)
+                if not raw:
+                    break
+                yield _pcm_to_array(raw, sample_width)
+        finally:
+            wav.close()
+
+    return DecodedAudio(
+        sample_rate=wav.getframerate(),
+        channels=wav.getnchannels(),
+        frames=wav.getnframes(),
+        full_scale=float(1 << (8 * sample_width - 1)),
+        blocks=blocks(),
+    )
+
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    # soundfile es opcional (necesita libsndfile); sin él solo hay WAV
+    soundfile = None
+
+if soundfile is not None:
+
+    @register_decoder(".flac", ".ogg")
+    def decode_soundfile(file_path: str) -> DecodedAudio:
+        sf = soundfile.SoundFile(file_path)
+
+        def blocks() -> Iterator[np.ndarray]:
+            with sf:
+                for block in sf.blocks(
+                    blocksize=BLOCK_FRAMES, dtype="int16", always_2d=True
+                ):
+                    yield block.reshape(-1)
+
+        return DecodedAudio(
+            sample_rate=sf.samplerate,
+            channels=sf.channels,
+            frames=sf.frames,
+            full_scale=32768.0,
+            blocks=blocks(),
+        )
+
+
+# ======================================
+# Cálculo de picos
+# ======================================
+def compute_peaks(audio: DecodedAudio, points: int) -> tuple[np.ndarray, int]:
+    """
+    Reduce el audio a `points` pares (min, max) en una sola pasada por bloques.
+    Retorna (array int8 de forma (n, 2), samples_per_peak).
+    """
+    samples_per_peak = max(1, -(-audio.frames // points))
+    # Cada pico cubre samples_per_peak frames de todos los canales
+    bucket = samples_per_peak * audio.channels
+
+    mins: list[np.ndarray] = []
+    maxs: list[np.ndarray] = []
+    carry = np.empty(0, dtype=np.int32)
+
+    for block in audio.blocks:
+        data = np.concatenate((carry, block)) if carry.size else block
+        full = (data.size // bucket) * bucket
+        if full:
+            chunk = data[:full].reshape(-1, bucket)
+            mins.append(chunk.min(axis=1))
+            maxs.append(chunk.max(axis=1))
+        carry = data[full:]
+
+    # El último pico cubre los frames restantes
+    if carry.size:
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+
+    if not mins:
+        return np.empty((0, 2), dtype=np.int8), samples_per_peak
+
+    scale = 127.0 / audio.full_scale
+    peaks = np.empty((sum(m.size for m in mins), 2), dtype=np.float32)
+    peaks[:, 0] = np.concatenate(mins) * scale
+    peaks[:, 1] = np.concatenate(maxs) * scale
+    return (
+        np.clip(np.rint(peaks), -127, 127).astype(np.int8),
+        samples_per_peak,
+    )
+
+
+def build_waveform(file_path: str, points: int = 1024) -> bytes | None:
+    """
+    Genera el sidecar .peaks de un archivo de audio.
+    Función de módulo (picklable) para ejecutarse en el pool de audio.
+    Retorna None si no hay decodificador para el formato o si falla.
+    """
+    decoder = _DECODERS.get(Path(file_path).suffix.lower())
+    if decoder is None:
+        return None
+
+    try:
+        audio = decoder(file_path)
+        if audio.frames <= 0 or audio.channels <= 0:
+            return None
+        peaks, samples_per_peak = compute_peaks(audio, points)
+    except Exception as e:
+        print(f"[!] Error generando waveform: {e}")
+        return None
+
+    header = WAVEFORM_HEADER.pack(
+        WAVEFORM_MAGIC,
+        WAVEFORM_VERSION,
+        8,
+        1,
+        audio.sample_rate,
+        samples_per_peak,
+        len(peaks),
+    )
+    return header + peaks.tobytes()
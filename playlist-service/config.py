@@ -10,6 +10,21 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     port: int = 8006
 
+    # 🔹 Máximo de canciones por llamada a POST /playlists/{id}/songs:batch
+    playlist_batch_max_songs: int = 500
+
+    # 🔹 Claves de orden: más largas que esto disparan un rebalanceo
+    playlist_position_max_length: int = 32
+
+    # 🔹 Paginación por cursor de GET /playlists/{id}/songs
+    playlist_songs_page_size: int = 100
+    playlist_songs_max_page_size: int = 500
+
+    # 🔹 Reconciliación de songs_count / total_duration: lotes chicos para
+    # que el bloqueo de cada lote dure poco
+    playlist_reconcile_seconds: int = 3600
+    playlist_reconcile_batch_size: int = 100
+
     class Config:
         env_file = ".env"
 
@@ -1,5 +1,5 @@
 # database/models.py - VERSIÓN MÍNIMA QUE FUNCIONA
-from sqlalchemy import Integer, String, Text, Date, ForeignKey, func
+from sqlalchemy import BigInteger, Integer, String, Text, Date, ForeignKey, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional
@@ -36,6 +36,9 @@ class Playlist(Base):
     updated_at: Mapped[date] = mapped_column(
         Date, server_default=func.current_date(), onupdate=func.current_date()
     )
+    # Totales desnormalizados: se actualizan junto con playlist_songs
+    songs_count: Mapped[int] = mapped_column(Integer, server_default="0")
+    total_duration: Mapped[int] = mapped_column(BigInteger, server_default="0")
 
 
 class PlaylistSong(Base):
@@ -49,6 +52,8 @@ class PlaylistSong(Base):
         ForeignKey("music_streaming.songs.id"), primary_key=True
     )
     added_at: Mapped[date] = mapped_column(Date, server_default=func.current_date())
+    # Clave de orden fraccionaria (utils/position_keys.py), comparada byte a byte
+    position: Mapped[str] = mapped_column(Text(collation="C"), nullable=False)
 
 
 class Artist(Base):
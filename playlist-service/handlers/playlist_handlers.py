@@ -1,8 +1,9 @@
 # handlers/playlist_handlers.py - Versión con debug mejorado
 from fastapi import APIRouter, Depends, Request, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from pydantic import BaseModel
+from typing import Optional, List
+from collections import Counter
+from pydantic import BaseModel, Field
 import logging
 import traceback
 from database.models import Playlist
@@ -30,6 +31,26 @@ class UpdatePlaylistRequest(BaseModel):
 
 class AddSongRequest(BaseModel):
     song_id: int
+    # Insertar justo después de esta canción (por defecto, al final)
+    after_song_id: Optional[int] = None
+
+
+class CopyPlaylistRequest(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+
+class MergePlaylistRequest(BaseModel):
+    source_playlist_id: int
+
+
+class MoveSongRequest(BaseModel):
+    # Nueva ubicación: justo después de esta canción (None: al principio)
+    after_song_id: Optional[int] = None
+
+
+class AddSongsBatchRequest(BaseModel):
+    song_ids: List[int] = Field(..., min_length=1)
 
 
 def _playlist_to_dict(playlist: Playlist) -> dict:
@@ -41,6 +62,8 @@ def _playlist_to_dict(playlist: Playlist) -> dict:
         "user_id": playlist.user_id,
         "created_at": playlist.created_at,
         "updated_at": playlist.updated_at,
+        "songs_count": playlist.songs_count,
+        "total_duration": playlist.total_duration,
     }
 
 
@@ -231,12 +254,20 @@ async def delete_playlist(
 async def get_playlist_songs(
     request: Request,
     playlist_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Obtener todas las canciones de una playlist"""
+    """
+    Obtener las canciones de una playlist, paginadas por cursor
+
+    Query Parameters:
+        limit: Canciones por página (default y máximo en settings)
+        cursor: `next_cursor` de la respuesta anterior
+    """
     try:
         logger.info(f"=== GET PLAYLIST SONGS DEBUG ===")
-        logger.info(f"Playlist ID: {playlist_id}")
+        logger.info(f"Playlist ID: {playlist_id}, limit: {limit}")
 
         user_id = request.state.user["user_id"]
 
@@ -251,11 +282,22 @@ async def get_playlist_songs(
                 detail="Playlist no encontrada o no tienes permisos para acceder a ella",
             )
 
-        # Obtener las canciones
-        songs = await service.get_playlist_songs(playlist_id)
+        # Obtener la página de canciones
+        songs, next_cursor = await service.get_playlist_songs(
+            playlist_id, limit, cursor
+        )
 
-        return {"playlist_id": playlist_id, "songs_count": len(songs), "songs": songs}
+        # Los totales vienen de los contadores de la playlist, no de la página
+        return {
+            "playlist_id": playlist_id,
+            "songs_count": playlist.songs_count,
+            "total_duration": playlist.total_duration,
+            "songs": songs,
+            "next_cursor": next_cursor,
+        }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -285,7 +327,7 @@ async def add_song_to_playlist(
         service = PlaylistService(repo, user_id)
 
         success, message = await service.add_song_to_playlist(
-            playlist_id, song_data.song_id
+            playlist_id, song_data.song_id, song_data.after_song_id
         )
 
         if not success:
@@ -307,6 +349,189 @@ async def add_song_to_playlist(
         )
 
 
+@router.post("/{playlist_id}/songs:batch", response_model=dict)
+async def add_songs_to_playlist(
+    request: Request,
+    playlist_id: int,
+    batch_data: AddSongsBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Añadir varias canciones a la playlist con un número fijo de consultas"""
+    try:
+        logger.info(f"=== ADD SONGS BATCH DEBUG ===")
+        logger.info(
+            f"Playlist ID: {playlist_id}, Songs: {len(batch_data.song_ids)}"
+        )
+
+        user_id = request.state.user["user_id"]
+
+        repo = PlaylistRepository(db)
+        service = PlaylistService(repo, user_id)
+
+        results = await service.add_songs_to_playlist(
+            playlist_id, batch_data.song_ids
+        )
+        if results is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Playlist no encontrada o no tienes permisos para modificarla",
+            )
+
+        return {
+            "playlist_id": playlist_id,
+            "results": results,
+            "summary": dict(Counter(r["status"] for r in results)),
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en add_songs_to_playlist: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500, detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@router.put("/{playlist_id}/songs/{song_id}/position", response_model=dict)
+async def move_song(
+    request: Request,
+    playlist_id: int,
+    song_id: int,
+    move_data: MoveSongRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Reordenar: mover una canción justo después de otra (o al principio)"""
+    try:
+        logger.info(f"=== MOVE SONG DEBUG ===")
+        logger.info(
+            f"Playlist ID: {playlist_id}, Song ID: {song_id}, After: {move_data.after_song_id}"
+        )
+
+        user_id = request.state.user["user_id"]
+
+        repo = PlaylistRepository(db)
+        service = PlaylistService(repo, user_id)
+
+        success, message = await service.move_song(
+            playlist_id, song_id, move_data.after_song_id
+        )
+
+        if not success:
+            raise HTTPException(status_code=404, detail=message)
+
+        return {
+            "message": message,
+            "playlist_id": playlist_id,
+            "song_id": song_id,
+            "after_song_id": move_data.after_song_id,
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en move_song: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500, detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@router.post("/{playlist_id}/copy", response_model=dict)
+async def copy_playlist(
+    request: Request,
+    playlist_id: int,
+    copy_data: Optional[CopyPlaylistRequest] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Duplicar una playlist con todas sus canciones y su orden"""
+    try:
+        logger.info(f"=== COPY PLAYLIST DEBUG ===")
+        logger.info(f"Playlist ID: {playlist_id}")
+
+        user_id = request.state.user["user_id"]
+        copy_data = copy_data or CopyPlaylistRequest()
+
+        repo = PlaylistRepository(db)
+        service = PlaylistService(repo, user_id)
+        playlist = await service.copy_playlist(
+            playlist_id, copy_data.name, copy_data.description
+        )
+
+        if playlist is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Playlist no encontrada o no tienes permisos para acceder",
+            )
+
+        return {
+            "message": "Playlist copiada correctamente",
+            "source_playlist_id": playlist_id,
+            "playlist": _playlist_to_dict(playlist),
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en copy_playlist: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500, detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
+@router.post("/{playlist_id}/merge", response_model=dict)
+async def merge_playlists(
+    request: Request,
+    playlist_id: int,
+    merge_data: MergePlaylistRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Agregar al final de la playlist las canciones de otra playlist"""
+    try:
+        logger.info(f"=== MERGE PLAYLISTS DEBUG ===")
+        logger.info(
+            f"Playlist ID: {playlist_id}, Source: {merge_data.source_playlist_id}"
+        )
+
+        user_id = request.state.user["user_id"]
+
+        repo = PlaylistRepository(db)
+        service = PlaylistService(repo, user_id)
+        playlist = await service.merge_playlists(
+            playlist_id, merge_data.source_playlist_id
+        )
+
+        if playlist is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Playlists no encontradas o no tienes permisos para modificarlas",
+            )
+
+        return {
+            "message": "Playlists fusionadas correctamente",
+            "source_playlist_id": merge_data.source_playlist_id,
+            "playlist": _playlist_to_dict(playlist),
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en merge_playlists: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500, detail=f"Error interno del servidor: {str(e)}"
+        )
+
+
 @router.delete("/{playlist_id}/songs/{song_id}", response_model=dict)
 async def remove_song_from_playlist(
     request: Request,
@@ -365,7 +590,9 @@ async def get_user_playlists(
                     "description": str,
                     "user_id": int,
                     "created_at": date,
-                    "updated_at": date
+                    "updated_at": date,
+                    "songs_count": int,
+                    "total_duration": int
                 }
             ],
             "pagination": {
@@ -2,14 +2,37 @@
 from fastapi import FastAPI
 from handlers.playlist_handlers import router as playlist_router
 from middleware.auth_middleware import AuthMiddleware
+from services.position_rebalancer import position_rebalancer
+from services.counter_reconciler import counter_reconciler
+import asyncio
+from contextlib import asynccontextmanager
 import uvicorn
 
+
+# -------------------------
+# Lifespan handler para startup y shutdown
+# -------------------------
+@asynccontextmanager
+async def lifespan(_):
+    # Startup: rebalanceo de claves de orden y reconciliación de totales
+    tasks = [
+        asyncio.create_task(position_rebalancer.run_forever()),
+        asyncio.create_task(counter_reconciler.run_forever()),
+    ]
+    yield
+    # Shutdown: detener las tareas en segundo plano
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 app = FastAPI(
     title="Playlist Service",
     version="0.1",
     description="Microservicio para gestión de playlists de música",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Middleware global
@@ -0,0 +1,35 @@
+-- Orden explícito de las canciones de una playlist: claves fraccionarias
+-- lexicográficas (ver utils/position_keys.py). Mover o insertar entre dos
+-- canciones reescribe solo la fila movida; COLLATE "C" hace que Postgres
+-- compare byte a byte, igual que Python.
+--
+-- CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+-- (psql sin --single-transaction).
+
+ALTER TABLE music_streaming.playlist_songs
+    ADD COLUMN IF NOT EXISTS position TEXT COLLATE "C";
+
+-- Filas existentes: se conserva el orden actual (added_at, song_id) con
+-- claves "h" + 8 dígitos, el mismo formato que usa el rebalanceo
+WITH ranked AS (
+    SELECT playlist_id,
+           song_id,
+           row_number() OVER (
+               PARTITION BY playlist_id ORDER BY added_at, song_id
+           ) AS rn
+    FROM music_streaming.playlist_songs
+    WHERE position IS NULL
+)
+UPDATE music_streaming.playlist_songs ps
+SET position = 'h' || lpad(ranked.rn::text, 8, '0')
+FROM ranked
+WHERE ps.playlist_id = ranked.playlist_id
+  AND ps.song_id = ranked.song_id;
+
+ALTER TABLE music_streaming.playlist_songs
+    ALTER COLUMN position SET NOT NULL;
+
+-- Listado ordenado, última posición (append) y vecinos de una posición;
+-- song_id desempata claves iguales (inserciones concurrentes)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS playlist_songs_playlist_position_idx
+    ON music_streaming.playlist_songs (playlist_id, position, song_id);
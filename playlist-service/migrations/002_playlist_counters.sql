@@ -0,0 +1,30 @@
+-- Totales desnormalizados por playlist: se mantienen en la misma
+-- transacción que cada alta/baja de canciones (PlaylistRepository) y un
+-- job de reconciliación corrige cualquier desvío (CounterReconciler).
+-- Listar las playlists de un usuario con sus totales es un solo scan del
+-- índice, sin join ni agregado por playlist.
+--
+-- CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+-- (psql sin --single-transaction).
+
+ALTER TABLE music_streaming.playlists
+    ADD COLUMN IF NOT EXISTS songs_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_duration BIGINT NOT NULL DEFAULT 0;
+
+-- Valores iniciales
+UPDATE music_streaming.playlists p
+SET songs_count = agg.songs_count,
+    total_duration = agg.total_duration
+FROM (
+    SELECT ps.playlist_id,
+           count(*) AS songs_count,
+           coalesce(sum(s.duration), 0) AS total_duration
+    FROM music_streaming.playlist_songs ps
+    JOIN music_streaming.songs s ON s.id = ps.song_id
+    GROUP BY ps.playlist_id
+) agg
+WHERE p.id = agg.playlist_id;
+
+-- get_user_playlists: WHERE user_id = ? ORDER BY created_at DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS playlists_user_created_idx
+    ON music_streaming.playlists (user_id, created_at DESC);
@@ -1,11 +1,15 @@
 # core/repositories/playlist_repository.py
 import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update, any_, bindparam, cast, literal, tuple_
+from sqlalchemy import Integer, Text
 from sqlalchemy import func as sql_func
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.orm import aliased
 from database.models import Playlist, PlaylistSong
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import date
+from utils.position_keys import key_between, keys_after
 
 
 class PlaylistRepository:
@@ -71,21 +75,92 @@ class PlaylistRepository:
         return True
 
     async def get_playlist_by_id(
-        self, playlist_id: int, user_id: int
+        self, playlist_id: int, user_id: int, for_update: bool = False
     ) -> Optional[Playlist]:
-        """Obtener una playlist por ID verificando permisos"""
+        """
+        Obtener una playlist por ID verificando permisos. Con `for_update`
+        bloquea la fila hasta el commit: las escrituras que calculan claves
+        de orden sobre la misma playlist se serializan.
+        """
         stmt = select(Playlist).where(
             Playlist.id == playlist_id, Playlist.user_id == user_id
         )
+        if for_update:
+            stmt = stmt.with_for_update()
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def _adjust_counters(self, playlist_id: int, songs: int, duration) -> None:
+        """
+        Ajusta songs_count / total_duration en la misma transacción que el
+        alta o baja de canciones (UPDATE atómico, sin leer los valores).
+        """
+        stmt = (
+            update(Playlist)
+            .where(Playlist.id == playlist_id)
+            .values(
+                songs_count=Playlist.songs_count + songs,
+                total_duration=Playlist.total_duration + duration,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+    async def _last_position(self, playlist_id: int) -> Optional[str]:
+        """Mayor clave de orden de la playlist (scan inverso del índice)"""
+        stmt = select(sql_func.max(PlaylistSong.position)).where(
+            PlaylistSong.playlist_id == playlist_id
+        )
+        return await self.session.scalar(stmt)
+
+    async def _neighbor_positions(
+        self,
+        playlist_id: int,
+        after_song_id: Optional[int],
+        exclude_song_id: Optional[int] = None,
+    ) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        Claves entre las que va una canción colocada justo después de
+        `after_song_id` (None: al principio). None si `after_song_id` no
+        está en la playlist.
+        """
+        lower = None
+        if after_song_id is not None:
+            stmt = select(PlaylistSong.position).where(
+                PlaylistSong.playlist_id == playlist_id,
+                PlaylistSong.song_id == after_song_id,
+            )
+            lower = await self.session.scalar(stmt)
+            if lower is None:
+                return None
+
+        stmt = select(PlaylistSong.position).where(
+            PlaylistSong.playlist_id == playlist_id
+        )
+        if lower is not None:
+            stmt = stmt.where(PlaylistSong.position > lower)
+        if exclude_song_id is not None:
+            stmt = stmt.where(PlaylistSong.song_id != exclude_song_id)
+        upper = await self.session.scalar(
+            stmt.order_by(PlaylistSong.position).limit(1)
+        )
+        return lower, upper
+
     async def get_playlist_songs(
-        self, playlist_id: int, user_id: int
+        self,
+        playlist_id: int,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Obtener todas las canciones de una playlist con formato específico:
-        album_url, nombre de la canción, artista
+        Obtener una página de canciones de una playlist con formato
+        específico: album_url, nombre de la canción, artista.
+
+        Paginación por keyset: las `limit` canciones siguientes a
+        `after` = (position, song_id), en orden de la playlist. Es un range
+        scan del índice (playlist_id, position, song_id), sin OFFSET: el
+        costo no depende de la página.
         """
         from database.models import Song, Album, Artist
 
@@ -103,14 +178,21 @@ class PlaylistRepository:
                 PlaylistSong.added_at,
                 Song.duration,
                 Song.id.label("song_id"),
+                PlaylistSong.position,
             )
             .select_from(PlaylistSong)
             .join(Song, PlaylistSong.song_id == Song.id)
             .join(Album, Song.album_id == Album.id)
             .join(Artist, Album.artist_id == Artist.id)
             .where(PlaylistSong.playlist_id == playlist_id)
-            .order_by(PlaylistSong.added_at.asc())  # Ordenar por fecha de agregado
+            # Orden de la playlist (song_id desempata claves iguales)
+            .order_by(PlaylistSong.position, PlaylistSong.song_id)
+            .limit(limit)
         )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(PlaylistSong.position, PlaylistSong.song_id) > tuple_(*after)
+            )
 
         result = await self.session.execute(stmt)
         songs_data = result.fetchall()
@@ -126,20 +208,31 @@ class PlaylistRepository:
                     "artist": song_data.artist_name,
                     "duration": song_data.duration,
                     "added_at": song_data.added_at,
+                    "position": song_data.position,
                 }
             )
 
         return formatted_songs
 
     async def add_song_to_playlist(
-        self, playlist_id: int, song_id: int, user_id: int
-    ) -> bool:
-        """Añadir una canción a la playlist verificando permisos"""
+        self,
+        playlist_id: int,
+        song_id: int,
+        user_id: int,
+        after_song_id: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Añadir una canción a la playlist verificando permisos: al final, o
+        justo después de `after_song_id`. Retorna su clave de orden, o None
+        si no se pudo añadir.
+        """
         try:
             # Verificar que la playlist pertenece al usuario
-            playlist = await self.get_playlist_by_id(playlist_id, user_id)
+            playlist = await self.get_playlist_by_id(
+                playlist_id, user_id, for_update=True
+            )
             if not playlist:
-                return False
+                return None
 
             # Verificar que la canción existe
             from database.models import Song
@@ -148,7 +241,7 @@ class PlaylistRepository:
             result = await self.session.execute(stmt)
             song = result.scalar_one_or_none()
             if not song:
-                return False
+                return None
 
             # Verificar si la canción ya está en la playlist
             stmt = select(PlaylistSong).where(
@@ -157,20 +250,200 @@ class PlaylistRepository:
             result = await self.session.execute(stmt)
             existing = result.scalar_one_or_none()
             if existing:
-                return True  # Ya existe, no es error
+                await self.session.commit()
+                return existing.position  # Ya existe, no es error
+
+            # Clave de orden: al final o entre la canción indicada y la siguiente
+            if after_song_id is None:
+                position = key_between(await self._last_position(playlist_id), None)
+            else:
+                neighbors = await self._neighbor_positions(playlist_id, after_song_id)
+                if neighbors is None:
+                    await self.session.rollback()
+                    return None
+                position = key_between(*neighbors)
 
             # Añadir la canción a la playlist
             playlist_song = PlaylistSong(
-                playlist_id=playlist_id, song_id=song_id, added_at=date.today()
+                playlist_id=playlist_id,
+                song_id=song_id,
+                added_at=date.today(),
+                position=position,
             )
 
             self.session.add(playlist_song)
+            await self._adjust_counters(playlist_id, 1, song.duration or 0)
             await self.session.commit()
-            return True
+            return position
 
         except Exception:
             await self.session.rollback()
-            return False
+            return None
+
+    async def move_song(
+        self,
+        playlist_id: int,
+        song_id: int,
+        user_id: int,
+        after_song_id: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Mover una canción justo después de `after_song_id` (None: al
+        principio). Solo se reescribe la clave de la canción movida.
+        Retorna la nueva clave, o None si la playlist, la canción o la
+        referencia no existen.
+        """
+        try:
+            playlist = await self.get_playlist_by_id(
+                playlist_id, user_id, for_update=True
+            )
+            if not playlist:
+                return None
+
+            neighbors = await self._neighbor_positions(
+                playlist_id, after_song_id, exclude_song_id=song_id
+            )
+            if neighbors is None:
+                await self.session.rollback()
+                return None
+
+            stmt = (
+                update(PlaylistSong)
+                .where(
+                    PlaylistSong.playlist_id == playlist_id,
+                    PlaylistSong.song_id == song_id,
+                )
+                .values(position=key_between(*neighbors))
+                .returning(PlaylistSong.position)
+            )
+            position = await self.session.scalar(stmt)
+            await self.session.commit()
+            return position
+
+        except Exception:
+            await self.session.rollback()
+            return None
+
+    async def rebalance_positions(self, playlist_id: int) -> int:
+        """
+        Reasigna claves cortas ("h" + 8 dígitos, como la migración) a toda
+        la playlist conservando el orden, en un solo UPDATE. Retorna la
+        cantidad de filas reescritas.
+        """
+        try:
+            # Bloquea la playlist: ninguna escritura calcula claves mientras tanto
+            await self.session.execute(
+                select(Playlist.id).where(Playlist.id == playlist_id).with_for_update()
+            )
+            ranked = (
+                select(
+                    PlaylistSong.song_id,
+                    sql_func.row_number()
+                    .over(order_by=(PlaylistSong.position, PlaylistSong.song_id))
+                    .label("rn"),
+                )
+                .where(PlaylistSong.playlist_id == playlist_id)
+                .subquery()
+            )
+            stmt = (
+                update(PlaylistSong)
+                .where(
+                    PlaylistSong.playlist_id == playlist_id,
+                    PlaylistSong.song_id == ranked.c.song_id,
+                )
+                .values(
+                    position=sql_func.concat(
+                        "h", sql_func.lpad(cast(ranked.c.rn, Text), 8, "0")
+                    )
+                )
+            )
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+            return result.rowcount
+
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def add_songs_to_playlist(
+        self, playlist_id: int, song_ids: List[int], user_id: int
+    ) -> Optional[Dict[int, str]]:
+        """
+        Añadir varias canciones en un número constante de consultas:
+        permisos (1), existencia de todas las canciones con = ANY (1) e
+        INSERT multi-fila con ON CONFLICT DO NOTHING (1).
+
+        Returns:
+            Resultado por song_id ("added", "already_in_playlist",
+            "song_not_found") o None si la playlist no pertenece al usuario
+        """
+        from database.models import Song
+
+        # Verificar que la playlist pertenece al usuario
+        playlist = await self.get_playlist_by_id(playlist_id, user_id, for_update=True)
+        if not playlist:
+            return None
+
+        # Ids únicos, en el orden en que llegaron
+        unique_ids = list(dict.fromkeys(song_ids))
+
+        try:
+            # Canciones existentes (y su duración): un solo parámetro array
+            stmt = select(Song.id, Song.duration).where(
+                Song.id == any_(bindparam("song_ids", unique_ids, type_=ARRAY(Integer)))
+            )
+            result = await self.session.execute(stmt)
+            durations = {song_id: duration or 0 for song_id, duration in result.all()}
+            existing = set(durations)
+
+            # Insertar las que existen al final, en el orden recibido; las que
+            # ya estaban se ignoran (su clave queda sin usar)
+            inserted: set[int] = set()
+            to_insert = [song_id for song_id in unique_ids if song_id in existing]
+            if to_insert:
+                positions = keys_after(
+                    await self._last_position(playlist_id), len(to_insert)
+                )
+                stmt = (
+                    pg_insert(PlaylistSong)
+                    .values(
+                        [
+                            {
+                                "playlist_id": playlist_id,
+                                "song_id": song_id,
+                                "added_at": date.today(),
+                                "position": position,
+                            }
+                            for song_id, position in zip(to_insert, positions)
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["playlist_id", "song_id"])
+                    .returning(PlaylistSong.song_id)
+                )
+                result = await self.session.execute(stmt)
+                inserted = set(result.scalars().all())
+
+            if inserted:
+                await self._adjust_counters(
+                    playlist_id,
+                    len(inserted),
+                    sum(durations[song_id] for song_id in inserted),
+                )
+            await self.session.commit()
+
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        outcomes: Dict[int, str] = {}
+        for song_id in unique_ids:
+            if song_id in inserted:
+                outcomes[song_id] = "added"
+            elif song_id in existing:
+                outcomes[song_id] = "already_in_playlist"
+            else:
+                outcomes[song_id] = "song_not_found"
+        return outcomes
 
     async def remove_song_from_playlist(
         self, playlist_id: int, song_id: int, user_id: int
@@ -178,7 +451,9 @@ class PlaylistRepository:
         """Eliminar una canción de la playlist verificando permisos"""
         try:
             # Verificar que la playlist pertenece al usuario
-            playlist = await self.get_playlist_by_id(playlist_id, user_id)
+            playlist = await self.get_playlist_by_id(
+                playlist_id, user_id, for_update=True
+            )
             if not playlist:
                 return False
 
@@ -192,7 +467,11 @@ class PlaylistRepository:
             if not playlist_song:
                 return False
 
+            from database.models import Song
+
             await self.session.delete(playlist_song)
+            duration = select(Song.duration).where(Song.id == song_id).scalar_subquery()
+            await self._adjust_counters(playlist_id, -1, -sql_func.coalesce(duration, 0))
             await self.session.commit()
             return True
 
@@ -200,6 +479,206 @@ class PlaylistRepository:
             await self.session.rollback()
             return False
 
+    async def _insert_songs_from(
+        self, target_id: int, source_id: int, prefix: Optional[str] = None
+    ) -> None:
+        """
+        Un solo statement: INSERT ... SELECT ... ON CONFLICT DO NOTHING de
+        las canciones de `source_id` en `target_id`, y en el mismo
+        statement (CTE) suma a los totales de `target_id` solo las filas
+        realmente insertadas.
+
+        Con `prefix=None` se copian las claves de orden tal cual; si no, se
+        generan claves nuevas prefix + nº de orden (8 dígitos) + "V", en el
+        orden de la playlist origen y todas mayores que `prefix`.
+        """
+        from database.models import Song
+
+        source = aliased(PlaylistSong)
+        if prefix is None:
+            position = source.position
+        else:
+            rank = sql_func.row_number().over(
+                order_by=(source.position, source.song_id)
+            )
+            position = sql_func.concat(
+                prefix, sql_func.lpad(cast(rank, Text), 8, "0"), "V"
+            )
+        rows = select(
+            literal(target_id, Integer),
+            source.song_id,
+            sql_func.current_date(),
+            position,
+        ).where(source.playlist_id == source_id)
+
+        inserted = (
+            pg_insert(PlaylistSong)
+            .from_select(["playlist_id", "song_id", "added_at", "position"], rows)
+            .on_conflict_do_nothing(index_elements=["playlist_id", "song_id"])
+            .returning(PlaylistSong.song_id)
+            .cte("inserted")
+        )
+        added = select(sql_func.count()).select_from(inserted).scalar_subquery()
+        duration = (
+            select(sql_func.coalesce(sql_func.sum(Song.duration), 0))
+            .select_from(inserted)
+            .join(Song, Song.id == inserted.c.song_id)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Playlist)
+            .where(Playlist.id == target_id)
+            .values(
+                songs_count=Playlist.songs_count + added,
+                total_duration=Playlist.total_duration + duration,
+            )
+            .add_cte(inserted)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+    async def copy_playlist(
+        self,
+        playlist_id: int,
+        user_id: int,
+        name: str,
+        description: Optional[str],
+    ) -> Optional[Playlist]:
+        """
+        Duplicar una playlist del usuario dentro de Postgres: la copia
+        conserva canciones, orden (mismas claves) y totales. Retorna la
+        playlist nueva, o None si la original no existe o no es del usuario.
+        """
+        try:
+            # Bloquear la original: nadie la modifica durante la copia
+            source = await self.get_playlist_by_id(
+                playlist_id, user_id, for_update=True
+            )
+            if not source:
+                return None
+
+            playlist = Playlist(user_id=user_id, name=name, description=description)
+            self.session.add(playlist)
+            await self.session.flush()  # asigna el id
+
+            await self._insert_songs_from(playlist.id, playlist_id)
+            await self.session.commit()
+            await self.session.refresh(playlist)
+            return playlist
+
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def merge_playlists(
+        self, target_id: int, source_id: int, user_id: int
+    ) -> Optional[Playlist]:
+        """
+        Agregar al final de `target_id` las canciones de `source_id` que aún
+        no tiene, en el orden de la origen, dentro de Postgres. Retorna la
+        playlist destino actualizada, o None si alguna de las dos no existe
+        o no es del usuario.
+        """
+        try:
+            # Bloquear ambas en orden de id (sin deadlocks entre merges cruzados)
+            stmt = (
+                select(Playlist)
+                .where(
+                    Playlist.id.in_([target_id, source_id]),
+                    Playlist.user_id == user_id,
+                )
+                .order_by(Playlist.id)
+                .with_for_update()
+            )
+            result = await self.session.execute(stmt)
+            playlists = {playlist.id: playlist for playlist in result.scalars().all()}
+            if len(playlists) < 2:
+                await self.session.rollback()
+                return None
+
+            # Todas las claves nuevas quedan después de la última del destino
+            prefix = key_between(await self._last_position(target_id), None)
+            await self._insert_songs_from(target_id, source_id, prefix)
+            await self.session.commit()
+
+            target = playlists[target_id]
+            await self.session.refresh(target)
+            return target
+
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def reconcile_counters(
+        self, after_id: int, limit: int
+    ) -> Tuple[Optional[int], int]:
+        """
+        Recalcula songs_count / total_duration de un lote de playlists
+        (id > after_id, hasta `limit`) y corrige las que se desviaron.
+        Las filas del lote se bloquean antes de agregar, así un alta
+        concurrente no se pisa con un total viejo. Las que ya están
+        bloqueadas por una edición en curso se saltan (SKIP LOCKED) en lugar
+        de esperar: se revisan en la siguiente pasada.
+
+        Returns:
+            (último id del lote o None si no quedan playlists, corregidas)
+        """
+        from database.models import Song
+
+        try:
+            stmt = (
+                select(Playlist.id)
+                .where(Playlist.id > after_id)
+                .order_by(Playlist.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            ids = list((await self.session.execute(stmt)).scalars().all())
+            if not ids:
+                await self.session.commit()
+                return None, 0
+
+            actual = (
+                select(
+                    Playlist.id.label("playlist_id"),
+                    sql_func.count(PlaylistSong.song_id).label("songs_count"),
+                    sql_func.coalesce(sql_func.sum(Song.duration), 0).label(
+                        "total_duration"
+                    ),
+                )
+                .select_from(Playlist)
+                .outerjoin(PlaylistSong, PlaylistSong.playlist_id == Playlist.id)
+                .outerjoin(Song, Song.id == PlaylistSong.song_id)
+                .where(Playlist.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+                .group_by(Playlist.id)
+                .subquery()
+            )
+            stmt = (
+                update(Playlist)
+                .where(
+                    Playlist.id == actual.c.playlist_id,
+                    sqlalchemy.or_(
+                        Playlist.songs_count != actual.c.songs_count,
+                        Playlist.total_duration != actual.c.total_duration,
+                    ),
+                )
+                .values(
+                    songs_count=actual.c.songs_count,
+                    total_duration=actual.c.total_duration,
+                    # Corregir un total no es una edición de la playlist
+                    updated_at=Playlist.updated_at,
+                )
+                .returning(Playlist.id)
+                .execution_options(synchronize_session=False)
+            )
+            repaired = len((await self.session.execute(stmt)).scalars().all())
+            await self.session.commit()
+            return ids[-1], repaired
+
+        except Exception:
+            await self.session.rollback()
+            raise
+
     async def get_user_playlists(
         self, user_id: int, limit: int = 50, offset: int = 0
     ) -> List[Playlist]:
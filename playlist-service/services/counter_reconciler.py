@@ -0,0 +1,54 @@
+# services/counter_reconciler.py
+import asyncio
+import logging
+from database.connection import AsyncSessionLocal
+from repositories.playlist_repository import PlaylistRepository
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CounterReconciler:
+    """
+    Job periódico que compara songs_count / total_duration con los datos
+    reales y corrige los desvíos (p. ej. canciones borradas o cuya
+    duración cambió en content-service). Recorre las playlists por lotes
+    de id, cada lote en su propia transacción corta; las playlists que se
+    están editando se saltan y se revisan en la siguiente pasada.
+    """
+
+    def __init__(self, interval: int = 3600, batch_size: int = 100):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.runs = 0
+        self.repaired = 0
+
+    async def reconcile(self) -> int:
+        repaired = 0
+        after_id = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                last_id, fixed = await PlaylistRepository(
+                    session
+                ).reconcile_counters(after_id, self.batch_size)
+            if last_id is None:
+                break
+            repaired += fixed
+            after_id = last_id
+        self.runs += 1
+        self.repaired += repaired
+        return repaired
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                repaired = await self.reconcile()
+                logger.info(f"Reconciliación de totales: {repaired} playlists corregidas")
+            except Exception as e:
+                logger.error(f"Error reconciliando totales de playlists: {e}")
+
+
+counter_reconciler = CounterReconciler(
+    settings.playlist_reconcile_seconds, settings.playlist_reconcile_batch_size
+)
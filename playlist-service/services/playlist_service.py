@@ -1,6 +1,9 @@
 # core/services/playlist_service.py
 from database.models import Playlist
 from repositories.playlist_repository import PlaylistRepository
+from services.position_rebalancer import position_rebalancer
+from utils.cursor import encode_cursor, decode_cursor
+from config import settings
 from typing import Optional, Dict, Any, List
 
 
@@ -53,43 +56,160 @@ class PlaylistService:
         """Obtener una playlist por ID"""
         return await self.repo.get_playlist_by_id(playlist_id, self.user_id)
 
-    async def get_playlist_songs(self, playlist_id: int) -> List[Dict[str, Any]]:
+    async def get_playlist_songs(
+        self,
+        playlist_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        Obtener todas las canciones de una playlist con formato específico
+        Obtener una página de canciones de una playlist con formato específico
 
         Args:
             playlist_id: ID de la playlist
+            limit: Tamaño de página (default y máximo en settings)
+            cursor: Token de la página anterior (None: primera página)
 
         Returns:
-            Lista de canciones con formato: album_url, song_name, artist, duration, added_at
+            (canciones con formato: album_url, song_name, artist, duration,
+            added_at, position; cursor de la página siguiente o None)
         """
-        return await self.repo.get_playlist_songs(playlist_id, self.user_id)
+        if limit is None or limit < 1:
+            limit = settings.playlist_songs_page_size
+        limit = min(limit, settings.playlist_songs_max_page_size)
+        after = decode_cursor(cursor) if cursor else None  # ValueError -> 400
+
+        # Una fila extra indica si hay página siguiente
+        songs = await self.repo.get_playlist_songs(
+            playlist_id, self.user_id, limit + 1, after
+        )
+        next_cursor = None
+        if len(songs) > limit:
+            songs = songs[:limit]
+            next_cursor = encode_cursor(songs[-1]["position"], songs[-1]["song_id"])
+        return songs, next_cursor
 
     async def add_song_to_playlist(
-        self, playlist_id: int, song_id: int
+        self, playlist_id: int, song_id: int, after_song_id: Optional[int] = None
     ) -> tuple[bool, str]:
         """
-        Añadir una canción a la playlist
+        Añadir una canción a la playlist (al final, o justo después de
+        `after_song_id`)
 
         Returns:
             tuple[bool, str]: (success, message)
         """
         try:
-            success = await self.repo.add_song_to_playlist(
-                playlist_id, song_id, self.user_id
+            position = await self.repo.add_song_to_playlist(
+                playlist_id, song_id, self.user_id, after_song_id
             )
 
-            if success:
+            if position is not None:
+                position_rebalancer.check(playlist_id, position)
                 return True, "Canción añadida correctamente a la playlist"
             else:
                 return (
                     False,
-                    "No se pudo añadir la canción. Verifica que la playlist te pertenece y que la canción existe.",
+                    "No se pudo añadir la canción. Verifica que la playlist te pertenece, que la canción existe y que la canción de referencia está en la playlist.",
                 )
 
         except Exception as e:
             return False, f"Error interno: {str(e)}"
 
+    async def add_songs_to_playlist(
+        self, playlist_id: int, song_ids: List[int]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Añadir varias canciones a la playlist en una sola operación
+
+        Returns:
+            Lista con el resultado de cada song_id en el orden recibido
+            (los repetidos se marcan "duplicate_in_request"), o None si la
+            playlist no existe o no pertenece al usuario
+        """
+        if not song_ids:
+            raise ValueError("Debe indicar al menos una canción")
+        if len(song_ids) > settings.playlist_batch_max_songs:
+            raise ValueError(
+                f"No se pueden añadir más de {settings.playlist_batch_max_songs} "
+                "canciones por llamada"
+            )
+
+        outcomes = await self.repo.add_songs_to_playlist(
+            playlist_id, song_ids, self.user_id
+        )
+        if outcomes is None:
+            return None
+
+        results = []
+        seen: set[int] = set()
+        for song_id in song_ids:
+            status = "duplicate_in_request" if song_id in seen else outcomes[song_id]
+            seen.add(song_id)
+            results.append({"song_id": song_id, "status": status})
+        return results
+
+    async def move_song(
+        self, playlist_id: int, song_id: int, after_song_id: Optional[int] = None
+    ) -> tuple[bool, str]:
+        """
+        Mover una canción justo después de `after_song_id` (None: al principio)
+
+        Returns:
+            tuple[bool, str]: (success, message)
+        """
+        if after_song_id == song_id:
+            raise ValueError("Una canción no puede moverse después de sí misma")
+
+        try:
+            position = await self.repo.move_song(
+                playlist_id, song_id, self.user_id, after_song_id
+            )
+
+            if position is not None:
+                position_rebalancer.check(playlist_id, position)
+                return True, "Canción movida correctamente"
+            else:
+                return (
+                    False,
+                    "No se pudo mover la canción. Verifica que la playlist te pertenece y que ambas canciones están en la playlist.",
+                )
+
+        except Exception as e:
+            return False, f"Error interno: {str(e)}"
+
+    async def copy_playlist(
+        self,
+        playlist_id: int,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Optional[Playlist]:
+        """Duplicar una playlist (por defecto, "<nombre> (copia)")"""
+        if name is not None and not name.strip():
+            raise ValueError("El nombre de la playlist no puede estar vacío")
+
+        source = await self.repo.get_playlist_by_id(playlist_id, self.user_id)
+        if source is None:
+            return None
+
+        return await self.repo.copy_playlist(
+            playlist_id,
+            self.user_id,
+            name.strip() if name else f"{source.name} (copia)",
+            description.strip() if description else source.description,
+        )
+
+    async def merge_playlists(
+        self, playlist_id: int, source_playlist_id: int
+    ) -> Optional[Playlist]:
+        """Agregar a la playlist las canciones de otra que aún no tiene"""
+        if playlist_id == source_playlist_id:
+            raise ValueError("No se puede fusionar una playlist consigo misma")
+
+        return await self.repo.merge_playlists(
+            playlist_id, source_playlist_id, self.user_id
+        )
+
     async def remove_song_from_playlist(
         self, playlist_id: int, song_id: int
     ) -> tuple[bool, str]:
@@ -158,6 +278,8 @@ class PlaylistService:
                     "user_id": playlist.user_id,
                     "created_at": playlist.created_at,
                     "updated_at": playlist.updated_at,
+                    "songs_count": playlist.songs_count,
+                    "total_duration": playlist.total_duration,
                 }
                 playlist_list.append(playlist_dict)
 
@@ -0,0 +1,56 @@
+# services/position_rebalancer.py
+import asyncio
+import logging
+from typing import Optional
+from database.connection import AsyncSessionLocal
+from repositories.playlist_repository import PlaylistRepository
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PositionRebalancer:
+    """
+    Rebalanceo en segundo plano de las claves de orden de una playlist.
+
+    Insertar repetidamente entre las mismas dos canciones alarga la clave
+    nueva; cuando una escritura produce una clave más larga que
+    `max_length`, la playlist se encola y se reescribe completa con claves
+    cortas (un UPDATE). Solo ocurre en ese caso: agregar al final o mover
+    canciones no dispara trabajo O(n).
+    """
+
+    def __init__(self, max_length: int = 32):
+        self.max_length = max_length
+        self._pending: asyncio.Queue[int] = asyncio.Queue()
+        self._queued: set[int] = set()
+        self.rebalanced = 0
+
+    def check(self, playlist_id: int, position: Optional[str]) -> None:
+        """Encola la playlist si la clave recién escrita es demasiado larga"""
+        if (
+            position is not None
+            and len(position) > self.max_length
+            and playlist_id not in self._queued
+        ):
+            self._queued.add(playlist_id)
+            self._pending.put_nowait(playlist_id)
+
+    async def run_forever(self) -> None:
+        while True:
+            playlist_id = await self._pending.get()
+            self._queued.discard(playlist_id)
+            try:
+                async with AsyncSessionLocal() as session:
+                    rows = await PlaylistRepository(session).rebalance_positions(
+                        playlist_id
+                    )
+                self.rebalanced += 1
+                logger.info(
+                    f"Posiciones de la playlist {playlist_id} rebalanceadas ({rows} canciones)"
+                )
+            except Exception as e:
+                logger.error(f"Error rebalanceando la playlist {playlist_id}: {e}")
+
+
+position_rebalancer = PositionRebalancer(settings.playlist_position_max_length)
@@ -0,0 +1,38 @@
+import base64
+import json
+
+import pytest
+
+from utils.cursor import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "position, song_id", [("a0", 1), ("a0V", 42), ("Zz", 0), ("b00ñ", 2**40)]
+)
+def test_round_trip(position, song_id):
+    token = encode_cursor(position, song_id)
+    assert "=" not in token
+    assert decode_cursor(token) == (position, song_id)
+
+
+def _token(payload) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "no-es-base64!",
+        base64.urlsafe_b64encode(b"no es json").decode(),
+        _token([1, 2]),
+        _token({"v": 99, "p": "a0", "s": 1}),
+        _token({"v": 1, "p": 5, "s": 1}),
+        _token({"v": 1, "p": "a0", "s": "1"}),
+        _token({"v": 1, "p": "a0"}),
+    ],
+)
+def test_invalid_token_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
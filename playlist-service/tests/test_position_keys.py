@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from utils.position_keys import DIGITS, key_between, keys_after, validate_key
+
+
+def test_first_key():
+    assert key_between(None, None) == "a0"
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("a0", "a1"),
+        ("a0", "a0V"),
+        ("a0V", "a1"),
+        ("a1", "a2"),
+        ("az", "b00"),
+        ("Zz", "a0"),
+        ("a0", "az"),
+    ],
+)
+def test_key_between_is_strictly_between(a, b):
+    key = key_between(a, b)
+    validate_key(key)
+    assert a < key < b
+
+
+@pytest.mark.parametrize("key", ["a0", "a1", "az", "b00", "Zz", "a0V"])
+def test_unbounded_sides(key):
+    before = key_between(None, key)
+    after = key_between(key, None)
+    validate_key(before)
+    validate_key(after)
+    assert before < key < after
+
+
+def test_repeated_inserts_keep_order():
+    # Insertar siempre en el mismo hueco alarga la fracción sin romper el orden
+    low, high = "a0", "a1"
+    for _ in range(200):
+        key = key_between(low, high)
+        assert low < key < high
+        high = key
+
+    low, high = "a0", "a1"
+    for _ in range(200):
+        key = key_between(low, high)
+        assert low < key < high
+        low = key
+
+
+def test_random_inserts_match_list_order():
+    rng = random.Random(7)
+    keys = [key_between(None, None)]
+    for _ in range(500):
+        i = rng.randint(0, len(keys))
+        a = keys[i - 1] if i > 0 else None
+        b = keys[i] if i < len(keys) else None
+        keys.insert(i, key_between(a, b))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_keys_after_is_increasing():
+    keys = keys_after("a0", 100)
+    assert len(keys) == 100
+    assert keys == sorted(keys)
+    assert keys[0] > "a0"
+    assert keys_after(None, 2) == ["a0", "a1"]
+    # Crece por la parte entera: cruza "az" -> "b00"
+    assert "b00" in keys_after("ay", 3)
+
+
+def test_rejects_unordered_bounds():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+    with pytest.raises(ValueError):
+        key_between("a1", "a1")
+
+
+@pytest.mark.parametrize("key", ["a00", "a10", "b0", "!0", "A" + "0" * 26])
+def test_validate_key_rejects_invalid(key):
+    with pytest.raises(ValueError):
+        validate_key(key)
+
+
+def test_bounds_of_the_key_space():
+    smallest = "A" + DIGITS[0] * 26
+    key = key_between(None, smallest + "1")
+    assert smallest < key < smallest + "1"
+
+    largest = "z" + DIGITS[-1] * 26
+    assert key_between(largest, None) > largest
@@ -0,0 +1,27 @@
+import base64
+import json
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(position: str, song_id: int) -> str:
+    """Token opaco con la última (position, song_id) de la página"""
+    payload = {"v": CURSOR_VERSION, "p": position, "s": song_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> tuple[str, int]:
+    """Lanza ValueError si el token no es válido"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("Cursor inválido")
+    position, song_id = payload.get("p"), payload.get("s")
+    if not isinstance(position, str) or not isinstance(song_id, int):
+        raise ValueError("Cursor inválido")
+    return position, song_id
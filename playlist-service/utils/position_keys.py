@@ -0,0 +1,156 @@
+"""
+Claves de orden fraccionarias (lexicográficas) para las canciones de una
+playlist.
+
+Una clave es una parte entera de longitud variable seguida de una fracción
+en base 62: "a0", "a1", ..., "az", "b00", ... y "a0V" entre "a0" y "a1".
+Se comparan byte a byte (COLLATE "C" en Postgres, str en Python), así que
+siempre existe una clave entre dos claves distintas: mover o insertar una
+canción reescribe solo su fila.
+
+- La cabecera indica la longitud de la parte entera: "a".."z" son enteros
+  positivos de 1 a 26 dígitos, "A".."Z" negativos de 26 a 1 dígitos.
+- Agregar al final incrementa la parte entera (las claves crecen de forma
+  logarítmica); insertar entre dos claves vecinas alarga la fracción.
+- La fracción nunca termina en "0", para que siempre haya lugar antes.
+
+Basado en el algoritmo de "fractional indexing" (D. Greenspan).
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_ZERO = DIGITS[0]
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Cabecera de clave inválida: {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    """(parte entera, fracción)"""
+    length = _integer_length(key[0])
+    if len(key) < length:
+        raise ValueError(f"Clave inválida: {key!r}")
+    return key[:length], key[length:]
+
+
+def validate_key(key: str) -> None:
+    if key == _SMALLEST_INTEGER:
+        raise ValueError(f"Clave inválida: {key!r}")
+    _, fraction = _split(key)
+    if fraction.endswith(_ZERO):
+        raise ValueError(f"Clave inválida: {key!r}")
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Fracción entre a y b (b=None: sin cota superior); requiere a < b"""
+    if b is not None:
+        # Prefijo común (a se completa con ceros a la derecha)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else _ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[round((digit_a + digit_b) / 2)]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+    # Acarreo: la parte entera cambia de longitud
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """
+    Clave estrictamente entre a y b. None significa sin cota: (None, b) es
+    "antes de b", (a, None) es "después de a" y (None, None) la primera.
+    """
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Las claves no están en orden: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + _ZERO
+        int_b, frac_b = _split(b)
+        if int_b == _SMALLEST_INTEGER:
+            return int_b + _midpoint("", frac_b)
+        if int_b < b:
+            return int_b
+        result = _decrement_integer(int_b)
+        if result is None:
+            raise ValueError("No hay claves anteriores disponibles")
+        return result
+
+    int_a, frac_a = _split(a)
+    if b is None:
+        result = _increment_integer(int_a)
+        return result if result is not None else int_a + _midpoint(frac_a, None)
+
+    int_b, frac_b = _split(b)
+    if int_a == int_b:
+        return int_a + _midpoint(frac_a, frac_b)
+    result = _increment_integer(int_a)
+    if result is None:
+        raise ValueError("No hay claves posteriores disponibles")
+    if result < b:
+        return result
+    return int_a + _midpoint(frac_a, None)
+
+
+def keys_after(a: str | None, n: int) -> list[str]:
+    """n claves consecutivas después de a (agregar varias canciones al final)"""
+    keys = []
+    for _ in range(n):
+        a = key_between(a, None)
+        keys.append(a)
+    return keys
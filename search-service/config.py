@@ -10,6 +10,71 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     port: int = 8006
 
+    # 🔹 Pool de conexiones: cada búsqueda en BD abre 3 sesiones en paralelo
+    # (canciones, álbumes, artistas) y se admiten db_search_concurrency
+    # búsquedas a la vez por proceso; el resto espera turno dentro de
+    # search_entity_timeout_ms (si no lo obtiene, responde partial). El pool se
+    # amplía si hace falta hasta 3 * db_search_concurrency conexiones.
+    # El total es por proceso: multiplicar por el número de workers y
+    # mantenerlo bajo el límite de clientes del pooler de Supabase.
+    db_search_concurrency: int = 3
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: int = 5
+    search_entity_timeout_ms: int = 800  # incluye la espera por turno y conexión
+
+    # 🔹 Caché de resultados ordenados por consulta (paginado por cursor):
+    # se ordenan search_max_results por entidad y, si un cursor pide más
+    # allá, se vuelve a ordenar con el doble de profundidad hasta
+    # search_max_depth (más lejos, la respuesta lo indica en "truncated")
+    search_max_results: int = 200
+    search_max_depth: int = 2000
+    search_cache_size: int = 1000
+    search_cache_ttl_seconds: int = 60
+    rabbitmq_url: str = Field(alias="RABBITMQ_URL")
+
+    # 🔹 Motor de búsqueda: "memory" (índice de trigramas en memoria),
+    # "trigram" (pg_trgm en Postgres) o "fuzzy" (ILIKE + rapidfuzz).
+    # Todos requieren migrations/001_trgm_indexes.sql aplicada (claves *_key
+    # y pg_trgm): "fuzzy" también es el respaldo de "memory" hasta que el
+    # índice está listo
+    search_engine: str = "memory"
+    fuzzy_threshold: int = 70
+    trigram_threshold: float = 0.3  # pg_trgm.word_similarity_threshold
+    index_min_overlap: float = 0.3  # fracción de trigramas de la consulta
+    index_max_candidates: int = 2000  # candidatos a re-ordenar por consulta
+    index_load_batch_size: int = 10_000
+
+    # 🔹 Índice compartido en disco (mmap): "builder" mantiene el índice y
+    # publica generaciones; "worker" solo las mapea (uvicorn --workers N,
+    # con el constructor aparte: python -m search_index.builder)
+    index_role: str = "builder"
+    index_dir: str = "data/index"
+    index_publish_seconds: int = 30
+    index_poll_seconds: float = 2.0
+    index_keep_generations: int = 3
+    index_snapshot_max_age_seconds: int = 3600  # más viejo: carga desde la BD
+
+    # 🔹 Autocompletado (/search/suggest)
+    suggest_top_n: int = 20  # máximo de sugerencias por prefijo
+    suggest_max_words: int = 4  # comienzos de palabra indexados por título
+    suggest_refresh_seconds: int = 60
+
+    # 🔹 Popularidad (eventos song_played) como bonus de ranking
+    popularity_half_life_hours: float = 72  # vida media de una reproducción
+    popularity_boost_weight: float = 10.0  # puntos máximos sobre similitud 0-100
+    popularity_boost_pivot: float = 50.0  # reproducciones para medio bonus
+    popularity_checkpoint_path: str = "data/popularity.npz"
+    popularity_checkpoint_seconds: int = 300
+
+    # 🔹 Actualizaciones incrementales del índice (eventos)
+    index_update_window_ms: int = 50  # ventana para agrupar eventos en un lote
+    index_update_batch_size: int = 500
+    index_compaction_ratio: float = 0.1  # overlay / base antes de compactar
+    # Eventos aplicados pero sin confirmar hasta la próxima publicación en
+    # disco (prefetch del canal); al llegar al límite se publica antes
+    index_max_unacked: int = 5000
+
     class Config:
         env_file = ".env"
 
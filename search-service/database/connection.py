@@ -4,6 +4,9 @@ from sqlalchemy.orm import DeclarativeBase
 
 from config import settings  # aquí lees settings.db_url y settings.debug
 
+# Sesiones que abre cada búsqueda en BD (fan-out: canciones, álbumes, artistas)
+SESSIONS_PER_SEARCH = 3
+
 
 # Declarative Base para los modelos
 class Base(DeclarativeBase):
@@ -13,9 +16,14 @@ class Base(DeclarativeBase):
 # Motor asincrónico con configuración de pool
 engine = create_async_engine(
     settings.db_url,
-    pool_size=10,  # número mínimo de conexiones vivas
-    max_overflow=20,  # conexiones extra si el pool está lleno
-    pool_timeout=30,  # segundos a esperar antes de lanzar TimeoutError
+    # Dimensionado para el fan-out: 3 conexiones por búsqueda concurrente
+    pool_size=settings.db_pool_size,  # número mínimo de conexiones vivas
+    # conexiones extra si el pool está lleno
+    max_overflow=max(
+        settings.db_max_overflow,
+        SESSIONS_PER_SEARCH * settings.db_search_concurrency - settings.db_pool_size,
+    ),
+    pool_timeout=settings.db_pool_timeout,  # segundos a esperar antes de TimeoutError
     pool_recycle=1800,  # reciclar conexiones cada 30 min (1800s)
 )
 
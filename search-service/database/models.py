@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, JSON, Table
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    Date,
+    DateTime,
+    ForeignKey,
+    JSON,
+    Table,
+)
 from sqlalchemy.orm import relationship
 from database.connection import Base
 
@@ -15,6 +25,17 @@ song_artists = Table(
     schema="music_streaming",
 )
 
+# Historial de reproducciones (lo escribe history-service); solo lectura
+# para precalcular la popularidad
+play_history = Table(
+    "play_history",
+    Base.metadata,
+    Column("user_id", Integer),
+    Column("song_id", Integer, ForeignKey("music_streaming.songs.id")),
+    Column("played_at", DateTime),
+    schema="music_streaming",
+)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -35,6 +56,8 @@ class Artist(Base):
         Integer, ForeignKey("music_streaming.users.id"), unique=True, nullable=False
     )
     artist_name = Column(String, nullable=False, unique=True)
+    # Generada: music_streaming.search_key(artist_name) (migrations/001)
+    artist_name_key = Column(Text)
     bio = Column(Text)
     profile_pic = Column(Text)
     social_links = Column(JSON)
@@ -55,6 +78,8 @@ class Album(Base):
         Integer, ForeignKey("music_streaming.artists.id"), nullable=False
     )
     title = Column(String, nullable=False)
+    # Generada: music_streaming.search_key(title) (migrations/001)
+    title_key = Column(Text)
     release_date = Column(Date)
     cover_url = Column(Text)
     created_at = Column(Date)
@@ -72,6 +97,8 @@ class Song(Base):
     album_id = Column(Integer, ForeignKey("music_streaming.albums.id"), nullable=False)
     genre_id = Column(Integer, nullable=False)
     title = Column(String, nullable=False)
+    # Generada: music_streaming.search_key(title) (migrations/001)
+    title_key = Column(Text)
     duration = Column(Integer)
     audio_url = Column(Text, nullable=False)
     track_number = Column(Integer)
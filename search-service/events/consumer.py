@@ -0,0 +1,133 @@
+import json
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
+from search_index.trigram_index import search_index
+from search_index.updater import index_updater
+from config import settings
+
+# Exchange de artist-service; search-service enlaza su propia cola para
+# recibir una copia sin competir con content-service
+ARTIST_EXCHANGE = "artist_events"
+ARTIST_QUEUE = "search_service.artist_events"
+# Exchange fanout de streaming-service (SongPlayedEvent); history-service
+# consume su propia cola enlazada al mismo exchange
+SONG_EVENTS_EXCHANGE = "song_events"
+SONG_EVENTS_QUEUE = "search_service.song_events"
+
+
+def song_row(data: dict) -> tuple:
+    # Mismo orden que SongRepository.all_for_index
+    return (
+        data["id"],
+        data.get("title"),
+        data.get("duration"),
+        data.get("audio_url"),
+        data.get("album_id"),
+    )
+
+
+def album_row(data: dict) -> tuple:
+    return (
+        data["id"],
+        data.get("title"),
+        data.get("cover_url"),
+        data.get("artist_id"),
+    )
+
+
+def artist_row(data: dict) -> tuple:
+    return (data["id"], data.get("artist_name"), data.get("profile_pic"))
+
+
+def ops_for_event(event_type: str, data: dict) -> list[tuple]:
+    """Traduce un evento a operaciones sobre el índice"""
+    if event_type in ("song_created", "song_updated"):
+        return [("songs", "upsert", song_row(data))]
+    if event_type == "song_deleted":
+        return [("songs", "delete", data["id"])]
+    if event_type in ("album_created", "album_updated"):
+        return [("albums", "upsert", album_row(data))]
+    if event_type == "album_deleted":
+        # El borrado de un álbum elimina también sus canciones
+        return [("albums", "delete", data["id"])] + [
+            ("songs", "delete", song_id) for song_id in data.get("song_ids", [])
+        ]
+    if event_type in ("artist_created", "artist_updated"):
+        return [("artists", "upsert", artist_row(data))]
+    if event_type == "artist_deleted":
+        return [("artists", "delete", data["id"])]
+    return []
+
+
+async def handle_event(message: AbstractIncomingMessage) -> None:
+    """
+    Encola el evento para el siguiente lote de actualización del índice.
+    El ack llega recién cuando sus cambios están en una generación
+    publicada (ver IndexUpdater / SnapshotPublisher).
+    """
+    # Colas de content-service: el nombre de la cola es el tipo de evento;
+    # eventos de artist-service: la routing key del exchange
+    event_type = message.routing_key or ""
+    try:
+        data = json.loads(message.body.decode())
+        ops = ops_for_event(event_type, data)
+    except (json.JSONDecodeError, KeyError) as e:
+        print(f"[!] Evento {event_type} inválido: {e}")
+        ops = []
+    if ops:
+        index_updater.submit(*ops, message=message)
+    else:
+        await message.ack()
+
+
+async def handle_song_played(message: AbstractIncomingMessage) -> None:
+    """Suma la reproducción a los contadores de popularidad (O(1))"""
+    async with message.process():
+        try:
+            data = json.loads(message.body.decode())
+            search_index.record_play(int(data["song_id"]))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            print(f"[!] Evento song_played inválido: {e}")
+
+
+async def consume_events():
+    """Suscripción a los eventos de catálogo que afectan al índice"""
+    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
+    # Los eventos de catálogo quedan sin confirmar hasta la siguiente
+    # publicación: su propio canal, para no frenar las reproducciones
+    channel = await connection.channel()
+    await channel.set_qos(prefetch_count=settings.index_max_unacked)
+    plays_channel = await connection.channel()
+    await plays_channel.set_qos(prefetch_count=settings.index_update_batch_size)
+
+    # Eventos de content-service (outbox -> colas con el nombre del evento)
+    for queue_name in (
+        "song_created",
+        "song_updated",
+        "song_deleted",
+        "album_created",
+        "album_updated",
+        "album_deleted",
+    ):
+        queue = await channel.declare_queue(queue_name, durable=True)
+        await queue.consume(handle_event)
+
+    # Eventos de artist-service
+    exchange = await channel.declare_exchange(
+        ARTIST_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True
+    )
+    artist_queue = await channel.declare_queue(ARTIST_QUEUE, durable=True)
+    for event_type in ("artist_created", "artist_updated", "artist_deleted"):
+        await artist_queue.bind(exchange, routing_key=event_type)
+    await artist_queue.consume(handle_event)
+
+    # Reproducciones de streaming-service
+    song_exchange = await plays_channel.declare_exchange(
+        SONG_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True
+    )
+    plays_queue = await plays_channel.declare_queue(SONG_EVENTS_QUEUE, durable=True)
+    await plays_queue.bind(song_exchange, routing_key="")
+    await plays_queue.consume(handle_song_played)
+
+    print("[*] Esperando eventos de canciones, álbumes, artistas y reproducciones...")
+    return connection
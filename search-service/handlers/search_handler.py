@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.search_service import SearchService
+from services.cursor import decode_cursor
+from strategies.base_strategy import SearchStrategy
 from strategies.fuzzy_strategy import FuzzySearchStrategy
+from strategies.memory_strategy import InMemorySearchStrategy
+from strategies.trigram_strategy import TrigramSearchStrategy
+from search_index.trigram_index import search_index
+from config import settings
 from database.connection import get_db  # Tu función que devuelve AsyncSession
 
 router = APIRouter()
 
 
+def get_strategy() -> SearchStrategy:
+    """
+    Estrategia según settings.search_engine. El índice en memoria, mientras
+    no está listo, cae a la búsqueda ILIKE + fuzzy en la BD.
+    """
+    if settings.search_engine == "memory" and search_index.ready:
+        return InMemorySearchStrategy(threshold=settings.fuzzy_threshold)
+    if settings.search_engine == "trigram":
+        return TrigramSearchStrategy(threshold=settings.trigram_threshold)
+    return FuzzySearchStrategy(threshold=settings.fuzzy_threshold)
+
+
 @router.get("/search")
 async def search(
     q: str = Query(..., description="Texto a buscar"),
@@ -14,19 +33,31 @@ async def search(
     album_page: int = Query(1, ge=1, description="Página de álbumes"),
     artist_page: int = Query(1, ge=1, description="Página de artistas"),
     limit: int = Query(5, ge=1, le=50, description="Número de resultados por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco (next_cursor de la respuesta anterior)"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Endpoint de búsqueda que devuelve canciones, álbumes y artistas
-    con paginado independiente.
+    con paginado independiente (por página o por cursor).
     """
-    strategy = FuzzySearchStrategy(threshold=70)
-    service = SearchService(strategy)
+    service = SearchService(get_strategy())
 
-    # Calculamos offsets según la página
-    offset_songs = (song_page - 1) * limit
-    offset_albums = (album_page - 1) * limit
-    offset_artists = (artist_page - 1) * limit
+    if cursor:
+        # Posiciones dentro de la lista ordenada en caché
+        try:
+            positions = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        offset_songs = positions["songs"]
+        offset_albums = positions["albums"]
+        offset_artists = positions["artists"]
+    else:
+        # Calculamos offsets según la página
+        offset_songs = (song_page - 1) * limit
+        offset_albums = (album_page - 1) * limit
+        offset_artists = (artist_page - 1) * limit
 
     # Llamada async al servicio
     result = await service.search(
@@ -39,3 +70,17 @@ async def search(
     )
 
     return result
+
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., description="Prefijo escrito por el usuario"),
+    limit: int = Query(10, ge=1, le=20, description="Número de sugerencias"),
+):
+    """
+    Autocompletado mientras se escribe: prefijos sobre títulos y nombres,
+    ordenados por popularidad. Se resuelve en memoria, sin tocar la BD.
+    """
+    if search_index.suggest is None:
+        return {"suggestions": []}
+    return {"suggestions": search_index.suggest.suggest(q, limit)}
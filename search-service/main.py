@@ -1,9 +1,47 @@
 from fastapi import FastAPI
 from handlers.search_handler import router as search_router
 from middleware.auth_middleware import AuthMiddleware
+import asyncio
+from contextlib import asynccontextmanager
+from search_index.builder import index_builder
+from search_index.snapshots import snapshot_publisher, snapshot_watcher
+from search_index.trigram_index import search_index
+from search_index.updater import index_updater
+from services.result_cache import ranked_result_cache
+from config import settings
 import uvicorn
 
-app = FastAPI(title="Search Service", version="0.1")
+
+# -------------------------
+# Lifespan handler para startup y shutdown
+# -------------------------
+@asynccontextmanager
+async def lifespan(_):
+    watcher_task = None
+    if settings.search_engine == "memory":
+        if settings.index_role == "worker":
+            # Startup: mapear la generación publicada por el constructor
+            # (mientras no exista, las búsquedas usan la estrategia ILIKE)
+            try:
+                snapshot_watcher.poll()
+            except Exception as e:
+                print(f"[!] No se pudo mapear el índice publicado: {e}")
+            watcher_task = asyncio.create_task(snapshot_watcher.run_forever())
+        else:
+            # Startup: índice, eventos y publicación en este mismo proceso
+            await index_builder.start()
+    yield
+    # Shutdown: detener el watcher o el constructor
+    if watcher_task:
+        watcher_task.cancel()
+        try:
+            await watcher_task
+        except asyncio.CancelledError:
+            print("[*] Watcher del índice detenido correctamente.")
+    await index_builder.stop()
+
+
+app = FastAPI(title="Search Service", version="0.1", lifespan=lifespan)
 
 # Middleware global
 app.add_middleware(AuthMiddleware)
@@ -18,5 +56,24 @@ def health_check():
     return {"status": "ok"}
 
 
+# Estado del índice de búsqueda en memoria
+@app.get("/health/index")
+def index_health():
+    snapshots = (
+        snapshot_watcher if settings.index_role == "worker" else snapshot_publisher
+    )
+    return {
+        "index": search_index.stats(),
+        "updates": index_updater.stats(),
+        "snapshots": snapshots.stats(),
+    }
+
+
+# Caché de resultados ordenados por consulta
+@app.get("/health/caches")
+def caches_health():
+    return {"ranked_results": ranked_result_cache.stats()}
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8004, reload=True)
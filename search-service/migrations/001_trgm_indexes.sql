@@ -0,0 +1,63 @@
+-- Claves de búsqueda e índices de trigramas (pg_trgm).
+--
+-- Paso obligatorio del despliegue: todas las estrategias en BD dependen de
+-- esta migración, también "fuzzy", que es el respaldo mientras el índice en
+-- memoria se construye (LIKE sobre las claves y ORDER BY similarity()).
+--
+-- Las claves son columnas generadas sin acentos, en minúsculas y con los
+-- espacios colapsados ("Canción  del MAR" -> "cancion del mar"), la misma
+-- forma que search_index/text.py:normalize. Los índices GIN de trigramas
+-- sobre ellas resuelven `<%`, `%` y LIKE '%q%' sin escanear la tabla.
+--
+-- ADD COLUMN ... STORED reescribe la tabla; CREATE INDEX CONCURRENTLY no
+-- puede ejecutarse dentro de una transacción: aplicar con psql sin
+-- --single-transaction.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public;
+
+-- IF NOT EXISTS no mueve una extensión ya instalada en otro esquema:
+-- search_key() la referencia como public.unaccent
+DO $$
+BEGIN
+    IF (SELECT extnamespace::regnamespace::text
+        FROM pg_extension WHERE extname = 'unaccent') <> 'public' THEN
+        RAISE EXCEPTION
+            'unaccent debe estar en el esquema public '
+            '(ALTER EXTENSION unaccent SET SCHEMA public)';
+    END IF;
+END
+$$;
+
+-- unaccent() es STABLE; el wrapper con diccionario explícito es IMMUTABLE
+-- y puede usarse en columnas generadas e índices
+CREATE OR REPLACE FUNCTION music_streaming.search_key(value text)
+    RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT btrim(regexp_replace(
+        lower(public.unaccent('public.unaccent'::regdictionary, value)),
+        '\s+', ' ', 'g'
+    ))
+$$;
+
+ALTER TABLE music_streaming.songs
+    ADD COLUMN IF NOT EXISTS title_key TEXT
+        GENERATED ALWAYS AS (music_streaming.search_key(title)) STORED;
+
+ALTER TABLE music_streaming.albums
+    ADD COLUMN IF NOT EXISTS title_key TEXT
+        GENERATED ALWAYS AS (music_streaming.search_key(title)) STORED;
+
+ALTER TABLE music_streaming.artists
+    ADD COLUMN IF NOT EXISTS artist_name_key TEXT
+        GENERATED ALWAYS AS (music_streaming.search_key(artist_name)) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_music_streaming_songs_title_key_trgm
+    ON music_streaming.songs USING gin (title_key gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_music_streaming_albums_title_key_trgm
+    ON music_streaming.albums USING gin (title_key gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_music_streaming_artists_artist_name_key_trgm
+    ON music_streaming.artists USING gin (artist_name_key gin_trgm_ops);
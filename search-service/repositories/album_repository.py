@@ -1,6 +1,8 @@
 # album_repository.py
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func
+from config import settings
 from database.models import Album
 
 
@@ -9,10 +11,50 @@ class AlbumRepository:
         self.session = session
 
     async def get_by_title_ilike(self, query: str, limit: int, offset: int):
-        # Solo columnas necesarias: id, title, cover_url
+        # Solo columnas necesarias: id, title, cover_url y la clave de
+        # búsqueda (índice [3]). `query` ya viene normalizada; los más
+        # parecidos primero para que el corte por `limit` sea estable
+        stmt = (
+            select(Album.id, Album.title, Album.cover_url, Album.title_key)
+            .where(Album.title_key.like(f"%{query}%"))
+            .order_by(func.similarity(query, Album.title_key).desc(), Album.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def all_for_index(self) -> list[tuple]:
+        """
+        Carga masiva para el índice en memoria
+        (id, title, cover_url, artist_id).
+        Se lee en streaming por lotes para no materializar el resultado
+        completo en el driver.
+        """
+        stmt = select(
+            Album.id, Album.title, Album.cover_url, Album.artist_id
+        ).execution_options(yield_per=settings.index_load_batch_size)
+        result = await self.session.stream(stmt)
+        rows: list[tuple] = []
+        async for partition in result.partitions():
+            rows.extend(tuple(row) for row in partition)
+        return rows
+
+    async def search_trigram(self, query: str, limit: int, offset: int):
+        """
+        Búsqueda con pg_trgm: `query <% title_key` usa el índice GIN de
+        trigramas; el ranking y el corte por umbral se hacen en SQL, así solo
+        viajan `limit` filas. La consulta se normaliza con la misma
+        función que genera la clave.
+        """
+        key = func.music_streaming.search_key(query)
+        score = func.word_similarity(key, Album.title_key)
         stmt = (
             select(Album.id, Album.title, Album.cover_url)
-            .where(Album.title.ilike(f"%{query}%"))
+            .where(key.op("<%")(Album.title_key))
+            .order_by(
+                score.desc(), func.similarity(key, Album.title_key).desc(), Album.id
+            )
             .limit(limit)
             .offset(offset)
         )
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from config import settings
 from database.models import Artist
 
 
@@ -9,8 +10,10 @@ class ArtistRepository:
 
     async def search_by_name(self, query: str, limit: int, offset: int):
         """
-        Busca artistas cuyo artist_name contenga 'query' (ilike), paginados.
+        Busca artistas cuya clave de búsqueda contenga 'query' (ya
+        normalizada), paginados.
         ORDEN ESPECÍFICO para que coincida con el serializer actual.
+        Los más parecidos primero para que el corte por `limit` sea estable.
         """
         stmt = (
             select(
@@ -19,8 +22,48 @@ class ArtistRepository:
                 Artist.profile_pic,  # índice [2] - para serializer como "profile_pic"
                 Artist.bio,  # índice [3] - adicional si lo necesitas
                 Artist.user_id,  # índice [4] - adicional si lo necesitas
+                Artist.artist_name_key,  # índice [5] - clave de búsqueda
+            )
+            .where(Artist.artist_name_key.like(f"%{query}%"))
+            .order_by(func.similarity(query, Artist.artist_name_key).desc(), Artist.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def all_for_index(self) -> list[tuple]:
+        """
+        Carga masiva para el índice en memoria (id, artist_name, profile_pic).
+        Se lee en streaming por lotes para no materializar el resultado
+        completo en el driver.
+        """
+        stmt = select(Artist.id, Artist.artist_name, Artist.profile_pic).execution_options(
+            yield_per=settings.index_load_batch_size
+        )
+        result = await self.session.stream(stmt)
+        rows: list[tuple] = []
+        async for partition in result.partitions():
+            rows.extend(tuple(row) for row in partition)
+        return rows
+
+    async def search_trigram(self, query: str, limit: int, offset: int):
+        """
+        Búsqueda con pg_trgm: `query <% artist_name_key` usa el índice GIN de
+        trigramas; el ranking y el corte por umbral se hacen en SQL, así solo
+        viajan `limit` filas. La consulta se normaliza con la misma
+        función que genera la clave.
+        """
+        key = func.music_streaming.search_key(query)
+        score = func.word_similarity(key, Artist.artist_name_key)
+        stmt = (
+            select(Artist.id, Artist.artist_name, Artist.profile_pic)
+            .where(key.op("<%")(Artist.artist_name_key))
+            .order_by(
+                score.desc(),
+                func.similarity(key, Artist.artist_name_key).desc(),
+                Artist.id,
             )
-            .where(Artist.artist_name.ilike(f"%{query}%"))
             .limit(limit)
             .offset(offset)
         )
@@ -0,0 +1,35 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from database.models import Song, Album, play_history
+
+
+class PopularityRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def play_counts(self) -> dict[str, dict[int, float]]:
+        """
+        Reproducciones totales por canción, álbum y artista, agregadas en SQL
+        (una fila por entidad, no una por reproducción).
+        """
+        plays = func.count().label("plays")
+        songs = select(play_history.c.song_id, plays).group_by(play_history.c.song_id)
+        albums = (
+            select(Song.album_id, plays)
+            .select_from(play_history)
+            .join(Song, Song.id == play_history.c.song_id)
+            .group_by(Song.album_id)
+        )
+        artists = (
+            select(Album.artist_id, plays)
+            .select_from(play_history)
+            .join(Song, Song.id == play_history.c.song_id)
+            .join(Album, Album.id == Song.album_id)
+            .group_by(Album.artist_id)
+        )
+
+        counts = {}
+        for name, stmt in (("songs", songs), ("albums", albums), ("artists", artists)):
+            result = await self.session.execute(stmt)
+            counts[name] = {entity_id: float(n) for entity_id, n in result.all()}
+        return counts
@@ -1,7 +1,9 @@
 # song_repository.py
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func
 from sqlalchemy.orm import selectinload
+from config import settings
 from database.models import Song, Album, Artist, User
 
 
@@ -11,11 +13,58 @@ class SongRepository:
 
     async def get_by_title_ilike(self, query: str, limit: int, offset: int):
         # Solo columnas necesarias: id, title, duration, audio_url, album_id
+        # y la clave de búsqueda (índice [5]). `query` ya viene normalizada:
+        # LIKE sobre la clave precalculada, sin lower() por fila. Los más
+        # parecidos primero para que el corte por `limit` sea estable
         stmt = (
-            select(Song.id, Song.title, Song.duration, Song.audio_url, Song.album_id)
-            .where(Song.title.ilike(f"%{query}%"))
+            select(
+                Song.id,
+                Song.title,
+                Song.duration,
+                Song.audio_url,
+                Song.album_id,
+                Song.title_key,
+            )
+            .where(Song.title_key.like(f"%{query}%"))
+            .order_by(func.similarity(query, Song.title_key).desc(), Song.id)
             .limit(limit)
             .offset(offset)
         )
         result = await self.session.execute(stmt)
         return result.all()  # devuelve lista de tuplas
+
+    async def all_for_index(self) -> list[tuple]:
+        """
+        Carga masiva para el índice en memoria (id, title, duration, audio_url, album_id).
+        Se lee en streaming por lotes para no materializar el resultado
+        completo en el driver.
+        """
+        stmt = select(
+            Song.id, Song.title, Song.duration, Song.audio_url, Song.album_id
+        ).execution_options(yield_per=settings.index_load_batch_size)
+        result = await self.session.stream(stmt)
+        rows: list[tuple] = []
+        async for partition in result.partitions():
+            rows.extend(tuple(row) for row in partition)
+        return rows
+
+    async def search_trigram(self, query: str, limit: int, offset: int):
+        """
+        Búsqueda con pg_trgm: `query <% title_key` usa el índice GIN de
+        trigramas; el ranking y el corte por umbral se hacen en SQL, así solo
+        viajan `limit` filas. La consulta se normaliza con la misma
+        función que genera la clave.
+        """
+        key = func.music_streaming.search_key(query)
+        score = func.word_similarity(key, Song.title_key)
+        stmt = (
+            select(Song.id, Song.title, Song.duration, Song.audio_url, Song.album_id)
+            .where(key.op("<%")(Song.title_key))
+            .order_by(
+                score.desc(), func.similarity(key, Song.title_key).desc(), Song.id
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
@@ -0,0 +1,105 @@
+import asyncio
+from pathlib import Path
+
+from database.connection import AsyncSessionLocal
+from events.consumer import consume_events
+from search_index.popularity import play_counters
+from search_index.snapshots import bootstrap, index_directory, snapshot_publisher
+from search_index.trigram_index import search_index
+from search_index.updater import index_updater
+from config import settings
+
+
+class IndexBuilder:
+    """
+    Proceso que mantiene el índice: arranque (mapeo o carga masiva),
+    actualizaciones por eventos, checkpoints de popularidad y publicación
+    de generaciones en disco para los workers.
+
+    Corre dentro del lifespan de FastAPI (index_role="builder", un solo
+    proceso) o aparte con `python -m search_index.builder` cuando uvicorn
+    corre con varios workers (index_role="worker").
+    """
+
+    def __init__(self):
+        self.checkpoint_path = Path(settings.popularity_checkpoint_path)
+        self.tasks: list[asyncio.Task] = []
+        self.connection = None
+
+    async def start(self) -> None:
+        # Contadores de popularidad desde el último checkpoint
+        try:
+            if play_counters.load(self.checkpoint_path):
+                print(f"[✓] Popularidad restaurada desde {self.checkpoint_path}")
+        except Exception as e:
+            print(f"[!] Checkpoint de popularidad inválido, se ignora: {e}")
+
+        # Última generación publicada o carga masiva desde la BD
+        # (si falla, las búsquedas usan la estrategia ILIKE sobre la BD)
+        try:
+            await bootstrap(
+                search_index,
+                index_directory,
+                settings.index_snapshot_max_age_seconds,
+                AsyncSessionLocal,
+            )
+        except Exception as e:
+            print(f"[!] No se pudo construir el índice de búsqueda: {e}")
+            return
+        if search_index.file is not None:
+            snapshot_publisher.mark_published()
+
+        # Actualizaciones incrementales, checkpoints y publicación
+        self.tasks = [
+            asyncio.create_task(index_updater.run_forever()),
+            asyncio.create_task(
+                play_counters.checkpoint_forever(
+                    self.checkpoint_path, settings.popularity_checkpoint_seconds
+                )
+            ),
+            asyncio.create_task(snapshot_publisher.run_forever()),
+        ]
+        try:
+            self.connection = await consume_events()
+        except Exception as e:
+            print(f"[!] No se pudo conectar el consumer de eventos: {e}")
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.tasks:
+            print("[*] Actualizador del índice detenido correctamente.")
+            # Última generación con lo aplicado desde la anterior; sus
+            # mensajes se confirman antes de cerrar la conexión (el resto se
+            # reentrega al reiniciar)
+            if search_index.ready and snapshot_publisher.due():
+                try:
+                    await snapshot_publisher.publish()
+                except Exception as e:
+                    print(f"[!] Error publicando la última generación: {e}")
+            # Último checkpoint de popularidad
+            try:
+                await play_counters.checkpoint(self.checkpoint_path)
+                print("[✓] Checkpoint de popularidad guardado.")
+            except Exception as e:
+                print(f"[!] Error guardando el checkpoint de popularidad: {e}")
+        self.tasks = []
+        if self.connection:
+            await self.connection.close()
+            self.connection = None
+
+
+index_builder = IndexBuilder()
+
+
+async def main() -> None:
+    await index_builder.start()
+    try:
+        await asyncio.Future()
+    finally:
+        await index_builder.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
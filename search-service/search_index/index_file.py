@@ -0,0 +1,167 @@
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Formato del archivo de índice (little-endian):
+#   cabecera:  magic, versión, generación, creado_en, nº de secciones
+#   tabla:     una entrada por sección (nombre, dtype, offset, elementos)
+#   datos:     arrays contiguos, alineados a 64 bytes
+MAGIC = b"SIDX"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQdI")
+_ENTRY = struct.Struct("<32s8sQQ")
+_ALIGN = 64
+
+# Puntero a la generación vigente (nombre de archivo)
+CURRENT = "CURRENT"
+
+
+def file_name(generation: int) -> str:
+    return f"index-{generation:010d}.bin"
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def write_index_file(
+    directory: Path, generation: int, sections: dict[str, np.ndarray]
+) -> Path:
+    """
+    Escribe una generación completa y luego mueve el puntero CURRENT.
+    Ambos pasos son atómicos (temp + fsync + rename): un lector ve la
+    generación anterior o la nueva, nunca un archivo a medio escribir.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    arrays = {name: np.ascontiguousarray(a) for name, a in sections.items()}
+
+    position = _align(_HEADER.size + _ENTRY.size * len(arrays))
+    layout = []
+    for name, array in arrays.items():
+        layout.append((name, array, position))
+        position = _align(position + array.nbytes)
+
+    path = directory / file_name(generation)
+    temp_path = directory / f".{path.name}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, generation, time.time(), len(arrays)))
+        for name, array, offset in layout:
+            f.write(
+                _ENTRY.pack(name.encode(), array.dtype.str.encode(), offset, array.size)
+            )
+        for _, array, offset in layout:
+            f.seek(offset)
+            f.write(array.tobytes())
+        f.truncate(max(position, f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    _write_atomic(directory / CURRENT, path.name.encode())
+    _fsync_dir(directory)
+    return path
+
+
+class IndexFile:
+    """
+    Generación del índice abierta con mmap (solo lectura). Las secciones
+    son arrays numpy sobre el mapeo: no se copian a memoria del proceso, y
+    todos los workers comparten las mismas páginas del page cache.
+
+    El mapeo se libera solo cuando ningún array lo referencia (por eso no
+    hay close(): un swap simplemente deja de usar la instancia anterior).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, generation, created_at, count = _HEADER.unpack_from(
+            self.mmap, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path.name}: formato de índice no soportado")
+        self.generation = generation
+        self.created_at = created_at
+
+        self.sections: dict[str, np.ndarray] = {}
+        for i in range(count):
+            raw_name, raw_dtype, offset, size = _ENTRY.unpack_from(
+                self.mmap, _HEADER.size + i * _ENTRY.size
+            )
+            name = raw_name.rstrip(b"\0").decode()
+            dtype = np.dtype(raw_dtype.rstrip(b"\0").decode())
+            self.sections[name] = np.frombuffer(
+                self.mmap, dtype=dtype, count=size, offset=offset
+            )
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.sections[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def group(self, prefix: str) -> dict[str, np.ndarray]:
+        """Secciones "prefix.x" como {"x": array}"""
+        start = f"{prefix}."
+        return {
+            name[len(start) :]: array
+            for name, array in self.sections.items()
+            if name.startswith(start)
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.mmap)
+
+
+def current_path(directory: Path) -> Path | None:
+    """Archivo de la generación vigente, si existe"""
+    try:
+        name = (directory / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return None
+    path = directory / name
+    return path if path.exists() else None
+
+
+def latest_generation(directory: Path) -> int:
+    """Mayor generación escrita en el directorio (0 si no hay ninguna)"""
+    generations = [
+        int(path.stem.split("-")[1]) for path in directory.glob("index-*.bin")
+    ]
+    return max(generations, default=0)
+
+
+def prune(directory: Path, keep: int) -> None:
+    """
+    Borra generaciones viejas. Un worker que aún tenga mapeada una de ellas
+    no se ve afectado (el inodo vive hasta que se libera el mapeo).
+    """
+    current = current_path(directory)
+    paths = sorted(directory.glob("index-*.bin"), reverse=True)
+    for path in paths[keep:]:
+        if path != current:
+            path.unlink(missing_ok=True)
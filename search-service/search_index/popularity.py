@@ -0,0 +1,177 @@
+import asyncio
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+
+KINDS = ("songs", "albums", "artists")
+# Por encima de este peso se reescala todo (evita overflow de float64)
+_RENORMALIZE_AT = 1e100
+
+
+class PlayCounters:
+    """
+    Reproducciones con decaimiento exponencial por canción, álbum y artista.
+
+    Layout: un array float64 por entidad indexado directamente por id (los
+    ids de la BD son densos). Registrar una reproducción es una suma en una
+    posición del array: O(1), sin crear objetos por evento.
+
+    Decaimiento "hacia adelante": en lugar de multiplicar todos los
+    contadores periódicamente, cada reproducción suma
+    exp(rate * (t - epoch)), y al leer se multiplica por
+    exp(-rate * (now - epoch)). El reescalado O(n) solo ocurre al guardar
+    el checkpoint o si los pesos crecen demasiado.
+    """
+
+    def __init__(self, half_life_seconds: float, capacity: int = 1024):
+        self.rate = math.log(2) / half_life_seconds
+        self.epoch = time.time()
+        self.counters = {kind: np.zeros(capacity, dtype=np.float64) for kind in KINDS}
+        self.recorded = 0
+        self.last_checkpoint_at: float | None = None
+
+    @property
+    def empty(self) -> bool:
+        return not any(counter.any() for counter in self.counters.values())
+
+    def _weight(self, now: float) -> float:
+        return math.exp(self.rate * (now - self.epoch))
+
+    def _slot(self, kind: str, entity_id: int) -> np.ndarray:
+        counter = self.counters[kind]
+        if entity_id >= counter.size:
+            # Crecimiento geométrico: las realocaciones son excepcionales
+            grown = np.zeros(max(entity_id + 1, counter.size * 2), dtype=np.float64)
+            grown[: counter.size] = counter
+            self.counters[kind] = counter = grown
+        return counter
+
+    def _renormalize(self, now: float) -> None:
+        scale = math.exp(-self.rate * (now - self.epoch))
+        for counter in self.counters.values():
+            counter *= scale
+        self.epoch = now
+
+    def record(
+        self,
+        song_id: int,
+        album_id: int | None = None,
+        artist_id: int | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Suma una reproducción a la canción y, si se conocen, a su álbum y artista"""
+        now = time.time() if now is None else now
+        weight = self._weight(now)
+        if weight > _RENORMALIZE_AT:
+            self._renormalize(now)
+            weight = 1.0
+        for kind, entity_id in zip(KINDS, (song_id, album_id, artist_id)):
+            if entity_id is not None and entity_id >= 0:
+                self._slot(kind, entity_id)[entity_id] += weight
+        self.recorded += 1
+
+    def seed(self, kind: str, counts: dict[int, float]) -> None:
+        """Carga totales iniciales (p. ej. del historial) como si fueran de ahora"""
+        weight = self._weight(time.time())
+        for entity_id, count in counts.items():
+            if entity_id is not None:
+                self._slot(kind, entity_id)[entity_id] += count * weight
+
+    def lookup(self, kind: str, ids: np.ndarray) -> np.ndarray:
+        """Reproducciones decaídas a este momento para un array de ids"""
+        counter = self.counters[kind]
+        values = np.zeros(ids.size, dtype=np.float64)
+        known = (ids >= 0) & (ids < counter.size)
+        values[known] = counter[ids[known]]
+        return values * math.exp(-self.rate * (time.time() - self.epoch))
+
+    def snapshot(self, kind: str) -> np.ndarray:
+        """Copia de todos los contadores de una entidad, decaídos a este momento"""
+        scale = math.exp(-self.rate * (time.time() - self.epoch))
+        return self.counters[kind] * scale
+
+    def boost(
+        self, kind: str, ids: np.ndarray, weight: float, pivot: float
+    ) -> np.ndarray:
+        """
+        Bonus de ranking en [0, weight): crece con la popularidad y se satura
+        (pivot reproducciones dan la mitad del bonus).
+        """
+        plays = self.lookup(kind, ids)
+        return weight * plays / (plays + pivot)
+
+    # ======================================
+    # Checkpoints en disco
+    # ======================================
+    @staticmethod
+    def _write(path: Path, epoch: float, counters: dict[str, np.ndarray]) -> None:
+        """Escritura atómica: archivo temporal + fsync + rename"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(f, epoch=np.float64(epoch), **counters)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    async def checkpoint(self, path: Path) -> None:
+        """
+        Guarda los contadores en disco. El reescalado se hace en el event
+        loop (fija `epoch`); la escritura va en un hilo, y las reproducciones
+        que lleguen mientras tanto siguen siendo coherentes con ese `epoch`.
+        """
+        self._renormalize(time.time())
+        await asyncio.to_thread(self._write, path, self.epoch, dict(self.counters))
+        self.last_checkpoint_at = time.time()
+
+    async def checkpoint_forever(self, path: Path, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.checkpoint(path)
+            except Exception as e:
+                print(f"[!] Error guardando el checkpoint de popularidad: {e}")
+
+    def load(self, path: Path) -> bool:
+        """Restaura el último checkpoint; False si no existe"""
+        if not path.exists():
+            return False
+        with np.load(path) as data:
+            self.restore(
+                float(data["epoch"]),
+                {kind: data[kind].astype(np.float64) for kind in KINDS},
+            )
+        return True
+
+    def restore(self, epoch: float, counters: dict[str, np.ndarray]) -> None:
+        """
+        Adopta contadores ya escalados a `epoch`. Pueden ser arrays de solo
+        lectura (mapeados de un archivo de índice) si este proceso no
+        registra reproducciones.
+        """
+        self.epoch = epoch
+        self.counters = dict(counters)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Copia de los contadores y su epoch, para escribirlos a disco"""
+        return {
+            "epoch": np.array([self.epoch], dtype=np.float64),
+            **{kind: counter.copy() for kind, counter in self.counters.items()},
+        }
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "epoch": self.epoch,
+            "last_checkpoint_at": self.last_checkpoint_at,
+            "capacity": {kind: int(c.size) for kind, c in self.counters.items()},
+            "bytes": int(sum(c.nbytes for c in self.counters.values())),
+        }
+
+
+play_counters = PlayCounters(settings.popularity_half_life_hours * 3600)
@@ -0,0 +1,53 @@
+from typing import Callable, Sequence
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+def score_batch(
+    query: str,
+    choices: Sequence[str],
+    score_cutoff: float,
+    processor: Callable[[str], str] | None = None,
+) -> np.ndarray:
+    """
+    Similitud partial_ratio de la consulta contra todos los candidatos en
+    una sola llamada (rapidfuzz.process.cdist, en C). Los puntajes bajo
+    `score_cutoff` vuelven como 0. Con `processor=None` se asume que los
+    candidatos ya están normalizados (claves precalculadas del índice).
+    """
+    if not choices:
+        return np.empty(0, dtype=np.float32)
+    scores = process.cdist(
+        [query],
+        choices,
+        scorer=fuzz.partial_ratio,
+        processor=processor,
+        score_cutoff=score_cutoff,
+        dtype=np.float32,
+    )
+    return scores[0]
+
+
+def top_k(
+    scores: np.ndarray,
+    score_cutoff: float,
+    k: int | None = None,
+    rank_by: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Posiciones de los puntajes >= score_cutoff, de mayor a menor.
+    Con `k`, argpartition selecciona los k mejores en O(n) antes de ordenar
+    solo esos k. Los empates conservan el orden original.
+    Con `rank_by`, el umbral se aplica a `scores` pero el orden sigue a
+    `rank_by` (similitud + bonus de popularidad).
+    """
+    order_by = scores if rank_by is None else rank_by
+    hits = np.flatnonzero(scores >= score_cutoff)
+    if k is not None and hits.size > k:
+        if k <= 0:
+            return hits[:0]
+        best = np.argpartition(-order_by[hits], k - 1)[:k]
+        hits = np.sort(hits[best])
+    order = np.argsort(-order_by[hits], kind="stable")
+    return hits[order]
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from pathlib import Path
+
+from search_index.index_file import IndexFile, current_path, latest_generation, prune
+from search_index.popularity import KINDS
+from search_index.trigram_index import SearchIndex, search_index
+from search_index.updater import IndexUpdater, index_updater
+from config import settings
+
+
+class SnapshotPublisher:
+    """
+    Lado constructor: publica el índice como generaciones en disco.
+
+    Se publica cada `interval` segundos si el catálogo cambió (antes si el
+    updater acumula demasiados mensajes sin confirmar), y como mucho cada
+    `plays_interval` si solo cambió la popularidad. Los números de
+    generación siguen a los archivos existentes, así son monótonos aunque
+    el constructor se reinicie.
+
+    Los mensajes de catálogo se confirman (ack) recién cuando una
+    generación que incluye sus cambios está en disco: al reiniciar, la
+    última generación más los mensajes sin confirmar reconstruyen el
+    índice completo.
+    """
+
+    def __init__(
+        self,
+        index: SearchIndex,
+        directory: Path,
+        updater: IndexUpdater | None = None,
+        interval: float = 30,
+        plays_interval: float = 300,
+        keep: int = 3,
+    ):
+        self.index = index
+        self.directory = directory
+        self.updater = updater
+        self.interval = interval
+        self.plays_interval = plays_interval
+        self.keep = keep
+
+        self.generation = latest_generation(directory) if directory.exists() else 0
+        self.published_index_generation: int | None = None
+        self.published_plays = 0
+        self.published_at = 0.0
+        self.publishes = 0
+        self.last_publish_seconds = 0.0
+
+    def mark_published(self) -> None:
+        """El índice actual ya está en disco (p. ej. se arrancó desde él)"""
+        self.published_index_generation = self.index.generation
+        self.published_plays = self.index.plays.recorded
+        self.published_at = time.time()
+
+    def due(self) -> bool:
+        if self.published_index_generation != self.index.generation:
+            return True
+        return (
+            self.published_plays != self.index.plays.recorded
+            and time.time() - self.published_at >= self.plays_interval
+        )
+
+    async def publish(self) -> Path:
+        started = time.perf_counter()
+        index_generation = self.index.generation
+        plays = self.index.plays.recorded
+        # Mensajes ya aplicados: index.publish toma la instantánea antes de
+        # su primer await, así que la generación incluye sus cambios
+        messages = self.updater.take_unpublished() if self.updater else []
+        self.generation += 1
+        try:
+            path = await self.index.publish(self.directory, self.generation)
+        except BaseException:
+            if self.updater:
+                self.updater.restore_unpublished(messages)
+            raise
+        await self._ack(messages)
+        await asyncio.to_thread(prune, self.directory, self.keep)
+
+        self.published_index_generation = index_generation
+        self.published_plays = plays
+        self.published_at = time.time()
+        self.publishes += 1
+        self.last_publish_seconds = time.perf_counter() - started
+        print(
+            f"[✓] Índice publicado en {path.name} "
+            f"({self.last_publish_seconds:.2f}s)"
+        )
+        return path
+
+    @staticmethod
+    async def _ack(messages: list) -> None:
+        for message in messages:
+            try:
+                await message.ack()
+            except Exception as e:
+                # Se reentrega tras reconectar; aplicar de nuevo es idempotente
+                print(f"[!] No se pudo confirmar un evento publicado: {e}")
+
+    async def _wait(self) -> None:
+        if self.updater is None:
+            await asyncio.sleep(self.interval)
+            return
+        try:
+            await asyncio.wait_for(
+                self.updater.publish_requested.wait(), timeout=self.interval
+            )
+        except asyncio.TimeoutError:
+            pass
+        self.updater.publish_requested.clear()
+
+    async def run_forever(self) -> None:
+        while True:
+            if self.index.ready and self.due():
+                try:
+                    await self.publish()
+                except Exception as e:
+                    print(f"[!] Error publicando el índice: {e}")
+            await self._wait()
+
+    def stats(self) -> dict:
+        return {
+            "role": "builder",
+            "generation": self.generation,
+            "publishes": self.publishes,
+            "published_at": self.published_at or None,
+            "last_publish_seconds": round(self.last_publish_seconds, 3),
+        }
+
+
+class SnapshotWatcher:
+    """
+    Lado worker: mapea la generación vigente y, cuando el constructor
+    publica otra, hace hot swap. No hay carga desde la BD ni consumidores
+    de eventos: el índice, el autocompletado y la popularidad llegan por el
+    archivo, sin reconstruir nada en la memoria del proceso.
+    """
+
+    def __init__(self, index: SearchIndex, directory: Path, interval: float = 2.0):
+        self.index = index
+        self.directory = directory
+        self.interval = interval
+        self.path: Path | None = None
+        self.swaps = 0
+        self.swapped_at: float | None = None
+
+    def poll(self) -> bool:
+        """Adopta la generación vigente si cambió; True si hubo swap"""
+        path = current_path(self.directory)
+        if path is None or path == self.path:
+            return False
+        index_file = IndexFile(path)
+        self.index.adopt(index_file, with_plays=True)
+        # La caché de resultados se invalida por generación
+        self.index.generation = index_file.generation
+        self.path = path
+        self.swaps += 1
+        self.swapped_at = time.time()
+        return True
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                if self.poll():
+                    print(f"[✓] Índice mapeado desde {self.path.name}")
+            except Exception as e:
+                print(f"[!] No se pudo mapear el índice publicado: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "role": "worker",
+            "path": str(self.path) if self.path else None,
+            "generation": self.index.generation,
+            "swaps": self.swaps,
+            "swapped_at": self.swapped_at,
+        }
+
+
+async def bootstrap(
+    index: SearchIndex, directory: Path, max_age: float, session_factory
+) -> None:
+    """
+    Arranque del constructor: si la última generación publicada es
+    reciente se mapea (sin recorrer la BD) y los eventos sin confirmar en
+    las colas durables la ponen al día (solo se confirman los ya
+    publicados); si no, carga masiva desde la BD.
+    """
+    path = current_path(directory)
+    if path is not None and time.time() - path.stat().st_mtime <= max_age:
+        try:
+            started = time.perf_counter()
+            index_file = IndexFile(path)
+            index.adopt(index_file, with_plays=False)
+            if index.plays.empty and "plays.epoch" in index_file:
+                # Copia escribible: el constructor sigue sumando reproducciones
+                index.plays.restore(
+                    float(index_file["plays.epoch"][0]),
+                    {kind: index_file[f"plays.{kind}"].copy() for kind in KINDS},
+                )
+            index.generation += 1
+            if index.suggest is None:
+                await index.rebuild_suggest(
+                    settings.suggest_top_n, settings.suggest_max_words
+                )
+            else:
+                # El autocompletado mapeado corresponde a esta generación
+                index.suggest_generation = index.generation
+                index.suggest_plays = index.plays.recorded
+            index.build_seconds = time.perf_counter() - started
+            print(
+                f"[✓] Índice mapeado desde {path.name} en "
+                f"{index.build_seconds:.2f}s: {len(index.songs)} canciones, "
+                f"{len(index.albums)} álbumes, {len(index.artists)} artistas"
+            )
+            return
+        except Exception as e:
+            print(f"[!] Generación {path.name} inválida, se reconstruye: {e}")
+    await index.load(session_factory)
+
+
+index_directory = Path(settings.index_dir)
+snapshot_publisher = SnapshotPublisher(
+    search_index,
+    index_directory,
+    updater=index_updater,
+    interval=settings.index_publish_seconds,
+    plays_interval=settings.popularity_checkpoint_seconds,
+    keep=settings.index_keep_generations,
+)
+snapshot_watcher = SnapshotWatcher(
+    search_index, index_directory, interval=settings.index_poll_seconds
+)
@@ -0,0 +1,38 @@
+from typing import Iterable
+
+import numpy as np
+
+
+class StringTable:
+    """
+    Cadenas UTF-8 contiguas en un solo buffer: la i-ésima es
+    blob[offsets[i]:offsets[i+1]]. Sirve igual sobre arrays en memoria que
+    sobre secciones mapeadas de un IndexFile; se decodifica bajo demanda.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+        self._view = memoryview(blob)
+        # Índices como int de Python sin pasar por escalares numpy (bisect)
+        self._bounds = memoryview(offsets)
+
+    @classmethod
+    def build(cls, strings: Iterable[str]) -> "StringTable":
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self) -> int:
+        return self.offsets.size - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._view[self._bounds[i] : self._bounds[i + 1]], "utf-8")
+
+    def take(self, positions: np.ndarray) -> list[str]:
+        """Decodifica varias posiciones de una vez"""
+        starts = self.offsets[positions].tolist()
+        ends = self.offsets[positions + 1].tolist()
+        view = self._view
+        return [str(view[a:b], "utf-8") for a, b in zip(starts, ends)]
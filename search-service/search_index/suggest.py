@@ -0,0 +1,253 @@
+import time
+from bisect import bisect_left
+from typing import Mapping
+
+import numpy as np
+
+from search_index.string_table import StringTable
+from search_index.text import normalize
+
+_MAX_CHAR = "\U0010ffff"
+# Prefijos cortos (rangos enormes en `keys`) con top-N precalculado
+SHORT_PREFIX_LEN = 3
+ITEM_KINDS = ("song", "album", "artist")
+
+
+def _top_items(
+    entry_item: np.ndarray,
+    entry_popularity: np.ndarray,
+    lo: int,
+    hi: int,
+    n: int,
+    max_words: int,
+) -> np.ndarray:
+    """Elementos distintos más populares entre las entradas [lo, hi)"""
+    scores = entry_popularity[lo:hi]
+    # Un elemento aparece como mucho max_words veces en el rango
+    k = n * max_words
+    if scores.size > k:
+        positions = np.sort(np.argpartition(-scores, k - 1)[:k])
+    else:
+        positions = np.arange(scores.size)
+    positions = positions[np.argsort(-scores[positions], kind="stable")]
+
+    items = entry_item[lo:hi][positions]
+    _, first = np.unique(items, return_index=True)
+    return items[np.sort(first)][:n]
+
+
+def _short_tops(
+    keys,
+    prefixes: list[str],
+    entry_item: np.ndarray,
+    entry_popularity: np.ndarray,
+    top_n: int,
+    max_words: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Top-N de cada prefijo corto, concatenados: (short_starts, short_items)"""
+    tops = []
+    for prefix in prefixes:
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + _MAX_CHAR, lo)
+        tops.append(
+            _top_items(entry_item, entry_popularity, lo, hi, top_n, max_words)
+        )
+    short_starts = np.zeros(len(tops) + 1, dtype=np.int64)
+    np.cumsum([top.size for top in tops], out=short_starts[1:])
+    short_items = np.concatenate(tops) if tops else np.empty(0, dtype=np.int32)
+    return short_starts, short_items
+
+
+class SuggestIndex:
+    """
+    Autocompletado por prefijo sobre títulos y nombres normalizados.
+
+    - `keys`: claves ordenadas; cada elemento del catálogo aparece una vez
+      por cada comienzo de palabra ("cancion del mar", "del mar", "mar"),
+      así "mar" sugiere "Canción del mar".
+    - `entry_item[i]` / `entry_popularity[i]`: elemento al que pertenece
+      keys[i] y su popularidad (contigua por rango)
+    - `item_kinds` / `item_ids` / `texts`: (tipo, id, texto) por elemento
+    - `short_prefixes` / `short_items`: top-N ya resuelto para prefijos de
+      hasta SHORT_PREFIX_LEN caracteres, cuyos rangos en `keys` pueden ser
+      enormes
+
+    Como EntityIndex, son arrays planos: se publican en el archivo de
+    índice y los workers los mapean en lugar de reconstruirlos.
+
+    Una consulta es un bisect para acotar el rango del prefijo y un top-N
+    por popularidad dentro del rango.
+    """
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.arrays = dict(arrays)
+        self.keys = StringTable(arrays["key_offsets"], arrays["key_blob"])
+        self.entry_item = arrays["entry_item"]
+        self.entry_popularity = arrays["entry_popularity"]
+        self.item_kinds = arrays["item_kinds"]
+        self.item_ids = arrays["item_ids"]
+        self.texts = StringTable(arrays["text_offsets"], arrays["text_blob"])
+        self.short_prefixes = StringTable(arrays["short_offsets"], arrays["short_blob"])
+        self.short_starts = arrays["short_starts"]
+        self.short_items = arrays["short_items"]
+        built_at, top_n, max_words = arrays["meta"].tolist()
+        self.built_at = built_at
+        self.top_n = int(top_n)
+        self.max_words = int(max_words)
+
+    @classmethod
+    def build(
+        cls,
+        entities: list[tuple[str, list[tuple], np.ndarray]],
+        top_n: int = 20,
+        max_words: int = 4,
+    ) -> "SuggestIndex":
+        """
+        entities: [(tipo, filas (id, texto, ...), popularidad indexada por id)]
+        """
+        kinds: list[int] = []
+        ids: list[int] = []
+        texts: list[str] = []
+        scores: list[float] = []
+        pairs: list[tuple[str, int]] = []
+
+        for kind, rows, popularity in entities:
+            for row in rows:
+                key = normalize(row[1])
+                if not key:
+                    continue
+                item = len(ids)
+                kinds.append(ITEM_KINDS.index(kind))
+                ids.append(row[0])
+                texts.append(row[1])
+                scores.append(
+                    float(popularity[row[0]]) if row[0] < popularity.size else 0.0
+                )
+                words = key.split(" ")
+                for start in range(min(len(words), max_words)):
+                    pairs.append((" ".join(words[start:]), item))
+
+        pairs.sort()
+        keys = [key for key, _ in pairs]
+        entry_item = np.fromiter(
+            (item for _, item in pairs), dtype=np.int32, count=len(pairs)
+        )
+        entry_popularity = np.asarray(scores, dtype=np.float32)[entry_item]
+
+        # Top-N de los prefijos cortos, concatenados en un solo array
+        prefixes = sorted(
+            {key[:length] for key in keys for length in range(1, SHORT_PREFIX_LEN + 1)}
+        )
+        short_starts, short_items = _short_tops(
+            keys, prefixes, entry_item, entry_popularity, top_n, max_words
+        )
+
+        key_table = StringTable.build(keys)
+        text_table = StringTable.build(texts)
+        short_table = StringTable.build(prefixes)
+        return cls(
+            {
+                "key_offsets": key_table.offsets,
+                "key_blob": key_table.blob,
+                "entry_item": entry_item,
+                "entry_popularity": entry_popularity,
+                "item_kinds": np.asarray(kinds, dtype=np.uint8),
+                "item_ids": np.asarray(ids, dtype=np.int64),
+                "text_offsets": text_table.offsets,
+                "text_blob": text_table.blob,
+                "short_offsets": short_table.offsets,
+                "short_blob": short_table.blob,
+                "short_starts": short_starts,
+                "short_items": short_items,
+                "meta": np.array([time.time(), top_n, max_words], dtype=np.float64),
+            }
+        )
+
+    def reweighted(self, popularity: Mapping[str, np.ndarray]) -> "SuggestIndex":
+        """
+        Mismo catálogo con otra popularidad ({tipo: popularidad indexada por
+        id}): conserva claves, textos y entry_item, y solo recalcula
+        entry_popularity y el top de los prefijos cortos.
+        """
+        scores = np.zeros(self.item_ids.size, dtype=np.float32)
+        for code, kind in enumerate(ITEM_KINDS):
+            mask = self.item_kinds == code
+            ids = self.item_ids[mask]
+            values = popularity[kind]
+            known = ids < values.size
+            kind_scores = np.zeros(ids.size, dtype=np.float32)
+            kind_scores[known] = values[ids[known]]
+            scores[mask] = kind_scores
+        entry_popularity = scores[self.entry_item]
+
+        short_starts, short_items = _short_tops(
+            self.keys,
+            self.short_prefixes.take(np.arange(len(self.short_prefixes))),
+            self.entry_item,
+            entry_popularity,
+            self.top_n,
+            self.max_words,
+        )
+        return SuggestIndex(
+            {
+                **self.arrays,
+                "entry_popularity": entry_popularity,
+                "short_starts": short_starts,
+                "short_items": short_items,
+                "meta": np.array(
+                    [time.time(), self.top_n, self.max_words], dtype=np.float64
+                ),
+            }
+        )
+
+    def sections(self) -> dict[str, np.ndarray]:
+        return self.arrays
+
+    def __len__(self) -> int:
+        return self.item_ids.size
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def _short_top(self, prefix: str) -> np.ndarray | None:
+        i = bisect_left(self.short_prefixes, prefix)
+        if i == len(self.short_prefixes) or self.short_prefixes[i] != prefix:
+            return None
+        return self.short_items[self.short_starts[i] : self.short_starts[i + 1]]
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, self.top_n)
+
+        if len(prefix) <= SHORT_PREFIX_LEN:
+            top = self._short_top(prefix)
+            if top is None:
+                return []
+        else:
+            lo, hi = self._range(prefix)
+            top = _top_items(
+                self.entry_item, self.entry_popularity, lo, hi, limit, self.max_words
+            )
+
+        top = top[:limit]
+        return [
+            {"type": ITEM_KINDS[kind], "id": entity_id, "text": text}
+            for kind, entity_id, text in zip(
+                self.item_kinds[top].tolist(),
+                self.item_ids[top].tolist(),
+                self.texts.take(top),
+            )
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self),
+            "entries": len(self.keys),
+            "short_prefixes": len(self.short_prefixes),
+            "built_at": self.built_at,
+            "mapped": not self.item_ids.flags.writeable,
+        }
@@ -0,0 +1,34 @@
+import re
+import unicodedata
+
+# Palabras alfanuméricas (igual criterio que pg_trgm)
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str | None) -> str:
+    """
+    Forma clave de un texto: sin acentos, casefold y espacios colapsados
+    ("Canción  del MAR" -> "cancion del mar"). Equivale a la columna
+    generada music_streaming.search_key() en SQL (salvo casos como "ß", que
+    casefold expande a "ss"); se calcula una vez por fila (al indexar) y una
+    vez por consulta.
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(key: str) -> set[str]:
+    """
+    Trigramas de una clave normalizada. Cada palabra se rellena con dos
+    espacios al inicio y uno al final (como pg_trgm), así las palabras
+    cortas y los prefijos también generan trigramas.
+    """
+    grams: set[str] = set()
+    for word in _WORD.findall(key):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i : i + 3])
+    return grams
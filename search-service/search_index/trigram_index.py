@@ -0,0 +1,624 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+
+from search_index.index_file import IndexFile, write_index_file
+from search_index.popularity import KINDS, PlayCounters, play_counters
+from search_index.scoring import score_batch, top_k
+from search_index.string_table import StringTable
+from search_index.suggest import SuggestIndex
+from search_index.text import normalize, trigrams
+
+EMPTY = np.empty(0, dtype=np.int32)
+# Columna de la fila con el id del padre: canción -> álbum, álbum -> artista
+PARENT_COLUMN = {"songs": 4, "albums": 3}
+
+
+def gram_code(gram: str) -> int:
+    """Trigrama -> entero de 63 bits (3 code points de 21 bits)"""
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+class EntityIndex:
+    """
+    Índice invertido de trigramas para un tipo de entidad (canciones,
+    álbumes o artistas).
+
+    Layout plano (tipo CSR), inmutable una vez construido, sin objetos
+    Python por documento, de modo que puede escribirse tal cual a un
+    archivo y abrirse con mmap (ver index_file.py):
+    - `grams`: códigos de trigrama ordenados (uint64); la posición de un
+      trigrama en `grams` es su slot
+    - `offsets[i]:offsets[i+1]` delimita en `postings` los documentos
+      que contienen el trigrama i
+    - `postings`: un solo array int32 con todos los documentos
+    - `ids[doc]`, y `sorted_ids` / `sorted_docs` para buscar doc por id
+    - `parents[doc]`: id del álbum de una canción o del artista de un álbum
+      (0 si no tiene)
+    - `keys` / `rows`: claves normalizadas y filas (JSON) por documento
+
+    Las actualizaciones incrementales no tocan los arrays: un upsert agrega
+    un documento nuevo con sus postings en `delta` y marca el anterior en
+    `deleted`. Cuando el overlay crece demasiado se compacta (rebuild).
+    """
+
+    SECTIONS = (
+        "grams",
+        "offsets",
+        "postings",
+        "ids",
+        "sorted_ids",
+        "sorted_docs",
+        "parents",
+        "key_offsets",
+        "key_blob",
+        "row_offsets",
+        "row_blob",
+    )
+
+    def __init__(self, name: str, arrays: Mapping[str, np.ndarray]):
+        self.name = name
+        self.grams = arrays["grams"]
+        self.offsets = arrays["offsets"]
+        self.postings = arrays["postings"]
+        self.ids = arrays["ids"]
+        self.sorted_ids = arrays["sorted_ids"]
+        self.sorted_docs = arrays["sorted_docs"]
+        self.parents = arrays["parents"]
+        self.keys = StringTable(arrays["key_offsets"], arrays["key_blob"])
+        self.rows = StringTable(arrays["row_offsets"], arrays["row_blob"])
+        self.base_size = self.ids.size
+        # Mapeado desde un IndexFile (solo lectura) o construido en memoria
+        self.mapped = not self.ids.flags.writeable
+
+        # 🔹 Overlay de actualizaciones incrementales
+        self.extra_rows: list[tuple] = []
+        self.extra_keys: list[str] = []
+        self.overlay_doc: dict[int, int] = {}
+        self.delta: dict[str, list[int]] = {}
+        self.deleted: set[int] = set()
+
+    @classmethod
+    def build(cls, name: str, rows: Sequence[tuple], key_index: int = 1):
+        """Construye el índice a partir de las tuplas de una carga masiva"""
+        keys = [normalize(r[key_index]) for r in rows]
+
+        buckets: dict[str, list[int]] = {}
+        for doc, key in enumerate(keys):
+            for gram in trigrams(key):
+                buckets.setdefault(gram, []).append(doc)
+
+        # Slots en el orden de los códigos (búsqueda binaria en `grams`)
+        coded = sorted((gram_code(gram), gram) for gram in buckets)
+        codes = [code for code, _ in coded]
+        offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        postings = np.empty(sum(len(d) for d in buckets.values()), dtype=np.int32)
+        position = 0
+        for slot, (_, gram) in enumerate(coded):
+            docs = buckets[gram]
+            postings[position : position + len(docs)] = docs
+            position += len(docs)
+            offsets[slot + 1] = position
+
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        column = PARENT_COLUMN.get(name)
+        parents = np.fromiter(
+            ((r[column] or 0) if column is not None else 0 for r in rows),
+            dtype=np.int64,
+            count=len(rows),
+        )
+        sorted_docs = np.argsort(ids, kind="stable").astype(np.int32)
+        keys_table = StringTable.build(keys)
+        rows_table = StringTable.build(
+            json.dumps(list(r), ensure_ascii=False, separators=(",", ":"))
+            for r in rows
+        )
+        return cls(
+            name,
+            {
+                "grams": np.asarray(codes, dtype=np.uint64),
+                "offsets": offsets,
+                "postings": postings,
+                "ids": ids,
+                "sorted_ids": ids[sorted_docs],
+                "sorted_docs": sorted_docs,
+                "parents": parents,
+                "key_offsets": keys_table.offsets,
+                "key_blob": keys_table.blob,
+                "row_offsets": rows_table.offsets,
+                "row_blob": rows_table.blob,
+            },
+        )
+
+    def sections(self) -> dict[str, np.ndarray]:
+        """Arrays del layout compacto (sin overlay), para escribir a disco"""
+        return {
+            "grams": self.grams,
+            "offsets": self.offsets,
+            "postings": self.postings,
+            "ids": self.ids,
+            "sorted_ids": self.sorted_ids,
+            "sorted_docs": self.sorted_docs,
+            "parents": self.parents,
+            "key_offsets": self.keys.offsets,
+            "key_blob": self.keys.blob,
+            "row_offsets": self.rows.offsets,
+            "row_blob": self.rows.blob,
+        }
+
+    def snapshot(self) -> "EntityIndex":
+        """
+        Vista congelada: comparte los arrays y copia el overlay (pequeño),
+        para recorrerla fuera del event loop mientras llegan actualizaciones.
+        """
+        frozen = EntityIndex(self.name, self.sections())
+        frozen.extra_rows = list(self.extra_rows)
+        frozen.extra_keys = list(self.extra_keys)
+        frozen.overlay_doc = dict(self.overlay_doc)
+        frozen.deleted = set(self.deleted)
+        return frozen
+
+    def __len__(self) -> int:
+        return self.base_size + len(self.extra_rows) - len(self.deleted)
+
+    def row(self, doc: int) -> tuple:
+        if doc < self.base_size:
+            return tuple(json.loads(self.rows[doc]))
+        return self.extra_rows[doc - self.base_size]
+
+    def parents_by_id(self) -> np.ndarray:
+        """Array denso id -> id del padre de los documentos vivos"""
+        size = int(self.ids.max()) + 1 if self.ids.size else 0
+        size = max([size, *(row[0] + 1 for row in self.extra_rows)])
+        dense = np.zeros(size, dtype=np.int64)
+        live = np.ones(self.base_size, dtype=bool)
+        live[[doc for doc in self.deleted if doc < self.base_size]] = False
+        dense[self.ids[live]] = self.parents[live]
+        column = PARENT_COLUMN[self.name]
+        for doc, row in enumerate(self.extra_rows, start=self.base_size):
+            if doc not in self.deleted:
+                dense[row[0]] = row[column] or 0
+        return dense
+
+    def doc_for(self, entity_id: int) -> int | None:
+        """Documento vivo de un id, o None"""
+        doc = self.overlay_doc.get(entity_id)
+        if doc is None:
+            i = int(np.searchsorted(self.sorted_ids, entity_id))
+            if i < self.sorted_ids.size and self.sorted_ids[i] == entity_id:
+                doc = int(self.sorted_docs[i])
+        if doc is None or doc in self.deleted:
+            return None
+        return doc
+
+    def _keys_of(self, docs: np.ndarray) -> list[str]:
+        if not self.extra_keys:
+            return self.keys.take(docs)
+        base = self.base_size
+        return [
+            self.keys[doc] if doc < base else self.extra_keys[doc - base]
+            for doc in docs.tolist()
+        ]
+
+    def _ids_of(self, docs: np.ndarray) -> np.ndarray:
+        if not self.extra_rows:
+            return self.ids[docs]
+        base = self.base_size
+        return np.fromiter(
+            (
+                self.ids[doc] if doc < base else self.extra_rows[doc - base][0]
+                for doc in docs.tolist()
+            ),
+            dtype=np.int64,
+            count=docs.size,
+        )
+
+    def postings_for(self, gram: str) -> np.ndarray:
+        code = gram_code(gram)
+        slot = int(np.searchsorted(self.grams, code))
+        if slot == self.grams.size or self.grams[slot] != code:
+            return EMPTY
+        return self.postings[self.offsets[slot] : self.offsets[slot + 1]]
+
+    def upsert(self, row: tuple, key_index: int = 1) -> None:
+        """Inserta o reemplaza un documento por id (row[0])"""
+        self.delete(row[0])
+        doc = self.base_size + len(self.extra_rows)
+        key = normalize(row[key_index])
+        self.extra_rows.append(row)
+        self.extra_keys.append(key)
+        self.overlay_doc[row[0]] = doc
+        for gram in trigrams(key):
+            self.delta.setdefault(gram, []).append(doc)
+
+    def delete(self, entity_id: int) -> None:
+        doc = self.doc_for(entity_id)
+        if doc is not None:
+            self.deleted.add(doc)
+        self.overlay_doc.pop(entity_id, None)
+
+    @property
+    def overlay_size(self) -> int:
+        """Documentos fuera del layout compacto (nuevos + eliminados)"""
+        return len(self.extra_rows) + len(self.deleted)
+
+    def live_rows(self) -> list[tuple]:
+        total = self.base_size + len(self.extra_rows)
+        return [self.row(doc) for doc in range(total) if doc not in self.deleted]
+
+    def candidates(
+        self, query_grams: set[str], min_overlap: float, max_candidates: int
+    ) -> np.ndarray:
+        """
+        Documentos que comparten al menos `min_overlap` de los trigramas de
+        la consulta. Si hay demasiados, se quedan los de más coincidencias.
+        """
+        codes = np.fromiter(
+            (gram_code(g) for g in query_grams),
+            dtype=np.uint64,
+            count=len(query_grams),
+        )
+        slots = np.searchsorted(self.grams, codes)
+        found = slots < self.grams.size
+        slots = slots[found]
+        slots = slots[self.grams[slots] == codes[found]]
+
+        lists = [self.postings[self.offsets[s] : self.offsets[s + 1]] for s in slots]
+        lists += [
+            np.array(self.delta[g], dtype=np.int32)
+            for g in query_grams
+            if g in self.delta
+        ]
+        lists = [p for p in lists if p.size]
+        if not lists:
+            return EMPTY
+
+        hits = np.bincount(np.concatenate(lists))
+        required = max(1, int(np.ceil(len(query_grams) * min_overlap)))
+        docs = np.flatnonzero(hits >= required)
+        if self.deleted:
+            dead = np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))
+            docs = docs[~np.isin(docs, dead)]
+
+        if docs.size > max_candidates:
+            top = np.argpartition(hits[docs], -max_candidates)[-max_candidates:]
+            docs = docs[top]
+        return docs
+
+    def search(
+        self,
+        query: str,
+        query_grams: set[str],
+        threshold: int,
+        min_overlap: float,
+        max_candidates: int,
+        limit: int | None = None,
+        boost: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> list[tuple]:
+        """
+        Candidatos por trigramas, re-ordenados por similitud fuzzy.
+        Con `limit` solo se ordenan los `limit` mejores (top-k).
+        `boost(ids)` suma un bonus por id al ordenar (el umbral sigue
+        aplicándose a la similitud sola).
+        """
+        docs = self.candidates(query_grams, min_overlap, max_candidates)
+        if not docs.size:
+            return []
+
+        # Claves ya normalizadas: sin preprocesado por fila
+        scores = score_batch(query, self._keys_of(docs), threshold)
+        rank_by = None
+        if boost is not None:
+            rank_by = scores + boost(self._ids_of(docs))
+        # Solo se decodifican las filas que se devuelven
+        return [self.row(docs[i]) for i in top_k(scores, threshold, limit, rank_by)]
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self),
+            "overlay": self.overlay_size,
+            "trigrams": int(self.grams.size),
+            "postings": int(self.postings.size),
+            "mapped": self.mapped,
+            "bytes": int(sum(a.nbytes for a in self.sections().values())),
+        }
+
+
+class SearchIndex:
+    """
+    Motor de búsqueda en memoria: un EntityIndex por tipo de entidad,
+    construido con una carga masiva desde la base de datos o mapeado desde
+    la última generación publicada en disco. Las consultas no tocan
+    Postgres.
+    """
+
+    def __init__(self, plays: PlayCounters = play_counters):
+        self.songs: EntityIndex | None = None
+        self.albums: EntityIndex | None = None
+        self.artists: EntityIndex | None = None
+        self.generation = 0
+        self.built_at: float | None = None
+        self.build_seconds = 0.0
+        # Generación en disco que respalda los arrays (None: solo en memoria)
+        self.file: IndexFile | None = None
+        # id -> padre (canción -> álbum, álbum -> artista) para record_play;
+        # se construyen al primer uso: los workers no registran reproducciones
+        self.links: dict[str, np.ndarray] = {}
+
+        # 🔹 Autocompletado por prefijo y popularidad (reproducciones decaídas)
+        self.suggest: SuggestIndex | None = None
+        self.suggest_generation = 0
+        self.suggest_plays = 0
+        self.plays = plays
+
+    @property
+    def ready(self) -> bool:
+        return self.songs is not None
+
+    def entity(self, name: str) -> EntityIndex:
+        return {"songs": self.songs, "albums": self.albums, "artists": self.artists}[
+            name
+        ]
+
+    def apply(self, ops: list[tuple[str, str, object]]) -> None:
+        """
+        Aplica un lote de operaciones (entidad, "upsert" | "delete", fila | id)
+        y avanza la generación una sola vez por lote.
+        """
+        for name, op, value in ops:
+            entity = self.entity(name)
+            if op == "upsert":
+                entity.upsert(value)
+                if name in self.links:
+                    self._set_link(name, value[0], value[PARENT_COLUMN[name]] or 0)
+            else:
+                entity.delete(value)
+                if name in self.links:
+                    self._set_link(name, value, 0)
+        self.generation += 1
+
+    def _link(self, name: str) -> np.ndarray:
+        link = self.links.get(name)
+        if link is None:
+            link = self.links[name] = self.entity(name).parents_by_id()
+        return link
+
+    def _set_link(self, name: str, entity_id: int, parent_id: int) -> None:
+        link = self.links[name]
+        if entity_id >= link.size:
+            grown = np.zeros(max(entity_id + 1, link.size * 2), dtype=np.int64)
+            grown[: link.size] = link
+            self.links[name] = link = grown
+        link[entity_id] = parent_id
+
+    def record_play(self, song_id: int) -> None:
+        """
+        Suma una reproducción a la canción, su álbum y su artista: dos
+        lecturas en arrays densos por id, sin decodificar filas.
+        """
+        if self.songs is None:
+            self.plays.record(song_id)
+            return
+        song_album, album_artist = self._link("songs"), self._link("albums")
+        album_id = int(song_album[song_id]) if 0 <= song_id < song_album.size else 0
+        artist_id = int(album_artist[album_id]) if album_id < album_artist.size else 0
+        self.plays.record(song_id, album_id or None, artist_id or None)
+
+    def needs_compaction(self, ratio: float) -> list[str]:
+        return [
+            index.name
+            for index in (self.songs, self.albums, self.artists)
+            if index is not None
+            and index.overlay_size > max(1000, ratio * index.base_size)
+        ]
+
+    async def compact(self, name: str) -> None:
+        """
+        Reconstruye el layout compacto de una entidad desde sus filas vivas.
+        Quien llama no debe aplicar actualizaciones mientras tanto.
+        """
+        frozen = self.entity(name).snapshot()
+        rebuilt = await asyncio.to_thread(
+            lambda: EntityIndex.build(name, frozen.live_rows())
+        )
+        setattr(self, name, rebuilt)
+        self.links.pop(name, None)
+        self.generation += 1
+        print(f"[✓] Índice de {name} compactado: {len(rebuilt)} documentos")
+
+    def suggest_stale(self, max_age: float) -> bool:
+        """
+        El autocompletado no refleja la generación actual (o hubo
+        reproducciones desde que se construyó) y ya es viejo
+        """
+        if self.suggest is None:
+            return self.ready
+        return (
+            (
+                self.suggest_generation != self.generation
+                or self.suggest_plays != self.plays.recorded
+            )
+            and time.time() - self.suggest.built_at >= max_age
+        )
+
+    async def rebuild_suggest(self, top_n: int, max_words: int) -> None:
+        """
+        Reconstruye el índice de prefijos (fuera del event loop). Si el
+        catálogo no cambió desde el último build, solo cambió la popularidad:
+        se conservan las claves y se recalcula el orden.
+        """
+        generation = self.generation
+        plays = self.plays.recorded
+        suggest = self.suggest
+        if suggest is not None and self.suggest_generation == generation:
+            popularity = {
+                kind: self.plays.snapshot(entity.name)
+                for kind, entity in (
+                    ("song", self.songs),
+                    ("album", self.albums),
+                    ("artist", self.artists),
+                )
+            }
+            self.suggest = await asyncio.to_thread(suggest.reweighted, popularity)
+            self.suggest_plays = plays
+            return
+
+        # Instantánea en el loop; decodificar filas y construir va en un hilo
+        frozen = [
+            (kind, entity.snapshot(), self.plays.snapshot(entity.name))
+            for kind, entity in (
+                ("song", self.songs),
+                ("album", self.albums),
+                ("artist", self.artists),
+            )
+        ]
+        self.suggest = await asyncio.to_thread(
+            lambda: SuggestIndex.build(
+                [(kind, entity.live_rows(), plays) for kind, entity, plays in frozen],
+                top_n,
+                max_words,
+            )
+        )
+        self.suggest_generation = generation
+        self.suggest_plays = plays
+
+    async def publish(self, directory: Path, generation: int) -> Path:
+        """
+        Escribe el índice (compactado), el autocompletado y los contadores
+        de popularidad como una nueva generación en disco. Si no hubo
+        actualizaciones durante la escritura, este proceso pasa a usar
+        también el archivo mapeado.
+        """
+        index_generation = self.generation
+        frozen = [
+            entity.snapshot() for entity in (self.songs, self.albums, self.artists)
+        ]
+        plays = self.plays.arrays()
+        suggest = self.suggest
+
+        def write() -> Path:
+            compacted = [
+                entity
+                if not entity.overlay_size
+                else EntityIndex.build(entity.name, entity.live_rows())
+                for entity in frozen
+            ]
+            sections = {
+                f"{entity.name}.{part}": array
+                for entity in compacted
+                for part, array in entity.sections().items()
+            }
+            sections.update({f"plays.{part}": a for part, a in plays.items()})
+            if suggest is not None:
+                sections.update(
+                    {f"suggest.{part}": a for part, a in suggest.sections().items()}
+                )
+            return write_index_file(directory, generation, sections)
+
+        path = await asyncio.to_thread(write)
+        if self.generation == index_generation:
+            # Mismo contenido: los arrays id -> padre siguen valiendo
+            links = self.links
+            self.adopt(
+                IndexFile(path), with_plays=False, with_suggest=self.suggest is suggest
+            )
+            self.links = links
+        return path
+
+    def adopt(
+        self, index_file: IndexFile, with_plays: bool, with_suggest: bool = True
+    ) -> None:
+        """
+        Reemplaza los arrays por los de una generación mapeada (hot swap).
+        Las asignaciones ocurren sin await: una consulta ve el índice
+        anterior o el nuevo completo.
+        """
+        self.songs, self.albums, self.artists = (
+            EntityIndex(name, index_file.group(name)) for name in KINDS
+        )
+        self.links = {}
+        if with_suggest and "suggest.meta" in index_file:
+            self.suggest = SuggestIndex(index_file.group("suggest"))
+        if with_plays and "plays.epoch" in index_file:
+            self.plays.restore(
+                float(index_file["plays.epoch"][0]),
+                {kind: index_file[f"plays.{kind}"] for kind in KINDS},
+            )
+        self.file = index_file
+        self.built_at = index_file.created_at
+
+    async def load(self, session_factory) -> None:
+        """Carga masiva de las tres tablas y construcción del índice"""
+        # Import local: los repositorios dependen de la conexión a la BD
+        from repositories.song_repository import SongRepository
+        from repositories.album_repository import AlbumRepository
+        from repositories.artist_repository import ArtistRepository
+        from repositories.popularity_repository import PopularityRepository
+        from config import settings
+
+        started = time.perf_counter()
+        async with session_factory() as session:
+            songs = await SongRepository(session).all_for_index()
+            albums = await AlbumRepository(session).all_for_index()
+            artists = await ArtistRepository(session).all_for_index()
+        # Sin checkpoint en disco, los contadores parten del historial completo
+        if self.plays.empty:
+            try:
+                async with session_factory() as session:
+                    counts = await PopularityRepository(session).play_counts()
+                for kind, by_id in counts.items():
+                    self.plays.seed(kind, by_id)
+            except Exception as e:
+                # Sin historial el autocompletado ordena alfabéticamente
+                print(f"[!] No se pudo cargar la popularidad: {e}")
+
+        # La construcción es CPU pura: fuera del event loop
+        built = await asyncio.to_thread(
+            lambda: (
+                EntityIndex.build("songs", songs),
+                EntityIndex.build("albums", albums),
+                EntityIndex.build("artists", artists),
+            )
+        )
+        self.songs, self.albums, self.artists = built
+        self.links = {}
+        self.generation += 1
+        await self.rebuild_suggest(settings.suggest_top_n, settings.suggest_max_words)
+        self.built_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+        print(
+            f"[✓] Índice de búsqueda construido en {self.build_seconds:.2f}s: "
+            f"{len(self.songs)} canciones, {len(self.albums)} álbumes, "
+            f"{len(self.artists)} artistas"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "generation": self.generation,
+            "built_at": self.built_at,
+            "build_seconds": round(self.build_seconds, 3),
+            "file": (
+                {
+                    "path": str(self.file.path),
+                    "generation": self.file.generation,
+                    "bytes": self.file.nbytes,
+                }
+                if self.file
+                else None
+            ),
+            "suggest": self.suggest.stats() if self.suggest else None,
+            "popularity": self.plays.stats(),
+            "entities": {
+                index.name: index.stats()
+                for index in (self.songs, self.albums, self.artists)
+                if index is not None
+            },
+        }
+
+
+search_index = SearchIndex()
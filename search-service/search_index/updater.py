@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+from search_index.trigram_index import SearchIndex, search_index
+from config import settings
+
+
+class IndexUpdater:
+    """
+    Aplica al índice en memoria las actualizaciones que llegan por eventos.
+
+    Las operaciones se encolan sin coste y se aplican en lotes cada
+    `window` segundos (o al llegar a `batch_size`), de modo que una ráfaga
+    de eventos avanza la generación del índice una sola vez. Tras cada
+    lote, si el overlay de alguna entidad creció demasiado, se compacta.
+
+    El mensaje de cada evento viaja con su última operación: una vez
+    aplicado queda en `unpublished` hasta que SnapshotPublisher lo confirma
+    junto con la generación que lo incluye. Al llegar a `max_unpublished`
+    se pide publicar antes de tiempo.
+    """
+
+    def __init__(
+        self,
+        index: SearchIndex,
+        window: float = 0.05,
+        batch_size: int = 500,
+        compaction_ratio: float = 0.1,
+        max_unpublished: int = 5000,
+    ):
+        self.index = index
+        self.window = window
+        self.batch_size = batch_size
+        self.compaction_ratio = compaction_ratio
+        self.max_unpublished = max_unpublished
+
+        self._pending: asyncio.Queue[tuple[float, tuple, object]] = asyncio.Queue()
+        self.unpublished: list = []
+        self.publish_requested = asyncio.Event()
+        self.applied = 0
+        self.batches = 0
+        self.last_applied_at: float | None = None
+        self.last_batch_lag = 0.0
+
+    def submit(self, *ops: tuple, message=None) -> None:
+        """
+        Encola operaciones (entidad, "upsert" | "delete", fila | id) de un
+        evento; `message` se confirma después de publicar la última.
+        """
+        received_at = time.time()
+        for i, op in enumerate(ops, start=1):
+            self._pending.put_nowait(
+                (received_at, op, message if i == len(ops) else None)
+            )
+
+    def take_unpublished(self) -> list:
+        """Mensajes aplicados al índice, a confirmar tras publicarlo"""
+        messages, self.unpublished = self.unpublished, []
+        return messages
+
+    def restore_unpublished(self, messages: list) -> None:
+        """La publicación falló: vuelven a esperar la siguiente"""
+        self.unpublished[:0] = messages
+
+    def _drain(self, limit: int) -> list[tuple[float, tuple, object]]:
+        batch = []
+        while len(batch) < limit and not self._pending.empty():
+            batch.append(self._pending.get_nowait())
+        return batch
+
+    async def _refresh_suggest(self) -> None:
+        # El autocompletado se reconstruye como mucho cada N segundos
+        if self.index.suggest_stale(settings.suggest_refresh_seconds):
+            try:
+                await self.index.rebuild_suggest(
+                    settings.suggest_top_n, settings.suggest_max_words
+                )
+            except Exception as e:
+                print(f"[!] Error reconstruyendo el autocompletado: {e}")
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                first = await asyncio.wait_for(
+                    self._pending.get(), timeout=settings.suggest_refresh_seconds
+                )
+            except asyncio.TimeoutError:
+                # Sin cambios de catálogo: la popularidad puede haber cambiado
+                await self._refresh_suggest()
+                continue
+            # Ventana corta para agrupar la ráfaga en un solo lote
+            await asyncio.sleep(self.window)
+            batch = [first, *self._drain(self.batch_size - 1)]
+
+            self.index.apply([op for _, op, _ in batch])
+            self.unpublished.extend(m for _, _, m in batch if m is not None)
+            if len(self.unpublished) >= self.max_unpublished:
+                self.publish_requested.set()
+            now = time.time()
+            self.applied += len(batch)
+            self.batches += 1
+            self.last_applied_at = now
+            self.last_batch_lag = now - batch[0][0]
+
+            for name in self.index.needs_compaction(self.compaction_ratio):
+                try:
+                    await self.index.compact(name)
+                except Exception as e:
+                    print(f"[!] Error compactando el índice de {name}: {e}")
+
+            await self._refresh_suggest()
+
+    def stats(self) -> dict:
+        oldest = None
+        if not self._pending.empty():
+            # Acceso de solo lectura a la cola interna para medir el lag
+            oldest = self._pending._queue[0][0]  # type: ignore[attr-defined]
+        return {
+            "generation": self.index.generation,
+            "pending": self._pending.qsize(),
+            "unpublished": len(self.unpublished),
+            "applied": self.applied,
+            "batches": self.batches,
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "last_batch_lag_seconds": round(self.last_batch_lag, 3),
+            "last_applied_at": self.last_applied_at,
+        }
+
+
+index_updater = IndexUpdater(
+    search_index,
+    window=settings.index_update_window_ms / 1000,
+    batch_size=settings.index_update_batch_size,
+    compaction_ratio=settings.index_compaction_ratio,
+    max_unpublished=settings.index_max_unacked,
+)
@@ -0,0 +1,34 @@
+import base64
+import json
+
+CURSOR_VERSION = 1
+# Posición de cada entidad dentro de la lista ordenada en caché
+CURSOR_FIELDS = {"songs": "s", "albums": "a", "artists": "r"}
+
+
+def encode_cursor(positions: dict[str, int]) -> str:
+    """Token opaco con las posiciones de canciones, álbumes y artistas"""
+    payload = {"v": CURSOR_VERSION}
+    payload.update({short: positions[name] for name, short in CURSOR_FIELDS.items()})
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> dict[str, int]:
+    """Lanza ValueError si el token no es válido"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("Cursor inválido")
+
+    positions = {}
+    for name, short in CURSOR_FIELDS.items():
+        value = payload.get(short)
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("Cursor inválido")
+        positions[name] = value
+    return positions
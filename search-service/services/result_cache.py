@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from strategies.base_strategy import SearchResults
+from config import settings
+
+
+class RankedResultCache:
+    """
+    Caché en memoria de listas de resultados ya ordenadas, por consulta
+    normalizada, con TTL y expulsión LRU. Todas las páginas de una misma
+    consulta se sirven de la misma entrada, sin volver a buscar.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[SearchResults, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> SearchResults | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: tuple, results: SearchResults) -> None:
+        self._entries[key] = (results, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+ranked_result_cache = RankedResultCache(
+    settings.search_cache_size, settings.search_cache_ttl_seconds
+)
@@ -1,11 +1,48 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from strategies.base_strategy import SearchStrategy
+from strategies.base_strategy import SearchStrategy, SearchResults
 from services.serializers import serialize_song, serialize_album, serialize_artist
+from services.result_cache import RankedResultCache, ranked_result_cache
+from services.cursor import encode_cursor
+from search_index.text import normalize
+from config import settings
+
+ENTITIES = ("songs", "albums", "artists")
 
 
 class SearchService:
-    def __init__(self, strategy: SearchStrategy):
+    def __init__(
+        self, strategy: SearchStrategy, cache: RankedResultCache = ranked_result_cache
+    ):
         self.strategy = strategy
+        self.cache = cache
+
+    async def _ranked(
+        self, session: AsyncSession, query: str, needed: int
+    ) -> SearchResults:
+        """
+        Lista ordenada de una consulta con al menos `needed` resultados por
+        entidad (si existen). Se calcula una vez y todas sus páginas salen
+        de la caché; si un cursor pide más allá de una lista cortada, se
+        vuelve a ordenar con el doble de profundidad (hasta search_max_depth).
+        """
+        key = (self.strategy.cache_namespace(), normalize(query))
+        cached = self.cache.get(key)
+        depth = max(needed, settings.search_max_results)
+        if cached is not None:
+            deeper = cached.depth < min(needed, settings.search_max_depth) and any(
+                cached.cut(name) for name in ENTITIES
+            )
+            if not deeper:
+                return cached
+            depth = max(depth, 2 * cached.depth)
+        depth = min(depth, settings.search_max_depth)
+
+        results = await self.strategy.search(session, query, depth, 0, 0, 0)
+        results.depth = depth
+        # Los resultados parciales (timeouts) no se cachean
+        if not results.partial:
+            self.cache.set(key, results)
+        return results
 
     async def search(
         self,
@@ -16,21 +53,50 @@ class SearchService:
         offset_albums: int = 0,
         offset_artists: int = 0,
     ) -> dict:
-        songs, albums, artists = await self.strategy.search(
-            session, query, limit, offset_songs, offset_albums, offset_artists
-        )
+        offsets = {
+            "songs": offset_songs,
+            "albums": offset_albums,
+            "artists": offset_artists,
+        }
+        # Un resultado más que la página para saber si hay siguiente
+        results = await self._ranked(session, query, max(offsets.values()) + limit + 1)
+        pages = {
+            name: getattr(results, name)[offset : offset + limit]
+            for name, offset in offsets.items()
+        }
+
+        # Cursor a la página siguiente si alguna entidad tiene más resultados
+        next_positions = {
+            name: min(offset + limit, len(getattr(results, name)))
+            for name, offset in offsets.items()
+        }
+        entity_has_more = {
+            name: next_positions[name] < len(getattr(results, name))
+            for name in offsets
+        }
+        # Listas cortadas en search_max_depth que esta página ya agotó: puede
+        # haber más resultados, pero no se sirven (no es el final real)
+        truncated = [
+            name for name in offsets if results.cut(name) and not entity_has_more[name]
+        ]
+
+        def section(name: str, serialize) -> dict:
+            return {
+                "page": (offsets[name] // limit) + 1,
+                "results": [serialize(row) for row in pages[name]],
+                "has_more": entity_has_more[name],
+                # Sin total exacto si la lista fue cortada
+                "total": None if results.cut(name) else len(getattr(results, name)),
+            }
 
         return {
-            "songs": {
-                "page": (offset_songs // limit) + 1,
-                "results": [serialize_song(s) for s in songs],
-            },
-            "albums": {
-                "page": (offset_albums // limit) + 1,
-                "results": [serialize_album(a) for a in albums],
-            },
-            "artists": {
-                "page": (offset_artists // limit) + 1,
-                "results": [serialize_artist(ar) for ar in artists],
-            },
+            "songs": section("songs", serialize_song),
+            "albums": section("albums", serialize_album),
+            "artists": section("artists", serialize_artist),
+            # Entidades que no respondieron a tiempo (resultados incompletos)
+            "partial": results.partial,
+            "truncated": truncated,
+            "next_cursor": (
+                encode_cursor(next_positions) if any(entity_has_more.values()) else None
+            ),
         }
@@ -1,10 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from dataclasses import dataclass, field
+from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.models import Song, Album, Artist
+
+
+@dataclass
+class SearchResults:
+    songs: List = field(default_factory=list)
+    albums: List = field(default_factory=list)
+    artists: List = field(default_factory=list)
+    # Entidades que no respondieron a tiempo (resultados parciales)
+    partial: List[str] = field(default_factory=list)
+    # Resultados pedidos por entidad: una lista de ese largo fue cortada
+    depth: int = 0
+
+    def cut(self, name: str) -> bool:
+        """La lista de la entidad llegó a `depth`: puede haber más"""
+        return len(getattr(self, name)) >= self.depth
+
+    def __iter__(self):
+        # Compatibilidad: songs, albums, artists = await strategy.search(...)
+        return iter((self.songs, self.albums, self.artists))
 
 
 class SearchStrategy(ABC):
+    def cache_namespace(self) -> str:
+        """Prefijo de las entradas en la caché de resultados ordenados"""
+        return type(self).__name__
+
     @abstractmethod
     async def search(
         self,
@@ -14,4 +37,4 @@ class SearchStrategy(ABC):
         offset_songs: int,
         offset_albums: int,
         offset_artists: int,
-    ) -> Tuple[List[Song], List[Album], List[Artist]]: ...
+    ) -> SearchResults: ...
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from config import settings
+from database.connection import AsyncSessionLocal, SESSIONS_PER_SEARCH
+from strategies.base_strategy import SearchResults
+
+Lookup = Callable[[AsyncSession], Awaitable[list]]
+
+# Consultas en BD simultáneas por proceso (3 por búsqueda en el fan-out):
+# acota las conexiones pedidas al tamaño del pool
+_db_searches = asyncio.Semaphore(SESSIONS_PER_SEARCH * settings.db_search_concurrency)
+
+
+async def fan_out(
+    songs: Lookup,
+    albums: Lookup,
+    artists: Lookup,
+    timeout: float,
+    session_factory: async_sessionmaker = AsyncSessionLocal,
+) -> SearchResults:
+    """
+    Ejecuta las búsquedas de canciones, álbumes y artistas en paralelo, cada
+    una en su propia sesión (conexión del pool) y con su propio timeout.
+    La latencia es la de la consulta más lenta, no la suma de las tres; una
+    entidad que no responde a tiempo se devuelve vacía y marcada en `partial`.
+
+    El timeout incluye la espera por turno (semáforo) y por conexión: un
+    proceso saturado responde `partial` en lugar de encolar sin límite.
+    """
+
+    async def run(lookup: Lookup) -> list:
+        async with _db_searches:
+            async with session_factory() as session:
+                return list(await lookup(session))
+
+    names = ("songs", "albums", "artists")
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(run(lookup), timeout) for lookup in (songs, albums, artists)),
+        return_exceptions=True,
+    )
+
+    results = SearchResults()
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):
+            if isinstance(outcome, asyncio.TimeoutError):
+                print(f"[!] Búsqueda de {name} excedió {timeout:.2f}s")
+            else:
+                print(f"[!] Error en búsqueda de {name}: {outcome}")
+            results.partial.append(name)
+            continue
+        setattr(results, name, outcome)
+    return results
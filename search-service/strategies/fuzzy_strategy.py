@@ -1,38 +1,59 @@
-from rapidfuzz import fuzz
-from typing import List, Tuple
-from strategies.base_strategy import SearchStrategy
+from typing import List
+import numpy as np
+from search_index.popularity import play_counters
+from search_index.scoring import score_batch, top_k
+from search_index.text import normalize
+from strategies.base_strategy import SearchStrategy, SearchResults
+from strategies.fan_out import fan_out
 from repositories.song_repository import SongRepository
 from repositories.album_repository import AlbumRepository
 from repositories.artist_repository import ArtistRepository
 from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
 
 
 class FuzzySearchStrategy(SearchStrategy):
     def __init__(self, threshold: int = 70):
         self.threshold = threshold
 
-    async def _filter_tuples(self, tuples_list, query: str, field_index: int) -> List:
+    async def _filter_tuples(
+        self,
+        tuples_list,
+        query: str,
+        key_index: int,
+        limit: int | None = None,
+        kind: str | None = None,
+    ) -> List:
         """
-        Filtra una lista de TUPLAS usando fuzzy matching sobre un campo específico.
+        Filtra una lista de TUPLAS usando fuzzy matching sobre la clave de
+        búsqueda precalculada en SQL (sin acentos, minúsculas). El puntaje se
+        calcula en lote (rapidfuzz.process.cdist), sin transformar cada fila.
 
         Args:
             tuples_list: Lista de tuplas retornadas por los repositorios
-            query: Término de búsqueda
-            field_index: Índice en la tupla donde está el campo a comparar
+            query: Término de búsqueda ya normalizado
+            key_index: Índice en la tupla donde está la clave de búsqueda
+            limit: Cantidad máxima de resultados (top-k)
+            kind: Entidad ("songs", "albums", "artists") para sumar el bonus
+                de popularidad al ordenar
         """
-        filtered = []
-        for tuple_item in tuples_list:
-            # Verificar que la tupla tenga suficientes elementos y el campo no sea None
-            if len(tuple_item) > field_index and tuple_item[field_index]:
-                similarity = fuzz.partial_ratio(
-                    query.lower(), str(tuple_item[field_index]).lower()
-                )
-                if similarity >= self.threshold:
-                    filtered.append((tuple_item, similarity))
+        # Descartar tuplas sin la clave a comparar
+        candidates = [t for t in tuples_list if len(t) > key_index and t[key_index]]
+        choices = [t[key_index] for t in candidates]
 
-        # Ordenar por similitud (mayor a menor) y retornar solo las tuplas
-        filtered.sort(key=lambda x: x[1], reverse=True)
-        return [item for item, score in filtered]
+        scores = score_batch(query, choices, self.threshold)
+        rank_by = None
+        if kind is not None and candidates:
+            ids = np.fromiter((t[0] for t in candidates), dtype=np.int64)
+            rank_by = scores + play_counters.boost(
+                kind,
+                ids,
+                settings.popularity_boost_weight,
+                settings.popularity_boost_pivot,
+            )
+        return [
+            candidates[i] for i in top_k(scores, self.threshold, limit, rank_by)
+        ]
 
     async def search(
         self,
@@ -42,37 +63,36 @@ class FuzzySearchStrategy(SearchStrategy):
         offset_songs: int,
         offset_albums: int,
         offset_artists: int,
-    ) -> Tuple[List, List, List]:
-        song_repo = SongRepository(session)
-        album_repo = AlbumRepository(session)
-        artist_repo = ArtistRepository(session)
+    ) -> SearchResults:
+        # La consulta se normaliza una vez, igual que las claves en SQL
+        query = normalize(query)
+        if not query:
+            return SearchResults()
 
-        try:
-            # Traer resultados de los repositorios (ahora TODOS retornan tuplas)
-            songs = await song_repo.get_by_title_ilike(query, limit * 3, offset_songs)
-            albums = await album_repo.get_by_title_ilike(
+        # Cada entidad en su propia sesión, en paralelo (ver fan_out)
+        results = await fan_out(
+            songs=lambda s: SongRepository(s).get_by_title_ilike(
+                query, limit * 3, offset_songs
+            ),
+            albums=lambda s: AlbumRepository(s).get_by_title_ilike(
                 query, limit * 3, offset_albums
-            )
-            artists = await artist_repo.search_by_name(query, limit * 3, offset_artists)
-
-            # Filtrar usando fuzzy matching sobre las tuplas
-            # Índices: songs[1]=title, albums[1]=title, artists[1]=artist_name
-            filtered_songs = await self._filter_tuples(
-                songs, query, 1
-            )  # title está en índice 1
-            filtered_albums = await self._filter_tuples(
-                albums, query, 1
-            )  # title está en índice 1
-            filtered_artists = await self._filter_tuples(
-                artists, query, 1
-            )  # artist_name está en índice 1
-
-            return (
-                filtered_songs[:limit],
-                filtered_albums[:limit],
-                filtered_artists[:limit],
-            )
+            ),
+            artists=lambda s: ArtistRepository(s).search_by_name(
+                query, limit * 3, offset_artists
+            ),
+            timeout=settings.search_entity_timeout_ms / 1000,
+        )
 
-        except Exception as e:
-            print(f"Error en búsqueda fuzzy: {e}")
-            return [], [], []
+        # Filtrar usando fuzzy matching sobre las claves de búsqueda
+        # Índices: songs[5]=title_key, albums[3]=title_key,
+        # artists[5]=artist_name_key
+        results.songs = await self._filter_tuples(
+            results.songs, query, 5, limit, "songs"
+        )
+        results.albums = await self._filter_tuples(
+            results.albums, query, 3, limit, "albums"
+        )
+        results.artists = await self._filter_tuples(
+            results.artists, query, 5, limit, "artists"
+        )
+        return results
@@ -0,0 +1,60 @@
+from functools import partial
+from sqlalchemy.ext.asyncio import AsyncSession
+from strategies.base_strategy import SearchStrategy, SearchResults
+from search_index.trigram_index import SearchIndex, search_index
+from search_index.text import normalize, trigrams
+from config import settings
+
+
+class InMemorySearchStrategy(SearchStrategy):
+    """
+    Búsqueda sobre el índice invertido de trigramas en memoria.
+    No usa la sesión: el camino caliente nunca toca Postgres.
+    """
+
+    def __init__(self, threshold: int = 70, index: SearchIndex = search_index):
+        self.threshold = threshold
+        self.index = index
+
+    def cache_namespace(self) -> str:
+        # Cada lote de actualizaciones del índice invalida la caché
+        return f"memory:{self.index.generation}"
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+        offset_songs: int,
+        offset_albums: int,
+        offset_artists: int,
+    ) -> SearchResults:
+        key = normalize(query)
+        grams = trigrams(key)
+        if not grams:
+            return SearchResults()
+
+        results = []
+        plays = self.index.plays
+        for entity, offset in (
+            (self.index.songs, offset_songs),
+            (self.index.albums, offset_albums),
+            (self.index.artists, offset_artists),
+        ):
+            ranked = entity.search(
+                key,
+                grams,
+                self.threshold,
+                settings.index_min_overlap,
+                settings.index_max_candidates,
+                limit=offset + limit,
+                boost=partial(
+                    plays.boost,
+                    entity.name,
+                    weight=settings.popularity_boost_weight,
+                    pivot=settings.popularity_boost_pivot,
+                ),
+            )
+            results.append(ranked[offset : offset + limit])
+
+        return SearchResults(results[0], results[1], results[2])
@@ -0,0 +1,60 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from strategies.base_strategy import SearchStrategy, SearchResults
+from strategies.fan_out import fan_out
+from repositories.song_repository import SongRepository
+from repositories.album_repository import AlbumRepository
+from repositories.artist_repository import ArtistRepository
+from config import settings
+
+
+class TrigramSearchStrategy(SearchStrategy):
+    """
+    Búsqueda en Postgres con pg_trgm sobre las claves precalculadas (ver
+    migrations/001_trgm_indexes.sql).
+
+    Usa similitud por palabra (`<%` / word_similarity): una consulta corta
+    como "mar" encuentra "Canción del mar", igual que partial_ratio en la
+    estrategia fuzzy. Filtrado, ranking y paginado ocurren en SQL.
+    """
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+
+    async def _set_threshold(self, session: AsyncSession) -> None:
+        # Umbral de `<%` solo para la transacción de esta sesión
+        await session.execute(
+            select(
+                func.set_config(
+                    "pg_trgm.word_similarity_threshold", str(self.threshold), True
+                )
+            )
+        )
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+        offset_songs: int,
+        offset_albums: int,
+        offset_artists: int,
+    ) -> SearchResults:
+        async def songs(s: AsyncSession):
+            await self._set_threshold(s)
+            return await SongRepository(s).search_trigram(query, limit, offset_songs)
+
+        async def albums(s: AsyncSession):
+            await self._set_threshold(s)
+            return await AlbumRepository(s).search_trigram(query, limit, offset_albums)
+
+        async def artists(s: AsyncSession):
+            await self._set_threshold(s)
+            return await ArtistRepository(s).search_trigram(
+                query, limit, offset_artists
+            )
+
+        # Cada entidad en su propia sesión, en paralelo (ver fan_out)
+        return await fan_out(
+            songs, albums, artists, timeout=settings.search_entity_timeout_ms / 1000
+        )
@@ -0,0 +1,182 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from search_index.index_file import CURRENT, IndexFile, current_path, file_name
+from search_index.popularity import PlayCounters
+from search_index.snapshots import SnapshotPublisher, SnapshotWatcher, bootstrap
+from search_index.trigram_index import EntityIndex, SearchIndex
+from search_index.updater import IndexUpdater
+from strategies.memory_strategy import InMemorySearchStrategy
+
+ARTISTS = [(1, "Los Ríos", None), (2, "Mar Azul", None), (3, "Noche Clara", None)]
+ALBUMS = [
+    (1, "Canciones del mar", None, 2),
+    (2, "Luna de río", None, 1),
+    (3, "Sol y sombra", None, 3),
+]
+SONGS = [
+    (1, "Canción del mar", 200, "/a/1.mp3", 1),
+    (2, "Marea alta", 180, "/a/2.mp3", 1),
+    (3, "Luna llena", 210, "/a/3.mp3", 2),
+    (4, "Río abajo", 150, "/a/4.mp3", 2),
+    (5, "Sombra del sol", 240, "/a/5.mp3", 3),
+    (6, "Mar de fondo", 195, "/a/6.mp3", 3),
+]
+QUERIES = ["mar", "cancion del mar", "luna", "rio", "sol", "sombra", "noche"]
+PREFIXES = ["m", "ma", "mar", "lu", "cancion d", "so", "x"]
+
+
+def build_index() -> SearchIndex:
+    """Índice del constructor, como tras la carga desde la BD"""
+    index = SearchIndex(plays=PlayCounters(3600))
+    index.songs = EntityIndex.build("songs", SONGS)
+    index.albums = EntityIndex.build("albums", ALBUMS)
+    index.artists = EntityIndex.build("artists", ARTISTS)
+    index.generation += 1
+    for song_id in (6, 6, 6, 2, 2, 3):
+        index.record_play(song_id)
+    asyncio.run(index.rebuild_suggest(top_n=20, max_words=4))
+    return index
+
+
+def worker_index() -> SearchIndex:
+    return SearchIndex(plays=PlayCounters(3600))
+
+
+def search(index: SearchIndex, query: str):
+    results = asyncio.run(
+        InMemorySearchStrategy(index=index).search(None, query, 10, 0, 0, 0)
+    )
+    return results.songs, results.albums, results.artists
+
+
+def publish(publisher: SnapshotPublisher):
+    return asyncio.run(publisher.publish())
+
+
+class FakeMessage:
+    def __init__(self):
+        self.acked = False
+
+    async def ack(self):
+        self.acked = True
+
+
+def test_publish_then_map_gives_the_same_results(tmp_path):
+    builder = build_index()
+    path = publish(SnapshotPublisher(builder, tmp_path))
+
+    worker = worker_index()
+    assert SnapshotWatcher(worker, tmp_path).poll()
+
+    assert worker.file.path == path
+    assert search(builder, "mar")[0] and builder.suggest.suggest("ma")
+    for query in QUERIES:
+        assert search(worker, query) == search(builder, query), query
+    for prefix in PREFIXES:
+        assert worker.suggest.suggest(prefix) == builder.suggest.suggest(prefix)
+    played = np.array([6, 2, 1])
+    assert builder.plays.lookup("songs", played)[0] > 0
+    assert worker.plays.lookup("songs", played) == pytest.approx(
+        builder.plays.lookup("songs", played)
+    )
+
+    # Todo llega del archivo: arrays de solo lectura sobre el mapeo
+    assert all(entity["mapped"] for entity in worker.stats()["entities"].values())
+    assert worker.suggest.stats()["mapped"]
+
+
+def test_builder_adopts_its_own_generation(tmp_path):
+    builder = build_index()
+    before = {query: search(builder, query) for query in QUERIES}
+
+    publish(SnapshotPublisher(builder, tmp_path))
+
+    assert builder.file is not None
+    assert builder.songs.stats()["mapped"]
+    assert builder.suggest.stats()["mapped"]
+    assert {query: search(builder, query) for query in QUERIES} == before
+
+
+def test_current_swaps_and_workers_pick_up_the_new_generation(tmp_path):
+    builder = build_index()
+    publisher = SnapshotPublisher(builder, tmp_path)
+    first = publish(publisher)
+
+    worker = worker_index()
+    watcher = SnapshotWatcher(worker, tmp_path)
+    assert watcher.poll()
+    assert not watcher.poll()  # misma generación: sin swap
+    assert not any(row[0] == 7 for row in search(worker, "marinero")[0])
+
+    builder.apply([("songs", "upsert", (7, "Marinero", 120, "/a/7.mp3", 1))])
+    assert publisher.due()
+    second = publish(publisher)
+
+    assert second.name == file_name(IndexFile(second).generation)
+    assert (tmp_path / CURRENT).read_text() == second.name
+    assert current_path(tmp_path) == second
+    assert second != first
+
+    assert watcher.poll()
+    assert watcher.path == second
+    assert worker.generation == IndexFile(second).generation
+    assert any(row[0] == 7 for row in search(worker, "marinero")[0])
+    assert search(worker, "marinero") == search(builder, "marinero")
+
+
+def test_stale_generations_are_pruned(tmp_path):
+    builder = build_index()
+    publisher = SnapshotPublisher(builder, tmp_path, keep=2)
+    paths = []
+    for song_id in range(10, 15):
+        builder.apply([("songs", "upsert", (song_id, f"Tema {song_id}", 1, "", 1))])
+        paths.append(publish(publisher))
+
+    remaining = sorted(tmp_path.glob("index-*.bin"))
+    assert remaining == paths[-2:]
+    assert current_path(tmp_path) == paths[-1]
+    # Numeración monótona aunque el constructor se reinicie
+    assert SnapshotPublisher(builder, tmp_path).generation == publisher.generation
+
+
+def test_events_are_acked_only_after_a_publish(tmp_path, monkeypatch):
+    builder = build_index()
+    updater = IndexUpdater(builder)
+    publisher = SnapshotPublisher(builder, tmp_path, updater=updater)
+    messages = [FakeMessage(), FakeMessage()]
+    updater.unpublished.extend(messages)
+
+    async def broken_publish(directory, generation):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(builder, "publish", broken_publish)
+    with pytest.raises(OSError):
+        publish(publisher)
+    assert not any(message.acked for message in messages)
+    assert updater.unpublished == messages
+
+    monkeypatch.undo()
+    publish(publisher)
+    assert all(message.acked for message in messages)
+    assert updater.unpublished == []
+
+
+def test_bootstrap_maps_a_recent_generation_without_the_database(tmp_path):
+    builder = build_index()
+    publish(SnapshotPublisher(builder, tmp_path))
+
+    def no_database():
+        raise AssertionError("el arranque desde disco no debe leer la BD")
+
+    restarted = worker_index()
+    asyncio.run(bootstrap(restarted, tmp_path, 3600, no_database))
+
+    assert restarted.ready
+    assert restarted.suggest.stats()["mapped"]
+    for query in QUERIES:
+        assert search(restarted, query) == search(builder, query), query
+    for prefix in PREFIXES:
+        assert restarted.suggest.suggest(prefix) == builder.suggest.suggest(prefix)
@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from handlers import search_handler
+from services.cursor import encode_cursor
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "no-es-un-cursor",
+        # Manipulado: posición negativa
+        encode_cursor({"songs": -5, "albums": 0, "artists": 0}),
+        # Vencido: emitido con otra versión del formato
+        "eyJ2IjowLCJzIjo1LCJhIjo1LCJyIjo1fQ",
+    ],
+)
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(search_handler.search(q="mar", limit=5, cursor=cursor, db=None))
+    assert error.value.status_code == 400
@@ -0,0 +1,150 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from config import settings
+from services.cursor import decode_cursor, encode_cursor
+from services.result_cache import RankedResultCache
+from services.search_service import SearchService
+from strategies.base_strategy import SearchResults, SearchStrategy
+
+# Resultados reales por entidad: más que search_max_results (se profundiza
+# al paginar) y menos que search_max_depth salvo en artistas (se trunca)
+TOTALS = {"songs": 23, "albums": 9, "artists": 40}
+
+
+class FakeStrategy(SearchStrategy):
+    """Devuelve los primeros `limit` resultados de una lista fija por entidad"""
+
+    def __init__(self, totals: dict[str, int] = TOTALS):
+        self.totals = totals
+        self.depths: list[int] = []
+
+    async def search(
+        self, session, query, limit, offset_songs, offset_albums, offset_artists
+    ):
+        self.depths.append(limit)
+        return SearchResults(
+            songs=[
+                (i, f"song {i}", 180, f"/a/{i}.mp3", 1)
+                for i in range(min(limit, self.totals["songs"]))
+            ],
+            albums=[
+                (i, f"album {i}", None)
+                for i in range(min(limit, self.totals["albums"]))
+            ],
+            artists=[
+                (i, f"artist {i}", None)
+                for i in range(min(limit, self.totals["artists"]))
+            ],
+        )
+
+
+@pytest.fixture
+def small_depth(monkeypatch):
+    monkeypatch.setattr(settings, "search_max_results", 8)
+    monkeypatch.setattr(settings, "search_max_depth", 30)
+
+
+def page_to_end(service: SearchService, limit: int) -> tuple[dict, list[dict]]:
+    """Sigue next_cursor hasta el final; devuelve los ids vistos y las respuestas"""
+    seen = {"songs": [], "albums": [], "artists": []}
+    responses = []
+    offsets = {"songs": 0, "albums": 0, "artists": 0}
+    while True:
+        response = asyncio.run(
+            service.search(
+                None,
+                "mar",
+                limit,
+                offsets["songs"],
+                offsets["albums"],
+                offsets["artists"],
+            )
+        )
+        responses.append(response)
+        for name in seen:
+            seen[name].extend(row["id"] for row in response[name]["results"])
+        if response["next_cursor"] is None:
+            return seen, responses
+        offsets = decode_cursor(response["next_cursor"])
+
+
+def test_cursor_pages_to_the_end_across_deepening(small_depth):
+    strategy = FakeStrategy()
+    service = SearchService(strategy, RankedResultCache(10, 60))
+
+    seen, responses = page_to_end(service, limit=5)
+
+    # Sin duplicados ni huecos: cada entidad sale completa y en orden
+    assert seen["songs"] == list(range(TOTALS["songs"]))
+    assert seen["albums"] == list(range(TOTALS["albums"]))
+    # Artistas se cortan en search_max_depth y la respuesta lo indica
+    assert seen["artists"] == list(range(settings.search_max_depth))
+    assert responses[-1]["truncated"] == ["artists"]
+    assert all(not r["truncated"] for r in responses[:-1])
+
+    # Se ordenó a 8, luego al doble hasta el tope, no una vez por página
+    assert strategy.depths == [8, 16, 30]
+    assert responses[-1]["songs"]["total"] == TOTALS["songs"]
+    assert responses[-1]["artists"]["total"] is None
+
+
+def test_entities_exhausted_earlier_stay_at_the_end(small_depth):
+    service = SearchService(FakeStrategy(), RankedResultCache(10, 60))
+
+    _, responses = page_to_end(service, limit=5)
+
+    # Álbumes se agotan en la segunda página; las siguientes vienen vacías
+    assert [r["albums"]["has_more"] for r in responses[:2]] == [True, False]
+    assert all(r["albums"]["results"] == [] for r in responses[2:])
+
+
+def test_cursor_survives_cache_expiry(small_depth):
+    strategy = FakeStrategy()
+    cache = RankedResultCache(10, 60)
+    service = SearchService(strategy, cache)
+
+    first = asyncio.run(service.search(None, "mar", 5))
+    cache.clear()
+    offsets = decode_cursor(first["next_cursor"])
+    second = asyncio.run(
+        service.search(
+            None, "mar", 5, offsets["songs"], offsets["albums"], offsets["artists"]
+        )
+    )
+
+    # La lista se vuelve a ordenar y la página sigue donde quedó la anterior
+    assert [row["id"] for row in second["songs"]["results"]] == [5, 6, 7, 8, 9]
+    assert len(strategy.depths) == 2
+
+
+def raw_cursor(payload: dict) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    positions = {"songs": 10, "albums": 0, "artists": 35}
+    assert decode_cursor(encode_cursor(positions)) == positions
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "no-es-un-cursor",
+        encode_cursor({"songs": 5, "albums": 5, "artists": 5})[:-3] + "xyz",
+        raw_cursor({"v": 1, "s": -5, "a": 0, "r": 0}),
+        raw_cursor({"v": 1, "s": "5", "a": 0, "r": 0}),
+        raw_cursor({"v": 1, "s": 5, "a": 0}),
+        raw_cursor([1, 2, 3]),
+        # Cursor de una versión anterior del formato: ya no se acepta
+        raw_cursor({"v": 0, "s": 5, "a": 5, "r": 5}),
+        raw_cursor({"s": 5, "a": 5, "r": 5}),
+    ],
+)
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)